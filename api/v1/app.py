@@ -3,13 +3,14 @@
 from flask import Flask, jsonify
 from models import storage
 from api.v1.views import app_views
+from api.v1.encoder import HBNBJSONProvider
 from flask_cors import CORS
 import os
 
 
 app = Flask(__name__)
 app.register_blueprint(app_views)
-app.config['JSONIFY_PRETTYPRINT_REGULAR'] = True
+app.json = HBNBJSONProvider(app)
 CORS(app, resources={r"/*": {"origins": "0.0.0.0"}})
 
 
@@ -0,0 +1,83 @@
+#!/usr/bin/python3
+"""
+JSON encoding of the API responses
+compact output by default, pretty printed only with ?pretty=1
+uses orjson when it is installed (HBNB_JSON_ENCODER=json forces the
+standard library encoder)
+"""
+from datetime import datetime
+from flask import request
+from flask.json.provider import JSONProvider
+import json
+from os import getenv
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ENCODER = getenv("HBNB_JSON_ENCODER", "orjson" if orjson else "json")
+if ENCODER == "orjson" and orjson is None:
+    raise ImportError("HBNB_JSON_ENCODER=orjson requires the orjson package")
+
+
+def default(obj):
+    """
+    serializes the values the encoders do not know natively
+    datetimes use the same format as BaseModel.to_dict()
+    """
+    if isinstance(obj, datetime):
+        return obj.isoformat(timespec="microseconds")
+    raise TypeError("{} is not JSON serializable".format(type(obj).__name__))
+
+
+def dumps(obj, pretty=False):
+    """
+    encodes a value as JSON text
+    param obj: value to encode
+    param pretty: indent the output
+    return: string
+    """
+    if ENCODER == "orjson":
+        option = orjson.OPT_PASSTHROUGH_DATETIME
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=default, option=option).decode()
+    if pretty:
+        return json.dumps(obj, default=default, indent=2)
+    return json.dumps(obj, default=default, separators=(",", ":"))
+
+
+def loads(text):
+    """
+    decodes JSON text
+    param text: string or bytes
+    return: decoded value
+    """
+    if ENCODER == "orjson":
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def wants_pretty():
+    """tells whether the current request asked for indented output"""
+    return request.args.get("pretty") in ("1", "true")
+
+
+class HBNBJSONProvider(JSONProvider):
+    """Flask JSON provider backed by dumps() and loads()"""
+
+    def dumps(self, obj, **kwargs):
+        """encodes a value as JSON text"""
+        return dumps(obj, pretty=kwargs.get("indent") is not None)
+
+    def loads(self, s, **kwargs):
+        """decodes JSON text"""
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        """builds the response of jsonify()"""
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            dumps(obj, pretty=wants_pretty()) + "\n",
+            mimetype="application/json")
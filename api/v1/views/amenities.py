@@ -4,6 +4,8 @@ new view for Amenity objects that handles all default RESTFul API actions
 """
 from flask import jsonify, abort, request
 from api.v1.views import app_views
+from api.v1.views.conditional import object_response
+from api.v1.views.listing import list_objects
 from models import storage
 from models.amenity import Amenity
 
@@ -13,12 +15,7 @@ def amenities_get_all():
     """
     Retrieves all Amenity objects
     """
-    amenity_list = []
-    amenity_objs = storage.all(Amenity)
-    for obj in amenity_objs.values():
-        amenity_list.append(obj.to_dict())
-
-    return jsonify(amenity_list)
+    return list_objects(Amenity)
 
 
 @app_views.route("/amenities", methods=["POST"], strict_slashes=False)
@@ -46,12 +43,7 @@ def amenity_by_id(amenity_id):
     """
     Retrieves a specific Amenity object by ID
     """
-    fetched_obj = storage.get(Amenity, str(amenity_id))
-
-    if fetched_obj is None:
-        abort(404)
-
-    return jsonify(fetched_obj.to_dict())
+    return object_response(Amenity, str(amenity_id))
 
 
 @app_views.route("/amenities/<amenity_id>", methods=["PUT"],
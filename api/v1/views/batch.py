@@ -0,0 +1,172 @@
+#!/usr/bin/python3
+"""
+route for applying many create/update/delete operations in one request
+"""
+from datetime import datetime
+from flask import jsonify, abort, request
+from api.v1.views import app_views
+from models import storage
+from models.amenity import Amenity
+from models.city import City
+from models.place import Place
+from models.review import Review
+from models.state import State
+from models.user import User
+from os import getenv
+
+# maximum number of operations accepted in one batch
+BATCH_MAX = int(getenv("HBNB_BATCH_MAX", 10000))
+
+# resource -> (class, required keys, parent classes by key, ignored keys)
+resources = {
+    "states": (State, ["name"], {}, ["id", "created_at", "updated_at"]),
+    "amenities": (Amenity, ["name"], {},
+                  ["id", "created_at", "updated_at"]),
+    "users": (User, ["email", "password"], {},
+              ["id", "email", "created_at", "updated_at"]),
+    "cities": (City, ["state_id", "name"], {"state_id": State},
+               ["id", "state_id", "created_at", "updated_at"]),
+    "places": (Place, ["city_id", "user_id", "name"],
+               {"city_id": City, "user_id": User},
+               ["id", "user_id", "city_id", "created_at", "updated_at"] +
+               list(Place.stats_keys)),
+    "reviews": (Review, ["place_id", "user_id", "text"],
+                {"place_id": Place, "user_id": User},
+                ["id", "user_id", "place_id", "created_at", "updated_at"]),
+}
+
+
+def count_reviews(created, deleted, now):
+    """
+    updates the aggregates of the places whose reviews a batch created
+    or deleted, once the reviews themselves were stored
+    param created: list of new Review objects
+    param deleted: list of deleted Review objects
+    param now: updated_at of the objects of the batch
+    return: list of the places to save
+    """
+    places = {}
+    counted = set()
+    for review, added in ([(review, True) for review in created] +
+                          [(review, False) for review in deleted]):
+        place = places.get(review.place_id)
+        if place is None:
+            place = storage.get(Place, review.place_id)
+            if place is None:
+                continue
+            places[review.place_id] = place
+            if place.review_count is None:
+                # counting them sees every review of the batch at once
+                place.count_stats()
+                counted.add(review.place_id)
+        if review.place_id in counted:
+            continue
+        if added:
+            place.review_added(review)
+        else:
+            place.review_deleted(review)
+    for place in places.values():
+        place.updated_at = now
+    return list(places.values())
+
+
+def check_operation(resource, op):
+    """
+    validates one operation of a batch
+    param resource: name of the resource
+    param op: dictionary {"op": ..., "id": ..., "data": {...}}
+    return: tuple (error status, message) or (None, object to update or
+            delete, None for a create)
+    """
+    cls, required, parents, ignore_keys = resources[resource]
+    if not isinstance(op, dict):
+        return 400, "Not a JSON"
+    kind = op.get("op")
+    data = op.get("data", {})
+    if kind not in ("create", "update", "delete"):
+        return 400, "Invalid op"
+    if not isinstance(data, dict):
+        return 400, "Not a JSON"
+    if kind == "create":
+        for key in required:
+            if key not in data:
+                return 400, "Missing {}".format(key)
+        for key, parent_cls in parents.items():
+            if not storage.exists(parent_cls, str(data[key])):
+                return 404, "Not found"
+        return None, None
+    if "id" not in op:
+        return 400, "Missing id"
+    obj = storage.get(cls, str(op["id"]))
+    if obj is None:
+        return 404, "Not found"
+    return None, obj
+
+
+@app_views.route("/<any(states, amenities, users, cities, places, reviews)"
+                 ":resource>/batch", methods=["POST"], strict_slashes=False)
+def batch(resource):
+    """
+    Applies a list of operations to a resource with a single save.
+    ---
+    parameters:
+      - name: resource
+        in: path
+        type: string
+        required: true
+        description: states, amenities, users, cities, places or reviews
+      - name: body
+        in: body
+        required: true
+        description: list of {"op": "create", "data": {...}},
+                     {"op": "update", "id": ..., "data": {...}} or
+                     {"op": "delete", "id": ...}
+    responses:
+      200:
+        description: list of {"status": ..., "id" or "error": ...} in the
+                     order of the operations
+    """
+    ops = request.get_json(silent=True)
+    if not isinstance(ops, list):
+        abort(400, 'Not a JSON')
+    if len(ops) > BATCH_MAX:
+        abort(400, 'Too many operations')
+    cls, required, parents, ignore_keys = resources[resource]
+    checked = [check_operation(resource, op) for op in ops]
+
+    results = []
+    created = []
+    updated = []
+    deleted = []
+    now = datetime.utcnow()
+    for op, (status, found) in zip(ops, checked):
+        if status is not None:
+            results.append({"status": status, "error": found})
+            continue
+        if op["op"] == "create":
+            data = op.get("data", {})
+            if cls is Place:
+                data = {key: value for key, value in data.items()
+                        if key not in Place.stats_keys}
+            obj = cls(**data)
+            created.append(obj)
+            results.append({"status": 201, "id": obj.id})
+        elif op["op"] == "update":
+            for key, value in op.get("data", {}).items():
+                if key not in ignore_keys:
+                    setattr(found, key, value)
+            if cls is Place and "amenity_ids" in op.get("data", {}):
+                found.count_stats()
+            found.updated_at = now
+            updated.append(found)
+            results.append({"status": 200, "id": found.id})
+        else:
+            deleted.append(found)
+            results.append({"status": 200, "id": found.id})
+
+    storage.bulk_new(created + updated)
+    storage.bulk_delete(deleted)
+    if cls is Review:
+        storage.bulk_new(count_reviews(created, deleted, now))
+    storage.save()
+    return jsonify(results)
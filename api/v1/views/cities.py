@@ -5,6 +5,8 @@ RESTFul API actions
 """
 from flask import jsonify, abort, request
 from api.v1.views import app_views, storage
+from api.v1.views.conditional import object_response
+from api.v1.views.listing import list_objects
 from models import storage
 from models.city import City
 from models.state import State
@@ -16,11 +18,9 @@ def get_cities_by_state(state_id):
     """
     Retrieves all City objects of a State
     """
-    state = storage.get(State, state_id)
-    if state is None:
+    if not storage.exists(State, state_id):
         abort(404)
-    cities = [city.to_dict() for city in state.cities]
-    return jsonify(cities)
+    return list_objects(City, filter={"state_id": state_id})
 
 
 @app_views.route("/cities/<city_id>", methods=["GET"],
@@ -29,10 +29,7 @@ def get_city(city_id):
     """
     Retrieves a City object by its id
     """
-    city = storage.get(City, city_id)
-    if city is None:
-        abort(404)
-    return jsonify(city.to_dict())
+    return object_response(City, city_id)
 
 
 @app_views.route("/cities/<city_id>", methods=["DELETE"],
@@ -56,8 +53,7 @@ def create_city(state_id):
     """
     Creates a new City object
     """
-    state = storage.get(State, state_id)
-    if state is None:
+    if not storage.exists(State, state_id):
         abort(404)
 
     city_json = request.get_json(silent=True)
@@ -0,0 +1,85 @@
+#!/usr/bin/python3
+"""
+helpers answering conditional GET requests (ETag / Last-Modified) from
+the updated_at of the objects, before anything is serialized
+"""
+from datetime import timezone
+from flask import Response, jsonify, abort, request
+import hashlib
+from models import storage
+
+
+def make_etag(*parts):
+    """
+    builds an entity tag out of the values identifying a representation
+    param parts: values such as class name, id and updated_at
+    return: hexadecimal digest
+    """
+    text = "|".join(str(part) for part in parts)
+    return hashlib.md5(text.encode("utf-8")).hexdigest()
+
+
+def is_fresh(etag, last_modified):
+    """
+    tells whether the copy the client holds is still current
+    If-None-Match wins over If-Modified-Since when both are sent
+    param etag: current entity tag
+    param last_modified: current updated_at (naive UTC datetime) or None
+    return: True if a 304 can be sent
+    """
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    since = request.if_modified_since
+    if since is None or last_modified is None:
+        return False
+    last_modified = last_modified.replace(microsecond=0,
+                                          tzinfo=timezone.utc)
+    return last_modified <= since
+
+
+def add_validators(resp, etag, last_modified):
+    """
+    sets the ETag and Last-Modified headers of a response
+    param resp: response
+    param etag: entity tag
+    param last_modified: naive UTC datetime or None
+    return: the response
+    """
+    resp.set_etag(etag, weak=True)
+    if last_modified is not None:
+        resp.last_modified = last_modified.replace(tzinfo=timezone.utc)
+    return resp
+
+
+def not_modified(etag, last_modified):
+    """
+    builds an empty 304 response
+    param etag: entity tag
+    param last_modified: naive UTC datetime or None
+    return: response
+    """
+    return add_validators(Response(status=304), etag, last_modified)
+
+
+def object_response(cls, id, dump=None):
+    """
+    returns one object as JSON, or 304 if the client copy is current
+    param cls: class of the object
+    param id: id of the object
+    param dump: function serializing the object (default: to_dict)
+    return: response
+    """
+    updated_at = storage.version(cls, str(id))
+    if updated_at is None:
+        abort(404)
+    etag = make_etag(cls.__name__, id, updated_at)
+    if is_fresh(etag, updated_at):
+        return not_modified(etag, updated_at)
+    if dump is None:
+        obj_dict = storage.get_dict(cls, str(id))
+    else:
+        obj = storage.get(cls, str(id))
+        obj_dict = None if obj is None else dump(obj)
+    if obj_dict is None:
+        abort(404)
+    return add_validators(jsonify(obj_dict), etag, updated_at)
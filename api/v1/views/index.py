@@ -15,12 +15,19 @@ def status_of_api():
 @app_views.route("/stats")
 def stats():
     """endpoint that retrieves the number of each object by type"""
+    counts = storage.counts()
     stats = {
-            "states": storage.count('State'),
-            "cities": storage.count('City'),
-            "amenities": storage.count('Amenity'),
-            "places": storage.count('Place'),
-            "reviews": storage.count('Review'),
-            "users": storage.count('User')
+            "states": counts.get('State', 0),
+            "cities": counts.get('City', 0),
+            "amenities": counts.get('Amenity', 0),
+            "places": counts.get('Place', 0),
+            "reviews": counts.get('Review', 0),
+            "users": counts.get('User', 0)
             }
     return (jsonify(stats))
+
+
+@app_views.route("/metrics")
+def metrics():
+    """endpoint that retrieves internal counters of the storage engine"""
+    return (jsonify(storage.metrics()))
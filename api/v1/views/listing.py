@@ -0,0 +1,221 @@
+#!/usr/bin/python3
+"""
+helpers shared by the views that return collections of objects
+"""
+from flask import Response, jsonify, abort, request, stream_with_context
+from flask import url_for
+from api.v1.views.conditional import make_etag, is_fresh, not_modified
+from api.v1.views.conditional import add_validators
+from api.v1.encoder import dumps
+from models import storage
+from os import getenv
+
+# number of objects pulled from storage at a time when streaming
+STREAM_BATCH = int(getenv("HBNB_STREAM_BATCH", 500))
+# size in characters of the chunks written to the client when streaming
+STREAM_CHUNK = 64 * 1024
+
+
+def to_dict(obj):
+    """default serializer of the listed objects"""
+    return obj.to_dict()
+
+
+def page_args():
+    """
+    reads the pagination query parameters of the current request
+    return: tuple (limit or None, cursor or None)
+    """
+    limit = request.args.get("limit")
+    if limit is not None:
+        try:
+            limit = int(limit)
+        except ValueError:
+            abort(400, 'Invalid limit')
+        if limit < 1:
+            abort(400, 'Invalid limit')
+    return limit, request.args.get("cursor")
+
+
+def range_args(fields, args=None):
+    """
+    reads the range and ordering parameters of the current request
+    ?min_<name>=<n>&max_<name>=<n> keep the objects whose attribute is
+    in range, ?order=<name> orders them by it, ?order=-<name> backwards
+    param fields: dictionary of parameter name -> attribute
+    param args: mapping to read instead of the query string
+    return: tuple (dictionary of attribute -> (lowest, highest) value or
+            None, attribute to order by, "-<attribute>" or None)
+    """
+    if args is None:
+        args = request.args
+    ranges = {}
+    for name, attr in fields.items():
+        bounds = []
+        for param in ("min_" + name, "max_" + name):
+            value = args.get(param)
+            if value is not None:
+                try:
+                    value = int(value)
+                except (TypeError, ValueError):
+                    abort(400, 'Invalid ' + param)
+            bounds.append(value)
+        if bounds != [None, None]:
+            ranges[attr] = tuple(bounds)
+    order = args.get("order")
+    if order is not None:
+        if not isinstance(order, str):
+            abort(400, 'Invalid order')
+        reverse = order.startswith('-')
+        name = order[1:] if reverse else order
+        if name not in fields:
+            abort(400, 'Invalid order')
+        order = ('-' if reverse else '') + fields[name]
+    return ranges or None, order
+
+
+def decode_cursor(cursor, order):
+    """
+    turns the cursor of the query string into what storage.page() takes
+    param cursor: id, or <value>,<id> when ordered by an attribute
+    param order: attribute the objects are ordered by or None
+    return: id or tuple (value, id)
+    """
+    if cursor is None or order is None:
+        return cursor
+    value, sep, id = cursor.partition(",")
+    if not sep:
+        abort(400, 'Invalid cursor')
+    for number in (int, float):
+        try:
+            return number(value), id
+        except ValueError:
+            pass
+    abort(400, 'Invalid cursor')
+
+
+def stream_mode():
+    """
+    tells whether the client asked for a streamed listing
+    return: "ndjson" for Accept: application/x-ndjson, "json" for
+            ?stream=1, None otherwise
+    """
+    best = request.accept_mimetypes.best_match(["application/json",
+                                                "application/x-ndjson"])
+    if best == "application/x-ndjson":
+        return "ndjson"
+    if request.args.get("stream") in ("1", "true"):
+        return "json"
+    return None
+
+
+def next_link(cursor):
+    """
+    builds the Link header pointing to the next page
+    param cursor: id of the last object of the current page, or tuple
+                  (value, id) when ordered by an attribute
+    return: header value
+    """
+    args = request.args.to_dict()
+    if isinstance(cursor, tuple):
+        cursor = "{},{}".format(*cursor)
+    args["cursor"] = cursor
+    args.update(request.view_args or {})
+    return '<{}>; rel="next"'.format(url_for(request.endpoint, **args))
+
+
+def iter_objects(cls, filter=None, after_id=None, ranges=None, order=None):
+    """
+    pulls the objects of a class from storage one batch at a time
+    param cls: class of the objects
+    param filter: dictionary of attribute values the objects must match
+    param after_id: only yield objects whose id comes after this one
+    param ranges, order: as in storage.page()
+    return: generator of objects ordered by id
+    """
+    while True:
+        objs, after_id = storage.page(cls, after_id=after_id,
+                                      limit=STREAM_BATCH, filter=filter,
+                                      ranges=ranges, order=order)
+        for obj in objs:
+            yield obj
+        if after_id is None:
+            return
+
+
+def encode_stream(objs, dump, mode):
+    """
+    encodes objects one at a time as a JSON array or as NDJSON
+    param objs: iterable of objects
+    param dump: function serializing an object
+    param mode: "json" or "ndjson"
+    return: generator of text chunks
+    """
+    if mode == "ndjson":
+        start, sep, end = "", "\n", "\n"
+    else:
+        start, sep, end = "[", ",", "]"
+    buf = [start]
+    size = 0
+    first = True
+    for obj in objs:
+        text = dumps(dump(obj))
+        if not first:
+            buf.append(sep)
+        first = False
+        buf.append(text)
+        size += len(text)
+        if size >= STREAM_CHUNK:
+            yield "".join(buf)
+            buf = []
+            size = 0
+    if not first or mode != "ndjson":
+        buf.append(end)
+    yield "".join(buf)
+
+
+def list_objects(cls, filter=None, dump=None, fields=None):
+    """
+    lists the objects of a class as a JSON array ordered by id
+    ?limit=<n>&cursor=<id> returns at most n objects whose id comes after
+    cursor, and a Link header to the next page if there is one
+    ?stream=1 or Accept: application/x-ndjson encode the objects while
+    they are pulled from storage instead of building the whole body
+    the ETag and Last-Modified headers come from the number of objects
+    and their latest updated_at, so a 304 is sent without loading them
+    param cls: class of the objects
+    param filter: dictionary of attribute values the objects must match
+    param dump: function serializing an object (default: to_dict)
+    param fields: parameter names of the attributes that can be given a
+                  range or an order, see range_args()
+    return: response
+    """
+    limit, cursor = page_args()
+    ranges, order = range_args(fields or {})
+    cursor = decode_cursor(cursor, order)
+    mode = stream_mode()
+    count, latest = storage.collection_version(cls, filter)
+    etag = make_etag(cls.__name__, sorted((filter or {}).items()), count,
+                     latest, request.query_string, mode)
+    if is_fresh(etag, latest):
+        return not_modified(etag, latest)
+    if dump is None:
+        dump = to_dict
+    if mode is not None and limit is None:
+        objs = iter_objects(cls, filter=filter, after_id=cursor,
+                            ranges=ranges, order=order)
+        next_cursor = None
+    else:
+        objs, next_cursor = storage.page(cls, after_id=cursor, limit=limit,
+                                         filter=filter, ranges=ranges,
+                                         order=order)
+    if mode is None:
+        resp = jsonify([dump(obj) for obj in objs])
+    else:
+        mimetype = "application/x-ndjson" if mode == "ndjson" \
+            else "application/json"
+        resp = Response(stream_with_context(encode_stream(objs, dump, mode)),
+                        mimetype=mimetype)
+    if next_cursor is not None:
+        resp.headers["Link"] = next_link(next_cursor)
+    return add_validators(resp, etag, latest)
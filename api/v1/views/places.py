@@ -4,11 +4,18 @@ route for handling Place objects and operations
 """
 from flask import Flask, jsonify, abort, request
 from api.v1.views import app_views
+from api.v1.views.conditional import object_response
+from api.v1.views.listing import decode_cursor, list_objects, next_link
+from api.v1.views.listing import page_args, range_args
 from models import storage
 from models.city import City
 from models.place import Place
 from models.user import User
 
+# query parameters of the Place attributes that take a range or an order
+PLACE_RANGES = {"price": "price_by_night", "guests": "max_guest",
+                "rooms": "number_rooms", "bathrooms": "number_bathrooms"}
+
 
 @app_views.route("/cities/<city_id>/places", methods=["GET"],
                  strict_slashes=False)
@@ -22,12 +29,145 @@ def get_city_places(city_id):
         type: string
         required: true
         description: ID of the City
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: maximum number of Place objects to return
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: cursor of the next page, from the Link header
+      - name: min_price
+        in: query
+        type: integer
+        required: false
+        description: lowest price_by_night, also max_price, min_guests,
+                     max_guests, min_rooms, max_rooms, min_bathrooms and
+                     max_bathrooms
+      - name: order
+        in: query
+        type: string
+        required: false
+        description: price, guests, rooms or bathrooms to order by
+                     instead of id, with a leading - for descending
     """
-    city = storage.get(City, city_id)
-    if not city:
+    if not storage.exists(City, city_id):
         abort(404)
-    places = city.places
-    return jsonify([place.to_dict() for place in places])
+    return list_objects(Place, filter={"city_id": city_id},
+                        fields=PLACE_RANGES)
+
+
+def float_arg(name, low=None, high=None, required=True):
+    """
+    reads a number from the query string of the current request
+    param name: name of the parameter
+    param low, high: range the number must be in
+    param required: answer 400 if the parameter is missing
+    return: float or None if missing and not required
+    """
+    value = request.args.get(name)
+    if value is None:
+        if required:
+            abort(400, description="Missing {}".format(name))
+        return None
+    try:
+        value = float(value)
+    except ValueError:
+        abort(400, description="Invalid {}".format(name))
+    if value != value or (low is not None and value < low) or \
+            (high is not None and value > high):
+        abort(400, description="Invalid {}".format(name))
+    return value
+
+
+def with_distances(found):
+    """list of the to_dict() of places, with their distance in km"""
+    places = []
+    for distance, place in found:
+        place_dict = place.to_dict()
+        place_dict["distance"] = round(distance, 3)
+        places.append(place_dict)
+    return jsonify(places)
+
+
+@app_views.route("/places/near", methods=["GET"], strict_slashes=False)
+def get_places_near():
+    """
+    Retrieves the Place objects closest to a point, closest first.
+    ---
+    parameters:
+      - name: lat
+        in: query
+        type: number
+        required: true
+        description: latitude of the point in degrees
+      - name: lng
+        in: query
+        type: number
+        required: true
+        description: longitude of the point in degrees
+      - name: radius
+        in: query
+        type: number
+        required: false
+        description: only return Place objects within radius kilometers,
+                     required without limit
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: maximum number of Place objects to return
+    """
+    lat = float_arg("lat", -90, 90)
+    lng = float_arg("lng", -180, 180)
+    radius = float_arg("radius", 0, required=False)
+    limit = page_args()[0]
+    if radius is None and limit is None:
+        abort(400, description="Missing radius")
+    return with_distances(storage.near(Place, lat, lng, radius=radius,
+                                       limit=limit))
+
+
+@app_views.route("/places/bbox", methods=["GET"], strict_slashes=False)
+def get_places_bbox():
+    """
+    Retrieves the Place objects inside a box of coordinates, closest to
+    its center first.
+    ---
+    parameters:
+      - name: min_lat
+        in: query
+        type: number
+        required: true
+      - name: min_lng
+        in: query
+        type: number
+        required: true
+        description: western edge, greater than max_lng when the box
+                     crosses the 180th meridian
+      - name: max_lat
+        in: query
+        type: number
+        required: true
+      - name: max_lng
+        in: query
+        type: number
+        required: true
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: maximum number of Place objects to return
+    """
+    min_lat = float_arg("min_lat", -90, 90)
+    min_lng = float_arg("min_lng", -180, 180)
+    max_lat = float_arg("max_lat", min_lat, 90)
+    max_lng = float_arg("max_lng", -180, 180)
+    limit = page_args()[0]
+    return with_distances(storage.within(
+        Place, (min_lat, min_lng, max_lat, max_lng), limit=limit))
 
 
 @app_views.route("/places/<place_id>", methods=["GET"],
@@ -43,10 +183,29 @@ def get_place(place_id):
         required: true
         description: ID of the Place
     """
-    place = storage.get(Place, place_id)
-    if not place:
-        abort(404)
-    return jsonify(place.to_dict())
+    return object_response(Place, place_id)
+
+
+@app_views.route("/places/<place_id>/stats", methods=["GET"],
+                 strict_slashes=False)
+def get_place_stats(place_id):
+    """
+    Retrieves the number of reviews, the time of the latest one and the
+    number of amenities of a Place, without loading the reviews.
+    ---
+    parameters:
+      - name: place_id
+        in: path
+        type: string
+        required: true
+        description: ID of the Place
+    responses:
+      200:
+        description: review_count, last_review_at and amenity_count
+      404:
+        description: Place not found
+    """
+    return object_response(Place, place_id, dump=Place.stats)
 
 
 @app_views.route("/places/<place_id>", methods=["DELETE"],
@@ -83,8 +242,7 @@ def create_place(city_id):
         required: true
         description: ID of the City
     """
-    city = storage.get(City, city_id)
-    if not city:
+    if not storage.exists(City, city_id):
         abort(404)
     if not request.json:
         abort(400, description="Not a JSON")
@@ -92,12 +250,13 @@ def create_place(city_id):
     user_id = data.get("user_id")
     if not user_id:
         abort(400, description="Missing user_id")
-    user = storage.get(User, user_id)
-    if not user:
+    if not storage.exists(User, user_id):
         abort(404)
     if "name" not in data:
         abort(400, description="Missing name")
     data["city_id"] = city_id
+    for key in Place.stats_keys:
+        data.pop(key, None)
     place = Place(**data)
     place.save()
     return jsonify(place.to_dict()), 201
@@ -123,8 +282,80 @@ def update_place(place_id):
         abort(400, description="Not a JSON")
     data = request.get_json()
     ignore_keys = ["id", "user_id", "city_id", "created_at", "updated_at"]
+    ignore_keys.extend(Place.stats_keys)
     for key, value in data.items():
         if key not in ignore_keys:
             setattr(place, key, value)
+    if "amenity_ids" in data:
+        place.count_stats()
     place.save()
     return jsonify(place.to_dict()), 200
+
+
+@app_views.route("/places_search", methods=["POST"], strict_slashes=False)
+def search_places():
+    """
+    Retrieves the Place objects of some States or Cities that have all of
+    some Amenities, ordered by id.
+    ---
+    parameters:
+      - name: filters
+        in: body
+        required: true
+        description: lists of ids, states and cities are combined, an
+                     empty or missing list does not filter
+        schema:
+          type: object
+          properties:
+            states:
+              type: array
+              items:
+                type: string
+            cities:
+              type: array
+              items:
+                type: string
+            amenities:
+              type: array
+              items:
+                type: string
+            min_price:
+              type: integer
+              description: lowest price_by_night, also max_price,
+                           min_guests, max_guests, min_rooms, max_rooms,
+                           min_bathrooms and max_bathrooms
+            order:
+              type: string
+              description: price, guests, rooms or bathrooms to order
+                           by instead of id, with a leading - for
+                           descending
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: maximum number of Place objects to return
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: cursor of the next page, from the Link header
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        abort(400, description="Not a JSON")
+    filters = {}
+    for name in ("states", "cities", "amenities"):
+        ids = data.get(name) or []
+        if not isinstance(ids, list) or \
+                not all(isinstance(id, str) for id in ids):
+            abort(400, description="Invalid {}".format(name))
+        filters[name] = ids
+    ranges, order = range_args(PLACE_RANGES, data)
+    limit, cursor = page_args()
+    places, next_cursor = storage.search_places(
+        after_id=decode_cursor(cursor, order), limit=limit, ranges=ranges,
+        order=order, **filters)
+    resp = jsonify([place.to_dict() for place in places])
+    if next_cursor is not None:
+        resp.headers["Link"] = next_link(next_cursor)
+    return resp
@@ -2,12 +2,15 @@
 """
 route for handling Review objects and operations
 """
+from datetime import datetime
 from flask import Flask, jsonify, abort, request
 from models import storage
 from models.place import Place
 from models.review import Review
 from models.user import User
 from api.v1.views import app_views
+from api.v1.views.conditional import object_response
+from api.v1.views.listing import list_objects
 
 
 @app_views.route("/places/<place_id>/reviews", methods=["GET"],
@@ -22,17 +25,25 @@ def get_place_reviews(place_id):
         type: string
         required: true
         description: ID of the Place
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: maximum number of Review objects to return
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: id of the last Review of the previous page
     responses:
       200:
         description: List of Review objects
       404:
         description: Place not found
     """
-    place = storage.get(Place, place_id)
-    if not place:
+    if not storage.exists(Place, place_id):
         abort(404)
-    reviews = place.reviews
-    return jsonify([review.to_dict() for review in reviews])
+    return list_objects(Review, filter={"place_id": place_id})
 
 
 @app_views.route("/reviews/<review_id>", methods=["GET"],
@@ -53,10 +64,7 @@ def get_review(review_id):
       404:
         description: Review not found
     """
-    review = storage.get(Review, review_id)
-    if not review:
-        abort(404)
-    return jsonify(review.to_dict())
+    return object_response(Review, review_id)
 
 
 @app_views.route("/reviews/<review_id>", methods=["DELETE"],
@@ -76,6 +84,11 @@ def delete_review(review_id):
     if not review:
         abort(404)
     review.delete()
+    place = storage.get(Place, review.place_id)
+    if place is not None:
+        place.review_deleted(review)
+        place.updated_at = datetime.utcnow()
+        storage.new(place)
     storage.save()
     return jsonify({}), 200
 
@@ -102,14 +115,17 @@ def create_review(place_id):
     user_id = data.get("user_id")
     if not user_id:
         abort(400, description="Missing user_id")
-    user = storage.get(User, user_id)
-    if not user:
+    if not storage.exists(User, user_id):
         abort(404)
     if "text" not in data:
         abort(400, description="Missing text")
     data["place_id"] = place_id
     review = Review(**data)
-    review.save()
+    storage.new(review)
+    place.review_added(review)
+    place.updated_at = review.updated_at
+    storage.new(place)
+    storage.save()
     return jsonify(review.to_dict()), 201
 
 
@@ -0,0 +1,55 @@
+#!/usr/bin/python3
+"""
+route for full-text search over Place descriptions and Review texts
+"""
+from flask import jsonify, abort, request
+from api.v1.views import app_views
+from api.v1.views.listing import page_args
+from models import storage
+from models.place import Place
+from models.review import Review
+from os import getenv
+
+# number of results returned when the request has no limit
+SEARCH_LIMIT = int(getenv("HBNB_SEARCH_LIMIT", 20))
+# value of the type parameter -> class searched
+searched = {"places": Place, "reviews": Review}
+
+
+@app_views.route("/search", methods=["GET"], strict_slashes=False)
+def search_objects():
+    """
+    Searches the descriptions of Places and the texts of Reviews, best
+    matches first.
+    ---
+    parameters:
+      - name: q
+        in: query
+        type: string
+        required: true
+        description: words to search for
+      - name: type
+        in: query
+        type: string
+        required: false
+        description: places or reviews to search only one of them
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: maximum number of results (default 20)
+    """
+    query = request.args.get("q", "").strip()
+    if not query:
+        abort(400, description="Missing q")
+    kind = request.args.get("type")
+    if kind is not None and kind not in searched:
+        abort(400, description="Invalid type")
+    limit = page_args()[0] or SEARCH_LIMIT
+    results = []
+    for score, obj in storage.search(query, cls=searched.get(kind),
+                                     limit=limit):
+        obj_dict = obj.to_dict()
+        obj_dict["score"] = round(score, 4)
+        results.append(obj_dict)
+    return jsonify(results)
@@ -4,6 +4,8 @@ route for handling State objects and operations
 """
 from flask import jsonify, abort, request
 from api.v1.views import app_views, storage
+from api.v1.views.conditional import object_response
+from api.v1.views.listing import list_objects
 from models.state import State
 
 
@@ -13,12 +15,7 @@ def state_get_all():
     retrieves all State objects
     returns json of all states
     """
-    state_list = []
-    state_obj = storage.all(State)
-    for obj in state_obj.values():
-        state_list.append(obj.to_json())
-
-    return jsonify(state_list)
+    return list_objects(State, dump=State.to_json)
 
 
 @app_views.route("/states", methods=["POST"], strict_slashes=False)
@@ -48,13 +45,7 @@ def state_by_id(state_id):
     param state_id: state object id
     return: state obj with the specified id or error
     """
-
-    fetched_obj = storage.get(State, str(state_id))
-
-    if fetched_obj is None:
-        abort(404)
-
-    return jsonify(fetched_obj.to_json())
+    return object_response(State, state_id, dump=State.to_json)
 
 
 @app_views.route("/states/<state_id>",  methods=["PUT"], strict_slashes=False)
@@ -6,6 +6,8 @@ from flask import Flask, jsonify, abort, request
 from models import storage
 from models.user import User
 from api.v1.views import app_views
+from api.v1.views.conditional import object_response
+from api.v1.views.listing import list_objects
 
 
 @app_views.route("/users", methods=["GET"],
@@ -14,12 +16,22 @@ def get_users():
     """
     Retrieves the list of all User objects.
     ---
+    parameters:
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: maximum number of User objects to return
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: id of the last User of the previous page
     responses:
       200:
         description: List of User objects
     """
-    users = storage.all(User).values()
-    return jsonify([user.to_dict() for user in users])
+    return list_objects(User)
 
 
 @app_views.route("/users/<user_id>", methods=["GET"],
@@ -35,10 +47,7 @@ def get_user(user_id):
         required: true
         description: ID of the User
     """
-    user = storage.get(User, user_id)
-    if not user:
-        abort(404)
-    return jsonify(user.to_dict())
+    return object_response(User, user_id)
 
 
 @app_views.route("/users/<user_id>", methods=["DELETE"],
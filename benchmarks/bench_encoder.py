@@ -0,0 +1,48 @@
+#!/usr/bin/python3
+"""
+Compares the old and new encoding of a /users listing
+old: strftime() in to_dict() and pretty printed, key sorted json.dumps
+new: isoformat() in to_dict() and api.v1.encoder.dumps (compact)
+usage: python3 -m benchmarks.bench_encoder [number of users]
+"""
+import json
+import sys
+import timeit
+from api.v1 import encoder
+from models.user import User
+
+time_fmt = "%Y-%m-%dT%H:%M:%S.%f"
+
+
+def old_to_dict(obj):
+    """BaseModel.to_dict() as it was, formatting dates with strftime"""
+    new_dict = obj.__dict__.copy()
+    new_dict["created_at"] = new_dict["created_at"].strftime(time_fmt)
+    new_dict["updated_at"] = new_dict["updated_at"].strftime(time_fmt)
+    new_dict["__class__"] = obj.__class__.__name__
+    return new_dict
+
+
+def old_encode(users):
+    """what jsonify() did with JSONIFY_PRETTYPRINT_REGULAR"""
+    return json.dumps([old_to_dict(u) for u in users], indent=2,
+                      sort_keys=True)
+
+
+def new_encode(users):
+    """what jsonify() does through the HBNBJSONProvider"""
+    return encoder.dumps([u.to_dict() for u in users])
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    users = [User(email="user{}@hbnb.io".format(i), password="pwd",
+                  first_name="First{}".format(i), last_name="Last")
+             for i in range(n)]
+    assert json.loads(old_encode(users[:10])) == \
+        json.loads(new_encode(users[:10]))
+    print("{} users, encoder: {}".format(n, encoder.ENCODER))
+    for name, func in (("old", old_encode), ("new", new_encode)):
+        best = min(timeit.repeat(lambda: func(users), number=1, repeat=5))
+        print("{:>4}: {:8.1f} ms  {:>10} bytes".format(
+            name, best * 1000, len(func(users))))
@@ -0,0 +1,51 @@
+#!/usr/bin/python3
+"""
+Measures saving and loading the FileStorage snapshot in every format
+(HBNB_FILE_FORMAT=json|msgpack|pickle) on a generated dataset
+usage: python3 -m benchmarks.bench_formats [number of objects]
+"""
+import os
+import sys
+import tempfile
+import time
+from models.engine.file_storage import (FileStorage, decode_snapshot,
+                                        encode_snapshot, file_formats,
+                                        msgpack)
+from models.review import Review
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    json_objects = {"Review." + r.id: r.to_dict()
+                    for r in (Review(place_id="p", user_id="u",
+                                     text="review {}".format(i))
+                              for i in range(n))}
+    path = os.path.join(tempfile.mkdtemp(), "file.json")
+    FileStorage._FileStorage__file_path = path
+
+    print("{} objects".format(n))
+    print("{:8s} {:>10s} {:>10s} {:>10s} {:>10s}".format(
+        "format", "size MB", "save ms", "decode ms", "reload ms"))
+    for file_format in file_formats:
+        if file_format == "msgpack" and msgpack is None:
+            print("{:8s} (msgpack is not installed)".format(file_format))
+            continue
+        start = time.perf_counter()
+        with open(path, "wb") as f:
+            f.write(encode_snapshot(json_objects, file_format))
+        save = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with open(path, "rb") as f:
+            decode_snapshot(f.read(), file_format == "pickle")
+        decode = time.perf_counter() - start
+
+        FileStorage().reset(format=file_format)
+        start = time.perf_counter()
+        FileStorage().reload()
+        reload = time.perf_counter() - start
+
+        print("{:8s} {:10.1f} {:10.1f} {:10.1f} {:10.1f}".format(
+            file_format, os.path.getsize(path) / 2 ** 20, save * 1000,
+            decode * 1000, reload * 1000))
+    os.remove(path)
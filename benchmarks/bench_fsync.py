@@ -0,0 +1,44 @@
+#!/usr/bin/python3
+"""
+Measures FileStorage.save() under every HBNB_FILE_FSYNC policy, with full
+rewrites and with the journal (HBNB_FILE_JOURNAL=1)
+run it on the disk the store lives on, /tmp is often in memory
+usage: python3 -m benchmarks.bench_fsync [number of saves] [directory]
+"""
+import os
+import sys
+import tempfile
+import time
+from models.engine.file_storage import FileStorage
+from models.state import State
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    directory = tempfile.mkdtemp(dir=sys.argv[2] if len(sys.argv) > 2
+                                 else None)
+    path = os.path.join(directory, "file.json")
+    FileStorage._FileStorage__file_path = path
+    storage = FileStorage()
+    for i in range(1000):
+        storage.new(State(name="state {}".format(i)))
+
+    print("{} saves, 1000 objects in the store".format(n))
+    for journal in (False, True):
+        for policy in ("always", "batched", "never"):
+            FileStorage._FileStorage__journal = journal
+            FileStorage._FileStorage__fsync = policy
+            storage.save()
+            state = State(name="bench")
+            start = time.perf_counter()
+            for i in range(n):
+                state.name = str(i)
+                storage.new(state)
+                storage.save()
+            elapsed = time.perf_counter() - start
+            print("{:8s} {:8s} {:8.3f} ms/save".format(
+                "journal" if journal else "rewrite", policy,
+                elapsed / n * 1000))
+    for name in os.listdir(directory):
+        os.remove(os.path.join(directory, name))
+    os.rmdir(directory)
@@ -0,0 +1,76 @@
+#!/usr/bin/python3
+"""
+Measures FileStorage.near() and within() against sorting every place by
+distance, over places clustered around a few cities
+usage: python3 -m benchmarks.bench_geo [number of places]
+"""
+import random
+import sys
+import time
+from models.engine.file_storage import FileStorage
+from models.engine.geo import haversine, in_box
+from models.place import Place
+
+CENTERS = [(48.8566, 2.3522), (40.7128, -74.006), (35.6762, 139.6503),
+           (-33.8688, 151.2093), (-23.5505, -46.6333)]
+
+
+def scan_near(storage, lat, lng, radius, limit):
+    """places within radius of a point, by sorting all of them"""
+    found = []
+    for place in storage.all(Place).values():
+        distance = haversine(lat, lng, place.latitude, place.longitude)
+        if radius is None or distance <= radius:
+            found.append((distance, place.id))
+    return sorted(found)[:limit]
+
+
+def scan_within(storage, box):
+    """ids of the places inside a box, by looking at all of them"""
+    return sorted(place.id for place in storage.all(Place).values()
+                  if in_box(place.latitude, place.longitude, box))
+
+
+def timed(function, repeat=5):
+    """best time in ms of repeat calls, and the result of the last one"""
+    best = None
+    for i in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000, result
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rand = random.Random(0)
+    storage = FileStorage()
+    start = time.perf_counter()
+    places = []
+    for i in range(n):
+        lat, lng = rand.choice(CENTERS)
+        places.append(Place(city_id="city", user_id="user",
+                            name="place {}".format(i),
+                            latitude=max(-90, min(90, rand.gauss(lat, 0.5))),
+                            longitude=rand.gauss(lng, 0.5)))
+    storage.bulk_new(places)
+    print("{} places indexed in {:.1f} s".format(
+        n, time.perf_counter() - start))
+
+    queries = [("10 nearest", None, 10), ("1 km radius", 1, None),
+               ("20 km radius, 50 nearest", 20, 50)]
+    for label, radius, limit in queries:
+        indexed, found = timed(lambda: storage.near(
+            Place, 48.8566, 2.3522, radius=radius, limit=limit))
+        naive, expected = timed(lambda: scan_near(
+            storage, 48.8566, 2.3522, radius, limit), repeat=1)
+        assert [place.id for d, place in found] == [id for d, id in expected]
+        print("{:26s} {:7d} places  scan {:8.1f} ms  index {:7.2f} ms".format(
+            label, len(found), naive, indexed))
+    box = (48.7, 2.2, 49.0, 2.5)
+    indexed, found = timed(lambda: storage.within(Place, box))
+    naive, expected = timed(lambda: scan_within(storage, box), repeat=1)
+    assert sorted(place.id for d, place in found) == expected
+    print("{:26s} {:7d} places  scan {:8.1f} ms  index {:7.2f} ms".format(
+        "bounding box", len(found), naive, indexed))
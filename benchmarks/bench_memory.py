@@ -0,0 +1,57 @@
+#!/usr/bin/python3
+"""
+Measures the memory FileStorage holds for a generated file.json
+compares model instances (default) with packed tuples (HBNB_FILE_PACKED=1)
+usage: python3 -m benchmarks.bench_memory [number of objects]
+"""
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from models.engine.file_storage import FileStorage
+from models.place import Place
+from models.review import Review
+
+
+def measure(path, packed):
+    """reloads path into an empty FileStorage, returns the bytes held"""
+    FileStorage().reset(path, packed=packed)
+    gc.collect()
+    tracemalloc.start()
+    FileStorage().reload()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    places = [Place(city_id="c{}".format(i % 50), user_id="u{}".format(i),
+                    name="place {}".format(i)) for i in range(n // 10)]
+    reviews = [Review(place_id=places[i % len(places)].id,
+                      user_id="u{}".format(i % 1000),
+                      text="review {}".format(i)) for i in range(n)]
+    path = os.path.join(tempfile.mkdtemp(), "file.json")
+    with open(path, "w") as f:
+        json.dump({type(o).__name__ + "." + o.id: o.to_dict()
+                   for o in places + reviews}, f)
+    del places, reviews
+    FileStorage._FileStorage__file_path = path
+
+    print("{} reviews, {} places".format(n, n // 10))
+    for label, packed in (("instances", False), ("packed", True)):
+        size = measure(path, packed)
+        print("{:10s} {:8.1f} MB  ({:.0f} bytes/object)".format(
+            label, size / 2 ** 20, size / (n + n // 10)))
+
+    storage = FileStorage()
+    key = next(iter(storage.all(Review)))
+    start = time.perf_counter()
+    for i in range(10000):
+        storage.get(Review, key.split(".", 1)[1])
+    print("packed get(): {:.2f} us".format(
+        (time.perf_counter() - start) / 10000 * 1e6))
+    os.remove(path)
@@ -0,0 +1,73 @@
+#!/usr/bin/python3
+"""
+Compares FileStorage with MmapStorage (HBNB_TYPE_STORAGE=mmap) on a
+generated dataset: open time, peak RSS and get() latency, each engine
+measured in its own process
+usage: python3 -m benchmarks.bench_mmap [number of objects]
+"""
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def measure(engine, directory):
+    """opens the dataset of directory with engine and prints the numbers"""
+    from models.engine.file_storage import FileStorage
+    from models.engine.mmap_storage import MmapStorage
+    from models.review import Review
+
+    start = time.perf_counter()
+    if engine == "file":
+        FileStorage._FileStorage__file_path = os.path.join(directory,
+                                                           "file.json")
+        storage = FileStorage()
+    else:
+        storage = MmapStorage(os.path.join(directory, "file.mmap"))
+    storage.reload()
+    opened = time.perf_counter() - start
+
+    with open(os.path.join(directory, "sample.txt")) as f:
+        sample = f.read().split()
+    start = time.perf_counter()
+    for id in sample:
+        storage.get(Review, id)
+    get = (time.perf_counter() - start) / len(sample)
+    with open("/proc/self/status") as f:
+        rss = int(next(line for line in f
+                       if line.startswith("VmHWM")).split()[1])
+    print("{:6s} open {:8.1f} ms  peak RSS {:7.1f} MB  get {:6.2f} us".format(
+        engine, opened * 1000, rss / 1024, get * 1e6))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "--measure":
+        measure(sys.argv[2], sys.argv[3])
+        sys.exit(0)
+    from models.engine.mmap_storage import MmapStorage
+    from models.review import Review
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    directory = tempfile.mkdtemp()
+    reviews = [Review(place_id="p", user_id="u", text="review {}".format(i))
+               for i in range(n)]
+    with open(os.path.join(directory, "sample.txt"), "w") as f:
+        f.write("\n".join(random.choice(reviews).id for i in range(10000)))
+    with open(os.path.join(directory, "file.json"), "w") as f:
+        json.dump({"Review." + r.id: r.to_dict() for r in reviews}, f)
+    storage = MmapStorage(os.path.join(directory, "file.mmap"))
+    storage.reload()
+    storage.bulk_new(reviews)
+    storage.save()
+    del reviews, storage
+
+    print("{} objects".format(n))
+    for engine in ("file", "mmap"):
+        subprocess.run([sys.executable, "-m", "benchmarks.bench_mmap",
+                        "--measure", engine, directory], check=True)
+    for name in os.listdir(directory):
+        os.remove(os.path.join(directory, name))
+    os.rmdir(directory)
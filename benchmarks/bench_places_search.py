@@ -0,0 +1,80 @@
+#!/usr/bin/python3
+"""
+Measures FileStorage.search_places() against the walk a client does
+without it: cities of each state, places of each city, then the amenities
+of each place, over a synthetic dataset held in memory
+usage: python3 -m benchmarks.bench_places_search [number of places]
+"""
+import random
+import sys
+import time
+from models.amenity import Amenity
+from models.city import City
+from models.engine.file_storage import FileStorage
+from models.place import Place
+from models.state import State
+
+
+def walk(storage, states, amenities):
+    """places of states having all amenities, one lookup at a time"""
+    places = []
+    for state_id in states:
+        for city in storage.children(City, "state_id", state_id):
+            for place in storage.children(Place, "city_id", city.id):
+                if set(amenities).issubset(place.amenity_ids):
+                    places.append(place)
+    return sorted(places, key=lambda place: place.id)
+
+
+def timed(function, repeat=5):
+    """best time in ms of repeat calls, and the result of the last one"""
+    best = None
+    for i in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000, result
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rand = random.Random(0)
+    storage = FileStorage()
+    states = [State(name="state {}".format(i)) for i in range(50)]
+    cities = [City(state_id=states[i % 50].id, name="city {}".format(i))
+              for i in range(max(n // 200, 50))]
+    amenities = [Amenity(name="amenity {}".format(i)) for i in range(40)]
+    start = time.perf_counter()
+    storage.bulk_new(states + cities + amenities)
+    storage.bulk_new(
+        Place(city_id=rand.choice(cities).id, user_id="user",
+              name="place {}".format(i),
+              amenity_ids=[a.id for a in rand.sample(amenities, 8)])
+        for i in range(n))
+    print("{} places, {} cities, loaded in {:.1f} s".format(
+        n, len(cities), time.perf_counter() - start))
+
+    queries = [
+        ("1 state", [states[0].id], []),
+        ("1 state, 2 amenities", [states[0].id],
+         [amenities[0].id, amenities[1].id]),
+        ("10 states, 1 amenity", [s.id for s in states[:10]],
+         [amenities[0].id]),
+        ("3 amenities", [], [a.id for a in amenities[:3]]),
+    ]
+    for label, state_ids, amenity_ids in queries:
+        indexed, (found, cursor) = timed(lambda: storage.search_places(
+            states=state_ids, amenities=amenity_ids))
+        if state_ids:
+            naive, expected = timed(lambda: walk(storage, state_ids,
+                                                 amenity_ids), repeat=1)
+            assert [p.id for p in found] == [p.id for p in expected]
+            naive = "{:10.1f} ms".format(naive)
+        else:
+            naive = "{:>13s}".format("-")
+        paged, result = timed(lambda: storage.search_places(
+            states=state_ids, amenities=amenity_ids, limit=50))
+        print("{:22s} {:7d} places  walk {}  search {:8.1f} ms  "
+              "first page {:6.2f} ms".format(label, len(found), naive,
+                                             indexed, paged))
@@ -0,0 +1,68 @@
+#!/usr/bin/python3
+"""
+Measures range filters and ordering by price in FileStorage.page() against
+pulling every place of the class and filtering it, as clients had to
+usage: python3 -m benchmarks.bench_ranges [number of places]
+"""
+import random
+import sys
+import time
+from models.engine.file_storage import FileStorage
+from models.place import Place
+
+
+def scan(storage, ranges, order, limit):
+    """first page of the places within ranges, by looking at all of them"""
+    found = [place for place in storage.all(Place).values()
+             if all(low <= getattr(place, attr) <= high
+                    for attr, (low, high) in ranges.items())]
+    if order is None:
+        found.sort(key=lambda place: place.id)
+    else:
+        found.sort(key=lambda place: (getattr(place, order), place.id))
+    return [place.id for place in found[:limit]]
+
+
+def timed(function, repeat=5):
+    """best time in ms of repeat calls, and the result of the last one"""
+    best = None
+    for i in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000, result
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rand = random.Random(0)
+    storage = FileStorage()
+    storage.bulk_new(Place(city_id="city", user_id="user",
+                           name="place {}".format(i),
+                           price_by_night=rand.randint(20, 500),
+                           max_guest=rand.randint(1, 12),
+                           number_rooms=rand.randint(0, 6))
+                     for i in range(n))
+    start = time.perf_counter()
+    storage.page(Place, order="price_by_night", limit=1)
+    print("{} places, price index built in {:.1f} ms".format(
+        n, (time.perf_counter() - start) * 1000))
+
+    queries = [
+        ("cheapest first", {}, "price_by_night"),
+        ("price 100-120", {"price_by_night": (100, 120)}, None),
+        ("price 100-120, 8+ guests",
+         {"price_by_night": (100, 120), "max_guest": (8, 12)},
+         "price_by_night"),
+        ("10+ guests, 5+ rooms",
+         {"max_guest": (10, 12), "number_rooms": (5, 6)}, "price_by_night"),
+    ]
+    for label, ranges, order in queries:
+        indexed, (objs, cursor) = timed(lambda: storage.page(
+            Place, limit=50, ranges=ranges, order=order))
+        naive, expected = timed(lambda: scan(storage, ranges, order, 50),
+                                repeat=1)
+        assert [obj.id for obj in objs] == expected
+        print("{:26s} scan {:8.1f} ms  index {:7.2f} ms".format(
+            label, naive, indexed))
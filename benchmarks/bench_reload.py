@@ -0,0 +1,62 @@
+#!/usr/bin/python3
+"""
+Measures FileStorage.reload() on a generated file.json
+compares rebuilding objects with cls(**dict) and strptime (old path)
+against BaseModel.from_storage_dict() (new path)
+usage: python3 -m benchmarks.bench_reload [number of objects]
+"""
+from datetime import datetime
+import json
+import os
+import sys
+import tempfile
+import time
+from models.engine.file_storage import FileStorage, classes
+from models.review import Review
+
+time_fmt = "%Y-%m-%dT%H:%M:%S.%f"
+
+
+def old_hydrate(obj_dict):
+    """BaseModel.__init__ as it was: setattr loop and two strptime()"""
+    obj = classes[obj_dict["__class__"]].__new__(
+        classes[obj_dict["__class__"]])
+    for key, value in obj_dict.items():
+        if key != "__class__":
+            setattr(obj, key, value)
+    obj.created_at = datetime.strptime(obj_dict["created_at"], time_fmt)
+    obj.updated_at = datetime.strptime(obj_dict["updated_at"], time_fmt)
+    return obj
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    path = os.path.join(tempfile.mkdtemp(), "file.json")
+    with open(path, "w") as f:
+        json.dump({"Review." + r.id: r.to_dict()
+                   for r in (Review(place_id="p", user_id="u",
+                                    text="review {}".format(i))
+                             for i in range(n))}, f)
+    with open(path) as f:
+        jo = json.load(f)
+
+    start = time.perf_counter()
+    for key in jo:
+        old_hydrate(jo[key])
+    old = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for key in jo:
+        classes[jo[key]["__class__"]].from_storage_dict(jo[key])
+    new = time.perf_counter() - start
+
+    FileStorage._FileStorage__file_path = path
+    start = time.perf_counter()
+    FileStorage().reload()
+    total = time.perf_counter() - start
+
+    print("{} objects".format(n))
+    print("hydration, old: {:8.1f} ms".format(old * 1000))
+    print("hydration, new: {:8.1f} ms".format(new * 1000))
+    print("full reload():  {:8.1f} ms".format(total * 1000))
+    os.remove(path)
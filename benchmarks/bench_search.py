@@ -0,0 +1,64 @@
+#!/usr/bin/python3
+"""
+Measures the full-text index of FileStorage: time to build it for
+generated reviews, time to keep it up to date on new(), and query latency
+against scanning every review for the words
+usage: python3 -m benchmarks.bench_search [number of reviews]
+"""
+import random
+import sys
+import time
+from models.engine.file_storage import FileStorage
+from models.engine.text import tokenize
+from models.review import Review
+
+
+def scan(storage, query):
+    """reviews holding every word of query, by tokenizing all of them"""
+    words = set(tokenize(query))
+    return [review for review in storage.all(Review).values()
+            if words.issubset(tokenize(review.text))]
+
+
+def timed(function, repeat=5):
+    """best time in ms of repeat calls, and the result of the last one"""
+    best = None
+    for i in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000, result
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rand = random.Random(0)
+    # a vocabulary whose word frequencies fall off like natural language
+    vocabulary = ["word{}".format(i) for i in range(20000)]
+    weights = [1 / (i + 1) for i in range(len(vocabulary))]
+    storage = FileStorage()
+    storage.bulk_new(Review(place_id="place", user_id="user",
+                            text=" ".join(rand.choices(vocabulary, weights,
+                                                       k=rand.randint(5,
+                                                                      60))))
+                     for i in range(n))
+
+    start = time.perf_counter()
+    storage.search("word0", limit=1)
+    print("{} reviews, index built in {:.2f} s".format(
+        n, time.perf_counter() - start))
+    reviews = [Review(place_id="place", user_id="user",
+                      text="word1 word2 word3000") for i in range(1000)]
+    start = time.perf_counter()
+    for review in reviews:
+        storage.new(review)
+    print("new() with the index: {:.1f} us/review".format(
+        (time.perf_counter() - start) * 1000))
+
+    for query in ("word19999", "word500 word900", "word5 word10",
+                  "word0"):
+        indexed, found = timed(lambda: storage.search(query, limit=20))
+        naive, matching = timed(lambda: scan(storage, query), repeat=1)
+        print("{:18s} {:7d} matching  scan {:8.1f} ms  top 20 {:7.2f} ms"
+              .format(query, len(matching), naive, indexed))
@@ -0,0 +1,97 @@
+#!/usr/bin/python3
+"""
+Stress test of the API with parallel readers and writers going through
+the Flask test client, as app.run(threaded=True) would run them
+counts requests per second and failed requests (5xx or exceptions)
+usage: python3 -m benchmarks.bench_threads [seconds] [readers] [writers]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from api.v1.app import app
+from models import storage
+from models.state import State
+
+errors = []
+done = {"read": 0, "write": 0}
+counter_lock = threading.Lock()
+
+
+def run(client, method, url, **kwargs):
+    """sends one request and records failures"""
+    try:
+        resp = getattr(client, method)(url, **kwargs)
+    except Exception:
+        errors.append(traceback.format_exc(limit=1))
+        return None
+    if resp.status_code >= 500:
+        errors.append("{} {} -> {}".format(method, url, resp.status_code))
+    return resp
+
+
+def reader(state_id, stop):
+    """lists cities, states and counts until stop is set"""
+    client = app.test_client()
+    n = 0
+    while not stop.is_set():
+        run(client, "get", "/api/v1/states/{}/cities".format(state_id))
+        run(client, "get", "/api/v1/states")
+        run(client, "get", "/api/v1/stats")
+        n += 3
+    with counter_lock:
+        done["read"] += n
+
+
+def writer(state_id, stop):
+    """creates, updates and deletes cities until stop is set"""
+    client = app.test_client()
+    n = 0
+    while not stop.is_set():
+        resp = run(client, "post",
+                   "/api/v1/states/{}/cities".format(state_id),
+                   json={"name": "city"})
+        if resp is not None and resp.status_code == 201:
+            city_id = resp.get_json()["id"]
+            run(client, "put", "/api/v1/cities/{}".format(city_id),
+                json={"name": "renamed"})
+            run(client, "delete", "/api/v1/cities/{}".format(city_id))
+        n += 3
+    with counter_lock:
+        done["write"] += n
+
+
+if __name__ == "__main__":
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    readers = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    writers = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+    os.chdir(tempfile.mkdtemp())
+    storage._FileStorage__file_path = "file.json"
+    state = State(name="bench")
+    state.save()
+
+    stop = threading.Event()
+    threads = [threading.Thread(target=reader, args=(state.id, stop))
+               for i in range(readers)]
+    threads += [threading.Thread(target=writer, args=(state.id, stop))
+                for i in range(writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    print("{} readers, {} writers, {:.0f} s".format(readers, writers,
+                                                    seconds))
+    print("reads:  {:8.0f} requests/s".format(done["read"] / seconds))
+    print("writes: {:8.0f} requests/s".format(done["write"] / seconds))
+    print("failed: {}".format(len(errors)))
+    for error in sorted(set(errors))[:5]:
+        print("  " + error.strip().splitlines()[-1])
+    # waits for a compaction running in the background
+    storage.compact(wait=True)
+    for name in os.listdir("."):
+        os.remove(name)
@@ -96,7 +96,7 @@ class HBNBCommand(cmd.Cmd):
             if len(args) > 1:
                 key = args[0] + "." + args[1]
                 if key in models.storage.all():
-                    models.storage.all().pop(key)
+                    models.storage.delete(models.storage.all()[key])
                     models.storage.save()
                 else:
                     print("** no instance found **")
@@ -122,6 +122,21 @@ class HBNBCommand(cmd.Cmd):
         print(", ".join(obj_list), end="")
         print("]")
 
+    def do_convert(self, arg):
+        """Rewrites the storage file in another format (json, msgpack...)"""
+        args = arg.split()
+        if not hasattr(models.storage, "convert"):
+            print("** file storage only **")
+        elif len(args) == 0:
+            print("** format missing **")
+        else:
+            try:
+                models.storage.convert(args[0])
+            except ValueError:
+                print("** unknown format **")
+            except ImportError as e:
+                print("** {} **".format(e))
+
     def do_update(self, arg):
         """Update an instance based on the class name, id, attribute & value"""
         args = shlex.split(arg)
@@ -147,8 +162,9 @@ class HBNBCommand(cmd.Cmd):
                                         args[3] = float(args[3])
                                     except Exception:
                                         args[3] = 0.0
-                            setattr(models.storage.all()[k], args[2], args[3])
-                            models.storage.all()[k].save()
+                            obj = models.storage.all()[k]
+                            setattr(obj, args[2], args[3])
+                            obj.save()
                         else:
                             print("** value missing **")
                     else:
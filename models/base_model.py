@@ -19,6 +19,14 @@ else:
     Base = object
 
 
+def parse_time(value):
+    """parses a timestamp written by to_dict()"""
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return datetime.strptime(value, time)
+
+
 class BaseModel:
     """The BaseModel class from which future classes will be derived"""
     if models.storage_t == "db":
@@ -33,11 +41,11 @@ class BaseModel:
                 if key != "__class__":
                     setattr(self, key, value)
             if kwargs.get("created_at", None) and type(self.created_at) is str:
-                self.created_at = datetime.strptime(kwargs["created_at"], time)
+                self.created_at = parse_time(kwargs["created_at"])
             else:
                 self.created_at = datetime.utcnow()
             if kwargs.get("updated_at", None) and type(self.updated_at) is str:
-                self.updated_at = datetime.strptime(kwargs["updated_at"], time)
+                self.updated_at = parse_time(kwargs["updated_at"])
             else:
                 self.updated_at = datetime.utcnow()
             if kwargs.get("id", None) is None:
@@ -47,6 +55,26 @@ class BaseModel:
             self.created_at = datetime.utcnow()
             self.updated_at = self.created_at
 
+    @classmethod
+    def from_storage_dict(cls, obj_dict):
+        """
+        rebuilds an instance from a dictionary made by to_dict()
+        the timestamps may already be datetimes
+        """
+        if (models.storage_t == "db" or "id" not in obj_dict or
+                type(obj_dict.get("created_at")) not in (str, datetime) or
+                type(obj_dict.get("updated_at")) not in (str, datetime)):
+            return cls(**obj_dict)
+        obj = cls.__new__(cls)
+        attrs = obj.__dict__
+        attrs.update(obj_dict)
+        attrs.pop("__class__", None)
+        if type(attrs["created_at"]) is str:
+            attrs["created_at"] = parse_time(attrs["created_at"])
+        if type(attrs["updated_at"]) is str:
+            attrs["updated_at"] = parse_time(attrs["updated_at"])
+        return obj
+
     def __str__(self):
         """String representation of the BaseModel class"""
         return "[{:s}] ({:s}) {}".format(self.__class__.__name__, self.id,
@@ -62,9 +90,11 @@ class BaseModel:
         """returns a dictionary containing all keys/values of the instance"""
         new_dict = self.__dict__.copy()
         if "created_at" in new_dict:
-            new_dict["created_at"] = new_dict["created_at"].strftime(time)
+            new_dict["created_at"] = new_dict["created_at"].isoformat(
+                timespec="microseconds")
         if "updated_at" in new_dict:
-            new_dict["updated_at"] = new_dict["updated_at"].strftime(time)
+            new_dict["updated_at"] = new_dict["updated_at"].isoformat(
+                timespec="microseconds")
         new_dict["__class__"] = self.__class__.__name__
         if "_sa_instance_state" in new_dict:
             del new_dict["_sa_instance_state"]
@@ -0,0 +1,83 @@
+#!/usr/bin/python3
+"""
+Contains the LRUCache class
+"""
+
+from collections import OrderedDict
+import threading
+import time
+
+
+class LRUCache:
+    """size-bounded mapping that drops least recently used and old entries"""
+
+    def __init__(self, maxsize=10000, ttl=0):
+        """
+        initializes an empty cache
+        param maxsize: maximum number of entries, 0 disables the cache
+        param ttl: seconds an entry stays valid, 0 for no expiry
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+        self.__stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key):
+        """
+        looks up an entry and marks it as recently used
+        param key: key of the entry
+        return: value or None if missing or expired
+        """
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                self.__stats["misses"] += 1
+                return None
+            value, expires = entry
+            if expires is not None and expires <= time.monotonic():
+                del self.__entries[key]
+                self.__stats["misses"] += 1
+                return None
+            self.__entries.move_to_end(key)
+            self.__stats["hits"] += 1
+            return value
+
+    def set(self, key, value):
+        """
+        stores an entry, evicting the least recently used one if full
+        param key: key of the entry
+        param value: value to store
+        """
+        if self.maxsize <= 0:
+            return
+        expires = time.monotonic() + self.ttl if self.ttl > 0 else None
+        with self.__lock:
+            self.__entries[key] = (value, expires)
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.maxsize:
+                self.__entries.popitem(last=False)
+                self.__stats["evictions"] += 1
+
+    def discard(self, key):
+        """
+        removes an entry if present
+        param key: key of the entry
+        """
+        with self.__lock:
+            self.__entries.pop(key, None)
+
+    def clear(self):
+        """removes every entry"""
+        with self.__lock:
+            self.__entries.clear()
+
+    def stats(self):
+        """
+        counters of the cache
+        return: dictionary of hits, misses, evictions and current size
+        """
+        with self.__lock:
+            stats = dict(self.__stats)
+            stats["size"] = len(self.__entries)
+        return stats
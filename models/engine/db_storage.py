@@ -3,18 +3,26 @@
 Contains the class DBStorage
 """
 
+from datetime import datetime
 import models
 from models.amenity import Amenity
 from models.base_model import BaseModel, Base
 from models.city import City
+from models.engine.cache import LRUCache
+from models.engine.geo import EARTH_RADIUS, bounding_box, box_center
+from models.engine.geo import haversine
 from models.place import Place
 from models.review import Review
 from models.state import State
 from models.user import User
+from math import pi
 from os import getenv
 import sqlalchemy
-from sqlalchemy import create_engine
-from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy import and_, create_engine, event, func, literal, or_
+from sqlalchemy import select
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.orm import scoped_session, sessionmaker, selectinload
+import time
 
 classes = {"Amenity": Amenity, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
@@ -24,6 +32,14 @@ class DBStorage:
     """interaacts with the MySQL database"""
     __engine = None
     __session = None
+    # tuple - (expiry time, counts by class name) served by counts()
+    __counts_cache = None
+    # LRUCache - to_dict() of objects fetched by get_dict(), by key
+    __cache = LRUCache(int(getenv('HBNB_CACHE_SIZE', 10000)),
+                       float(getenv('HBNB_CACHE_TTL', 30)))
+    # dictionary - connection pool events counted since start
+    __pool_events = {"checkouts": 0, "connects": 0, "invalidations": 0,
+                     "overflow_checkouts": 0, "saturated_checkouts": 0}
 
     def __init__(self):
         """Instantiate a DBStorage object"""
@@ -32,28 +48,73 @@ class DBStorage:
         HBNB_MYSQL_HOST = getenv('HBNB_MYSQL_HOST')
         HBNB_MYSQL_DB = getenv('HBNB_MYSQL_DB')
         HBNB_ENV = getenv('HBNB_ENV')
-        self.__engine = create_engine('mysql+mysqldb://{}:{}@{}/{}'.
-                                      format(HBNB_MYSQL_USER,
-                                             HBNB_MYSQL_PWD,
-                                             HBNB_MYSQL_HOST,
-                                             HBNB_MYSQL_DB))
+        self.__max_overflow = int(getenv('HBNB_MYSQL_MAX_OVERFLOW', 10))
+        self.__engine = create_engine(
+            'mysql+mysqldb://{}:{}@{}/{}'.format(HBNB_MYSQL_USER,
+                                                 HBNB_MYSQL_PWD,
+                                                 HBNB_MYSQL_HOST,
+                                                 HBNB_MYSQL_DB),
+            pool_size=int(getenv('HBNB_MYSQL_POOL_SIZE', 5)),
+            max_overflow=self.__max_overflow,
+            pool_timeout=float(getenv('HBNB_MYSQL_POOL_TIMEOUT', 30)),
+            pool_recycle=int(getenv('HBNB_MYSQL_POOL_RECYCLE', 3600)),
+            pool_pre_ping=getenv('HBNB_MYSQL_POOL_PRE_PING', '1') == '1')
+        event.listen(self.__engine, "checkout", self.__on_checkout)
+        event.listen(self.__engine, "connect", self.__on_connect)
+        event.listen(self.__engine, "invalidate", self.__on_invalidate)
         if HBNB_ENV == "test":
             Base.metadata.drop_all(self.__engine)
 
-    def all(self, cls=None):
+    def all(self, cls=None, load=None):
         """query on the current database session"""
         new_dict = {}
         for clss in classes:
             if cls is None or cls is classes[clss] or cls is clss:
-                objs = self.__session.query(classes[clss]).all()
+                query = self.__session.query(classes[clss])
+                if load:
+                    query = query.options(*self.__load_options(classes[clss],
+                                                               load))
+                objs = query.all()
                 for obj in objs:
                     key = obj.__class__.__name__ + '.' + obj.id
                     new_dict[key] = obj
         return (new_dict)
 
+    @staticmethod
+    def __load_options(cls, load):
+        """
+        turns relationship paths into eager loading options
+        :param cls: class the paths start from
+        :param load: list of paths such as "cities" or "cities.places"
+        :return: list of selectinload() options, one SELECT per level
+        """
+        options = []
+        for path in load:
+            option = None
+            owner = cls
+            for name in path.split('.'):
+                attr = getattr(owner, name)
+                if option is None:
+                    option = selectinload(attr)
+                else:
+                    option = option.selectinload(attr)
+                owner = attr.property.mapper.class_
+            options.append(option)
+        return options
+
     def new(self, obj):
         """add the object to the current database session"""
         self.__session.add(obj)
+        self.__uncache(obj)
+
+    def bulk_new(self, objs):
+        """add a list of objects to the current database session"""
+        self.__session.add_all(objs)
+
+    def bulk_delete(self, objs):
+        """delete a list of objects from the current database session"""
+        for obj in objs:
+            self.delete(obj)
 
     def get(self, cls, id):
         """
@@ -64,22 +125,309 @@ class DBStorage:
         """
         return self.__session.query(cls).get(id)
 
+    def get_dict(self, cls, id):
+        """
+        dictionary representation of an object, read through a cache
+        shared by all sessions of the process
+        :param cls: class of object
+        :param id: id of object as string
+        :return: to_dict() of the found object or None
+        """
+        cls = classes.get(cls, cls)
+        key = cls.__name__ + '.' + id
+        obj_dict = self.__cache.get(key)
+        if obj_dict is None:
+            obj = self.get(cls, id)
+            if obj is None:
+                return None
+            obj_dict = obj.to_dict()
+            self.__cache.set(key, obj_dict)
+        return dict(obj_dict)
+
+    def version(self, cls, id):
+        """
+        last modification time of an object, without loading it
+        :param cls: class of object
+        :param id: id of object as string
+        :return: updated_at or None if the object does not exist
+        """
+        cls = classes.get(cls, cls)
+        cached = self.__cache.get(cls.__name__ + '.' + id)
+        if cached is not None:
+            return datetime.fromisoformat(cached["updated_at"])
+        row = self.__session.query(cls.updated_at).filter(cls.id == id) \
+            .first()
+        return None if row is None else row[0]
+
+    def collection_version(self, cls, filter=None):
+        """
+        summary of a collection that changes whenever one of its rows
+        is added, updated or deleted
+        :param cls: class of objects
+        :param filter: dictionary of column values to match
+        :return: tuple (number of rows, latest updated_at or None)
+        """
+        cls = classes.get(cls, cls)
+        query = self.__session.query(func.count(cls.id),
+                                     func.max(cls.updated_at))
+        for column, value in (filter or {}).items():
+            query = query.filter(getattr(cls, column) == value)
+        return tuple(query.one())
+
+    def exists(self, cls, id):
+        """
+        tells whether an object exists, read through the object cache
+        :param cls: class of object
+        :param id: id of object as string
+        :return: True or False
+        """
+        return self.get_dict(cls, id) is not None
+
+    def page(self, cls, after_id=None, limit=None, filter=None,
+             ranges=None, order=None):
+        """
+        slice of the objects of a class, ordered by id
+        :param cls: class of objects
+        :param after_id: only return objects whose id sorts after this one
+        :param limit: maximum number of objects to return
+        :param filter: dictionary of column values to match
+        :param ranges: dictionary of column -> (lowest, highest) value,
+                       None for an open end
+        :param order: column to order by instead of id, "-<column>" for
+                      descending order, after_id and the id to resume
+                      from are then tuples (value, id)
+        :return: tuple (list of objects, id to resume from or None)
+        """
+        cls = classes.get(cls, cls)
+        query = self.__session.query(cls)
+        if filter:
+            query = query.filter_by(**filter)
+        return self.__ranked(query, cls, ranges, order, after_id, limit)
+
+    def search_places(self, states=None, cities=None, amenities=None,
+                      after_id=None, limit=None, ranges=None, order=None):
+        """
+        places of some states or cities having all of some amenities,
+        in a single query
+        :param states: list of State ids
+        :param cities: list of City ids, added to the cities of states
+        :param amenities: list of Amenity ids every place must have
+        :param after_id: only return places whose id sorts after this one
+        :param limit: maximum number of places to return
+        :param ranges, order: as in page()
+        :return: tuple (list of places ordered by id, id to resume from
+                 or None)
+        """
+        query = self.__session.query(Place)
+        if states:
+            query = query.join(City, Place.city_id == City.id).filter(
+                or_(City.state_id.in_(states),
+                    Place.city_id.in_(cities or ())))
+        elif cities:
+            query = query.filter(Place.city_id.in_(cities))
+        if amenities:
+            amenities = set(amenities)
+            links = Base.metadata.tables['place_amenity'].c
+            having = select(links.place_id).where(
+                links.amenity_id.in_(amenities)).group_by(
+                links.place_id).having(
+                func.count(links.amenity_id) == len(amenities))
+            query = query.filter(Place.id.in_(having))
+        return self.__ranked(query, Place, ranges, order, after_id, limit)
+
+    def near(self, cls, lat, lng, radius=None, limit=None):
+        """
+        objects closest to a point: the rows inside the bounding box of
+        the circle are selected on the (latitude, longitude) index, then
+        their exact distances are computed
+        without a radius, the circle grows until limit objects are in it
+        :param cls: class with latitude and longitude columns
+        :param lat: latitude of the center in degrees
+        :param lng: longitude of the center in degrees
+        :param radius: only return objects within radius kilometers
+        :param limit: maximum number of objects to return
+        :return: list of tuples (distance in kilometers, object) ordered by
+                 distance
+        """
+        cls = classes.get(cls, cls)
+        if radius is not None:
+            return self.__near(cls, lat, lng, radius, limit)
+        radius = 25 if limit else pi * EARTH_RADIUS
+        while True:
+            found = self.__near(cls, lat, lng, radius, limit)
+            if len(found) == limit or radius >= pi * EARTH_RADIUS:
+                return found
+            radius *= 4
+
+    def within(self, cls, box, limit=None):
+        """
+        objects inside a box of coordinates, closest to its center first
+        :param cls: class with latitude and longitude columns
+        :param box: tuple (min_lat, min_lng, max_lat, max_lng), min_lng
+                    greater than max_lng crosses the 180th meridian
+        :param limit: maximum number of objects to return
+        :return: list of tuples (distance in kilometers from the center,
+                 object) ordered by distance
+        """
+        cls = classes.get(cls, cls)
+        lat, lng = box_center(box)
+        found = [(haversine(lat, lng, obj.latitude, obj.longitude), obj)
+                 for obj in self.__in_box(cls, box)]
+        found.sort(key=lambda item: (item[0], item[1].id))
+        return found[:limit]
+
+    def search(self, query, cls=None, limit=None):
+        """
+        objects whose FULLTEXT indexed column matches a query, ranked by
+        MySQL natural language relevance
+        words shorter than innodb_ft_min_token_size (3) or that are
+        InnoDB stopwords are not indexed
+        :param query: string
+        :param cls: class to search, None for every class with a
+                    FULLTEXT index
+        :param limit: maximum number of objects to return
+        :return: list of tuples (score, object), best first
+        """
+        columns = {Place: Place.description, Review: Review.text}
+        if cls is not None:
+            cls = classes.get(cls, cls)
+            columns = {cls: columns[cls]} if cls in columns else {}
+        found = []
+        for cls, column in columns.items():
+            score = match(column, against=query).in_natural_language_mode()
+            rows = self.__session.query(cls, score).filter(score > 0) \
+                .order_by(score.desc(), cls.id)
+            if limit is not None:
+                rows = rows.limit(limit)
+            found += [(float(value), obj) for obj, value in rows]
+        found.sort(key=lambda item: (-item[0], item[1].id))
+        return found[:limit]
+
+    def __near(self, cls, lat, lng, radius, limit):
+        """objects within radius kilometers of a point, closest first"""
+        found = []
+        for obj in self.__in_box(cls, bounding_box(lat, lng, radius)):
+            distance = haversine(lat, lng, obj.latitude, obj.longitude)
+            if distance <= radius:
+                found.append((distance, obj))
+        found.sort(key=lambda item: (item[0], item[1].id))
+        return found[:limit]
+
+    def __in_box(self, cls, box):
+        """query of the objects whose coordinates are inside box"""
+        min_lat, min_lng, max_lat, max_lng = box
+        if min_lng <= max_lng:
+            lng = cls.longitude.between(min_lng, max_lng)
+        else:
+            lng = or_(cls.longitude >= min_lng, cls.longitude <= max_lng)
+        return self.__session.query(cls).filter(
+            cls.latitude.between(min_lat, max_lat), lng)
+
+    @staticmethod
+    def __ranked(query, cls, ranges, order, after_id, limit):
+        """
+        adds the ranges, the ordering and the cursor of page() to a query
+        and runs it, fetching one extra row to tell whether there is a
+        next page
+        :return: tuple (list of objects, id to resume from or None)
+        """
+        for attr, (low, high) in (ranges or {}).items():
+            column = getattr(cls, attr)
+            if low is not None:
+                query = query.filter(column >= low)
+            if high is not None:
+                query = query.filter(column <= high)
+        if order is None:
+            if after_id is not None:
+                query = query.filter(cls.id > after_id)
+            query = query.order_by(cls.id)
+        else:
+            column = getattr(cls, order.lstrip('-'))
+            if order.startswith('-'):
+                if after_id is not None:
+                    value, id = after_id
+                    query = query.filter(or_(column < value, and_(
+                        column == value, cls.id < id)))
+                query = query.order_by(column.desc(), cls.id.desc())
+            else:
+                if after_id is not None:
+                    value, id = after_id
+                    query = query.filter(or_(column > value, and_(
+                        column == value, cls.id > id)))
+                query = query.order_by(column, cls.id)
+        if limit is None:
+            return query.all(), None
+        objs = query.limit(limit + 1).all()
+        if len(objs) <= limit:
+            return objs, None
+        last = objs[limit - 1]
+        if order is None:
+            return objs[:limit], last.id
+        return objs[:limit], (getattr(last, order.lstrip('-')), last.id)
+
     def count(self, cls=None):
         """
         count of how many instances of a class
         :param cls: class name
         :return: count of instances of a class
         """
-        return len(self.all(cls))
+        if cls is None:
+            return sum(self.__query_counts().values())
+        cls = classes.get(cls, cls)
+        return self.__session.query(func.count(cls.id)).scalar()
+
+    def counts(self):
+        """
+        count of instances of every class, in a single query
+        results are cached for HBNB_STATS_TTL seconds (default: 0)
+        :return: dictionary of counts by class name
+        """
+        ttl = float(getenv('HBNB_STATS_TTL', 0))
+        cache = self.__counts_cache
+        if ttl > 0 and cache is not None and cache[0] > time.monotonic():
+            return dict(cache[1])
+        counts = self.__query_counts()
+        if ttl > 0:
+            DBStorage.__counts_cache = (time.monotonic() + ttl, counts)
+        return dict(counts)
+
+    def __query_counts(self):
+        """runs one UNION ALL of SELECT COUNT(*) over all tables"""
+        queries = [self.__session.query(literal(name), func.count(cls.id))
+                   for name, cls in classes.items()]
+        rows = queries[0].union_all(*queries[1:]).all()
+        return {name: count for name, count in rows}
 
     def save(self):
         """commit all changes of the current database session"""
-        self.__session.commit()
+        session = self.__session
+        keys = [self.__cache_key(obj) for obj in list(session.new) +
+                list(session.dirty) + list(session.deleted)]
+        session.commit()
+        # only once committed, other sessions could cache the old rows again
+        for key in keys:
+            if key is not None:
+                self.__cache.discard(key)
+        DBStorage.__counts_cache = None
 
     def delete(self, obj=None):
         """delete from the current database session obj if not None"""
         if obj is not None:
             self.__session.delete(obj)
+            self.__uncache(obj)
+
+    def __uncache(self, obj):
+        """drops the cached dictionary of obj"""
+        key = self.__cache_key(obj)
+        if key is not None:
+            self.__cache.discard(key)
+
+    @staticmethod
+    def __cache_key(obj):
+        """key of obj in the cache, None if it has no id yet"""
+        if obj.id is None:
+            return None
+        return obj.__class__.__name__ + '.' + obj.id
 
     def reload(self):
         """reloads data from the database"""
@@ -91,3 +439,44 @@ class DBStorage:
     def close(self):
         """call remove() method on the private session attribute"""
         self.__session.remove()
+
+    def metrics(self):
+        """
+        internal counters of the storage engine
+        :return: dictionary of counters by topic
+        """
+        return {"pool": self.pool_stats(), "cache": self.__cache.stats()}
+
+    def pool_stats(self):
+        """
+        state of the connection pool, to help sizing it
+        :return: dictionary of gauges and event counters
+        """
+        stats = dict(self.__pool_events)
+        pool = self.__engine.pool
+        if hasattr(pool, "checkedout"):
+            stats.update({"size": pool.size(),
+                          "checked_in": pool.checkedin(),
+                          "checked_out": pool.checkedout(),
+                          "overflow": max(pool.overflow(), 0)})
+        return stats
+
+    def __on_checkout(self, dbapi_conn, conn_record, conn_proxy):
+        """counts connections handed out by the pool"""
+        self.__pool_events["checkouts"] += 1
+        pool = self.__engine.pool
+        if not hasattr(pool, "checkedout"):
+            return
+        if pool.checkedout() > pool.size():
+            self.__pool_events["overflow_checkouts"] += 1
+        if pool.checkedout() >= pool.size() + self.__max_overflow:
+            # the next checkout will wait up to pool_timeout
+            self.__pool_events["saturated_checkouts"] += 1
+
+    def __on_connect(self, dbapi_conn, conn_record):
+        """counts new connections opened to MySQL"""
+        self.__pool_events["connects"] += 1
+
+    def __on_invalidate(self, dbapi_conn, conn_record, exception):
+        """counts connections dropped as stale or broken"""
+        self.__pool_events["invalidations"] += 1
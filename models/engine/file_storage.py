@@ -3,18 +3,159 @@
 Contains the FileStorage class
 """
 
+from bisect import bisect_left, bisect_right, insort
 import json
 from models.amenity import Amenity
-from models.base_model import BaseModel
+from models.base_model import BaseModel, parse_time
 from models.city import City
+from models.engine.geo import GridIndex, box_center, haversine
+from models.engine.locks import RWLock
+from models.engine.text import InvertedIndex
 from models.place import Place
 from models.review import Review
 from models.state import State
 from models.user import User
 from datetime import datetime
+import os
+import pickle
+import sys
+import threading
+import time
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
 
 classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
+# attributes holding the id of a parent object, by class name
+foreign_keys = {"City": ("state_id",), "Place": ("city_id", "user_id"),
+                "Review": ("place_id", "user_id")}
+# attributes holding a list of ids of related objects, by class name
+list_keys = {"Place": ("amenity_ids",)}
+# numeric attributes objects can be filtered by range and ordered by
+range_keys = {"Place": ("price_by_night", "max_guest", "number_rooms",
+                        "number_bathrooms")}
+# attributes searched by full-text search, by class name
+text_keys = {"Place": ("description",), "Review": ("text",)}
+# attributes holding the latitude and longitude of an object, by class name
+point_keys = {"Place": ("latitude", "longitude")}
+# size in degrees of the cells of the spatial indexes
+geo_cell = float(os.getenv("HBNB_GEO_CELL", 0.5))
+# attributes stored by position in packed records, by class name
+packed_fields = {"BaseModel": (), "Amenity": ("name",),
+                 "City": ("state_id", "name"),
+                 "Place": ("city_id", "user_id", "name", "description",
+                           "number_rooms", "number_bathrooms", "max_guest",
+                           "price_by_night", "latitude", "longitude",
+                           "amenity_ids"),
+                 "Review": ("place_id", "user_id", "text"),
+                 "State": ("name",),
+                 "User": ("email", "password", "first_name", "last_name")}
+# marks an attribute the object does not have in a packed record
+missing = object()
+# on-disk formats of the snapshot
+file_formats = ("json", "msgpack", "pickle")
+if os.getenv("HBNB_FILE_FORMAT") == "msgpack" and msgpack is None:
+    raise ImportError("HBNB_FILE_FORMAT=msgpack requires the msgpack package")
+
+
+def range_value(name, attr, value):
+    """
+    sort key of a range_keys attribute: numbers as they are, the class
+    default for missing values, anything else before every number
+    """
+    if value is None:
+        value = getattr(classes[name], attr, None)
+    if type(value) not in (int, float):
+        return float("-inf")
+    return value
+
+
+def in_range(value, low, high):
+    """tells whether a sort key from range_value() is in [low, high]"""
+    return value != float("-inf") and \
+        (low is None or value >= low) and (high is None or value <= high)
+
+
+def slice_sorted(entries, after, limit, reverse=False):
+    """
+    page of a sorted list
+    param entries: sorted list of ids or of (value, id) tuples
+    param after: only return entries after this one (before it when
+                 reverse), a list is taken as a tuple
+    param limit: maximum number of entries to return
+    param reverse: walk the list from its end
+    return: tuple (list of entries, last entry if there are more or None)
+    """
+    if type(after) is list:
+        after = tuple(after)
+    if reverse:
+        end = len(entries) if after is None else bisect_left(entries, after)
+        start = 0 if limit is None else max(0, end - limit)
+        page = entries[start:end][::-1]
+        more = start > 0
+    else:
+        start = 0 if after is None else bisect_right(entries, after)
+        end = len(entries) if limit is None else start + limit
+        page = entries[start:end]
+        more = end < len(entries)
+    return page, page[-1] if more and page else None
+
+
+def encode_snapshot(json_objects, file_format):
+    """
+    encodes the dictionaries of all objects
+    param json_objects: dictionary of to_dict() by key
+    param file_format: one of file_formats
+    return: bytes
+    """
+    if file_format == "msgpack":
+        if msgpack is None:
+            raise ImportError("the msgpack format requires msgpack")
+        return msgpack.packb(json_objects)
+    if file_format == "pickle":
+        return pickle.dumps(json_objects, protocol=5)
+    if file_format == "json":
+        return json.dumps(json_objects).encode("utf-8")
+    raise ValueError("unknown file format {}".format(file_format))
+
+
+def snapshot_format(data):
+    """
+    format of an encoded snapshot, guessed from its first bytes
+    param data: bytes
+    return: one of file_formats
+    """
+    if data[:1] == b"\x80" and data[1:2] in (b"\x02", b"\x03", b"\x04",
+                                             b"\x05"):
+        return "pickle"
+    if data.lstrip()[:1] in (b"{", b""):
+        return "json"
+    return "msgpack"
+
+
+def decode_snapshot(data, allow_pickle=False):
+    """
+    decodes a snapshot written in any of file_formats
+    param data: bytes
+    param allow_pickle: accept pickle, which runs code found in the
+                        data, only when HBNB_FILE_FORMAT=pickle asks for it
+    return: dictionary of to_dict() by key
+    raises ValueError for a pickle snapshot that is not allowed
+    """
+    file_format = snapshot_format(data)
+    if file_format == "msgpack":
+        if msgpack is None:
+            raise ImportError("the msgpack format requires msgpack")
+        return msgpack.unpackb(data)
+    if file_format == "pickle":
+        if not allow_pickle:
+            raise ValueError("pickle snapshots are only read with "
+                             "HBNB_FILE_FORMAT=pickle")
+        return pickle.loads(data)
+    return json.loads(data)
 
 
 class FileStorage:
@@ -24,22 +165,99 @@ class FileStorage:
     __file_path = "file.json"
     # dictionary - empty but will store all objects by <class name>.id
     __objects = {}
+    # dictionary - the same objects bucketed by <class name>, then by key
+    __by_class = {}
+    # dictionary - sorted list of the ids in each class bucket
+    __ids = {}
+    # dictionary - (<class name>, foreign key) -> parent id -> key -> obj
+    # also (<class name>, list key) -> id in the list -> key -> obj
+    __children = {}
+    # dictionary - (attribute, id) pairs each object is indexed under
+    __parents = {}
+    # dictionary - spatial index of the coordinates of each class
+    __geo = {}
+    # dictionary - sort keys of the range_keys values of each object
+    __ranks = {}
+    # dictionary - (<class name>, range key) -> sorted list of (value, id)
+    # built on first use, then kept up to date
+    __sorted = {}
+    # dictionary - full-text index of the text_keys of each class, built
+    # on first use, then kept up to date
+    __text = {}
+    # dictionary - (number of objects, latest updated_at) of each class,
+    # computed on first use and dropped whenever the class changes
+    __versions = {}
+    # tuple - (inode, size, mtime) of __file_path when last read or written
+    __file_sig = None
+    # dictionary - how often close() skipped or performed a reload
+    __reload_stats = {"hits": 0, "reloads": 0}
+    # boolean - append changes to __file_path.log instead of a full rewrite
+    __journal = os.getenv("HBNB_FILE_JOURNAL") == "1"
+    # integer - number of journal records that triggers a compaction
+    __compact_every = int(os.getenv("HBNB_FILE_COMPACT_EVERY", 1000))
+    # integer - number of records currently in the journal
+    __log_records = 0
+    # dictionary - objects changed since last save, by key (None if deleted)
+    __dirty = {}
+    # boolean - keep reloaded objects as dictionaries until first access
+    __lazy = os.getenv("HBNB_FILE_LAZY") == "1"
+    # set - keys whose value in __objects is still a dictionary
+    __raw = set()
+    # boolean - hold objects as packed tuples, built when accessed
+    __packed = os.getenv("HBNB_FILE_PACKED") == "1"
+    # dictionary - objects built from packed tuples or given to new() since
+    # the last save() or close(), by key, so that accesses share them
+    __live = {}
+    # string - format snapshots are written in, json and msgpack can always
+    # be read, pickle only when it is this format
+    __format = os.getenv("HBNB_FILE_FORMAT", "json")
+    # string - when writes reach the disk: always, batched or never
+    __fsync = os.getenv("HBNB_FILE_FSYNC", "batched")
+    # float - seconds between two flushes of the journal when batched
+    __fsync_interval = float(os.getenv("HBNB_FILE_FSYNC_INTERVAL", 1))
+    # float - time of the last flush of the journal
+    __last_fsync = 0.0
+    # lock - serializes writers of the JSON file and its journal
+    __lock = threading.RLock()
+    # lock - shared by readers iterating the objects, held alone by new(),
+    # delete() and reload(); single key lookups do not need it
+    __rw = RWLock()
+    # lock - held while a raw dictionary is turned into an object
+    __hydrate_lock = threading.Lock()
+    # lock - held while a compacted snapshot is being written
+    __compact_lock = threading.Lock()
 
-    def all(self, cls=None):
-        """returns the dictionary __objects"""
-        if cls is not None:
-            new_dict = {}
-            for key, value in self.__objects.items():
-                if cls == value.__class__ or cls == value.__class__.__name__:
-                    new_dict[key] = value
-            return new_dict
-        return self.__objects
+    def all(self, cls=None, load=None):
+        """returns a copy of the dictionary __objects"""
+        with self.__rw.read():
+            if cls is not None:
+                bucket = self.__by_class.get(self.__class_name(cls), {})
+                return {key: self.__hydrate(key) for key in bucket}
+            if self.__packed:
+                return {key: self.__hydrate(key) for key in self.__objects}
+            for key in list(self.__raw):
+                self.__hydrate(key)
+            return dict(self.__objects)
 
     def new(self, obj):
         """sets in __objects the obj with key <obj class name>.id"""
         if obj is not None:
             key = obj.__class__.__name__ + "." + obj.id
-            self.__objects[key] = obj
+            with self.__rw.write():
+                self.__put(key, obj)
+                self.__dirty[key] = obj
+
+    def bulk_new(self, objs):
+        """sets in __objects every obj of a list"""
+        with self.__rw.write():
+            for obj in objs:
+                self.new(obj)
+
+    def bulk_delete(self, objs):
+        """deletes every obj of a list from __objects"""
+        with self.__rw.write():
+            for obj in objs:
+                self.delete(obj)
 
     def get(self, cls, id):
         """
@@ -48,8 +266,349 @@ class FileStorage:
         param id: id of instance
         return: object or None
         """
-        key = cls.__name__ + '.' + id
-        return self.__objects.get(key)
+        return self.__hydrate(self.__class_name(cls) + '.' + id)
+
+    def get_dict(self, cls, id):
+        """
+        dictionary representation of a specific object
+        param cls: class
+        param id: id of instance
+        return: to_dict() of the object or None
+        """
+        key = self.__class_name(cls) + '.' + id
+        obj = self.__objects.get(key)
+        if obj is None:
+            return None
+        return dict(self.__to_dict(key, obj))
+
+    def version(self, cls, id):
+        """
+        last modification time of a specific object
+        param cls: class
+        param id: id of instance
+        return: updated_at or None if the object does not exist
+        """
+        obj = self.__objects.get(self.__class_name(cls) + '.' + id)
+        if obj is None:
+            return None
+        if type(obj) is dict:
+            return parse_time(obj["updated_at"])
+        return self.__updated_at(obj)
+
+    def collection_version(self, cls, filter=None):
+        """
+        summary of a collection that changes whenever one of its objects
+        is added, updated or deleted
+        param cls: class
+        param filter: dictionary of attribute values to match
+        return: tuple (number of objects, latest updated_at or None)
+        """
+        name = self.__class_name(cls)
+        with self.__rw.read():
+            if not filter:
+                version = self.__versions.get(name)
+                if version is None:
+                    objs = self.__by_class.get(name, {}).values()
+                    version = self.__versions[name] = self.__latest(objs)
+                return version
+            return self.__latest([self.__objects[key] for key
+                                  in self.__matching(name, filter)])
+
+    def __latest(self, objs):
+        """
+        number of objects and latest updated_at of what __objects holds
+        for them, without building the objects
+        return: tuple (number of objects, latest updated_at or None)
+        """
+        latest = None
+        # dictionaries not hydrated yet are compared by their timestamp
+        # strings, which to_dict() writes in sortable form
+        latest_raw = None
+        for obj in objs:
+            if type(obj) is dict:
+                if latest_raw is None or obj["updated_at"] > latest_raw:
+                    latest_raw = obj["updated_at"]
+                continue
+            updated_at = self.__updated_at(obj)
+            if latest is None or updated_at > latest:
+                latest = updated_at
+        if latest_raw is not None:
+            latest = max(latest or datetime.min, parse_time(latest_raw))
+        return len(objs), latest
+
+    @staticmethod
+    def __updated_at(obj):
+        """updated_at of an object or of its packed tuple"""
+        if type(obj) is tuple:
+            return obj[1]
+        return obj.updated_at
+
+    def exists(self, cls, id):
+        """
+        tells whether an object exists
+        param cls: class
+        param id: id of instance
+        return: True or False
+        """
+        return self.__class_name(cls) + '.' + id in self.__objects
+
+    def children(self, cls, attr, value):
+        """
+        objects of a class that reference a parent object
+        param cls: class of the children
+        param attr: foreign key attribute, e.g. state_id
+        param value: id of the parent
+        return: list of objects
+        """
+        index = self.__children.get((self.__class_name(cls), attr), {})
+        with self.__rw.read():
+            return [self.__hydrate(key) for key in index.get(value, {})]
+
+    def page(self, cls, after_id=None, limit=None, filter=None,
+             ranges=None, order=None):
+        """
+        slice of the objects of a class, ordered by id
+        param cls: class
+        param after_id: only return objects whose id sorts after this one
+        param limit: maximum number of objects to return
+        param filter: dictionary of attribute values to match
+        param ranges: dictionary of range_keys attribute -> (lowest,
+                      highest) value, None for an open end
+        param order: range_keys attribute to order by instead of id,
+                     "-<attribute>" for descending order, after_id and
+                     the id to resume from are then tuples (value, id)
+        return: tuple (list of objects, id to resume from or None)
+        """
+        name = self.__class_name(cls)
+        with self.__rw.read():
+            if ranges or order:
+                keys = None
+                if filter:
+                    keys = set(self.__matching(name, filter))
+                return self.__ranked(name, keys, ranges, order, after_id,
+                                     limit)
+            if filter:
+                ids = sorted(key.split('.', 1)[1]
+                             for key in self.__matching(name, filter))
+            else:
+                ids = self.__ids.get(name, [])
+            return self.__slice(name, ids, after_id, limit)
+
+    def search_places(self, states=None, cities=None, amenities=None,
+                      after_id=None, limit=None, ranges=None, order=None):
+        """
+        places of some states or cities having all of some amenities,
+        found by intersecting the foreign key and amenity_ids indexes
+        param states: list of State ids
+        param cities: list of City ids, added to the cities of states
+        param amenities: list of Amenity ids every place must have
+        param after_id: only return places whose id sorts after this one
+        param limit: maximum number of places to return
+        param ranges, order: as in page()
+        return: tuple (list of places ordered by id, id to resume from
+                or None)
+        """
+        with self.__rw.read():
+            keys = None
+            if states or cities:
+                state_cities = self.__children.get(("City", "state_id"), {})
+                city_ids = set(cities or ())
+                for state_id in states or ():
+                    city_ids.update(key.split('.', 1)[1] for key
+                                    in state_cities.get(state_id, {}))
+                city_places = self.__children.get(("Place", "city_id"), {})
+                keys = set()
+                for city_id in city_ids:
+                    keys.update(city_places.get(city_id, {}))
+            having = self.__children.get(("Place", "amenity_ids"), {})
+            for amenity_id in sorted(set(amenities or ()),
+                                     key=lambda a: len(having.get(a, {}))):
+                if keys is None:
+                    keys = set(having.get(amenity_id, {}))
+                else:
+                    keys.intersection_update(having.get(amenity_id, {}))
+                if not keys:
+                    break
+            if ranges or order:
+                return self.__ranked("Place", keys, ranges, order, after_id,
+                                     limit)
+            if keys is None:
+                ids = self.__ids.get("Place", [])
+            else:
+                ids = sorted(key.split('.', 1)[1] for key in keys)
+            return self.__slice("Place", ids, after_id, limit)
+
+    def near(self, cls, lat, lng, radius=None, limit=None):
+        """
+        objects closest to a point, found through the spatial index
+        param cls: class with latitude and longitude attributes
+        param lat, lng: center in degrees
+        param radius: only return objects within radius kilometers
+        param limit: maximum number of objects to return
+        return: list of tuples (distance in kilometers, object) ordered by
+                distance
+        """
+        name = self.__class_name(cls)
+        with self.__rw.read():
+            grid = self.__geo.get(name)
+            if grid is None:
+                return []
+            return [(distance, self.__hydrate(key)) for distance, key
+                    in grid.nearest(lat, lng, radius=radius, limit=limit)]
+
+    def within(self, cls, box, limit=None):
+        """
+        objects inside a box of coordinates, closest to its center first
+        param cls: class with latitude and longitude attributes
+        param box: tuple (min_lat, min_lng, max_lat, max_lng), min_lng
+                   greater than max_lng crosses the 180th meridian
+        param limit: maximum number of objects to return
+        return: list of tuples (distance in kilometers from the center,
+                object) ordered by distance
+        """
+        name = self.__class_name(cls)
+        lat, lng = box_center(box)
+        with self.__rw.read():
+            grid = self.__geo.get(name)
+            if grid is None:
+                return []
+            found = sorted((haversine(lat, lng, plat, plng), key)
+                           for key, plat, plng in grid.within(box))
+            return [(distance, self.__hydrate(key))
+                    for distance, key in found[:limit]]
+
+    def __ranked(self, name, keys, ranges, order, after_id, limit):
+        """
+        page of the objects of class name within ranges, ordered by id or
+        by a range key, see page()
+        the narrowest of keys and the range indexes gives the candidates,
+        which are then checked against the other conditions
+        param keys: set of keys the objects must be in, None for all
+        return: tuple (list of objects, id to resume from or None)
+        """
+        ranges = ranges or {}
+        reverse = order is not None and order.startswith('-')
+        order = order.lstrip('-') if order else None
+        attrs = range_keys.get(name, ())
+        narrowest = None
+        for attr, (low, high) in ranges.items():
+            entries = self.__sorted_index(name, attr)
+            start, end = self.__bounds(entries, low, high)
+            if narrowest is None or end - start < len(narrowest):
+                narrowest = entries[start:end]
+        if keys is not None and (narrowest is None or
+                                 len(keys) <= len(narrowest)):
+            candidates = keys
+        elif narrowest is not None:
+            candidates = [name + '.' + id for value, id in narrowest]
+        elif order is not None:
+            # every object in order: the index is the result
+            candidates = None
+        else:
+            candidates = self.__by_class.get(name, {})
+        checks = [(attrs.index(attr), low, high)
+                  for attr, (low, high) in ranges.items()]
+        if candidates is None:
+            entries = self.__sorted_index(name, order)
+        else:
+            i = attrs.index(order) if order is not None else None
+            entries = []
+            for key in candidates:
+                values = self.__ranks.get(key)
+                if values is None or keys is not None and key not in keys:
+                    continue
+                if all(in_range(values[j], low, high)
+                       for j, low, high in checks):
+                    id = key.split('.', 1)[1]
+                    entries.append(id if i is None else (values[i], id))
+            entries.sort()
+        page, cursor = slice_sorted(entries, after_id, limit, reverse)
+        objs = [self.__hydrate(name + '.' + (entry if order is None
+                                             else entry[1]))
+                for entry in page]
+        return objs, cursor
+
+    def __sorted_index(self, name, attr):
+        """sorted list of (value, id) of a range key, built if needed"""
+        entries = self.__sorted.get((name, attr))
+        if entries is None:
+            i = range_keys[name].index(attr)
+            entries = sorted((self.__ranks[key][i], key.split('.', 1)[1])
+                             for key in self.__by_class.get(name, {}))
+            self.__sorted[(name, attr)] = entries
+        return entries
+
+    @staticmethod
+    def __bounds(entries, low, high):
+        """start and end of the entries whose value is in [low, high]"""
+        if low is None:
+            start = bisect_right(entries, (float("-inf"), "\uffff"))
+        else:
+            start = bisect_left(entries, (low,))
+        if high is None:
+            return start, len(entries)
+        return start, max(start, bisect_right(entries, (high, "\uffff")))
+
+    def search(self, query, cls=None, limit=None):
+        """
+        objects whose text_keys attributes hold words of a query, ranked
+        with BM25 over an inverted index of each class
+        param query: string
+        param cls: class to search, None for every class in text_keys
+        param limit: maximum number of objects to return
+        return: list of tuples (score, object), best first
+        """
+        names = [self.__class_name(cls)] if cls else sorted(text_keys)
+        with self.__rw.read():
+            found = []
+            for name in names:
+                if name in text_keys:
+                    found += self.__text_index(name).search(query, limit)
+            found.sort(key=lambda item: (-item[0], item[1]))
+            return [(score, self.__hydrate(key))
+                    for score, key in found[:limit]]
+
+    def __text_index(self, name):
+        """full-text index of class name, built if needed"""
+        index = self.__text.get(name)
+        if index is None:
+            index = InvertedIndex()
+            for key, obj in self.__by_class.get(name, {}).items():
+                index.add(key, *(self.__field(name, obj, attr)
+                                 for attr in text_keys[name]))
+            self.__text[name] = index
+        return index
+
+    def __slice(self, name, ids, after_id, limit):
+        """
+        page of objects out of a sorted list of their ids
+        return: tuple (list of objects, id to resume from or None)
+        """
+        start = 0 if after_id is None else bisect_right(ids, after_id)
+        end = len(ids) if limit is None else start + limit
+        objs = [self.__hydrate(name + '.' + id) for id in ids[start:end]]
+        if end < len(ids) and objs:
+            return objs, objs[-1].id
+        return objs, None
+
+    def __matching(self, name, filter):
+        """
+        keys of the objects of class name whose attributes match filter,
+        read from what __objects holds without building the objects
+        """
+        attrs = dict(filter)
+        for attr in foreign_keys.get(name, ()):
+            if attr in attrs:
+                index = self.__children.get((name, attr), {})
+                keys = index.get(attrs.pop(attr), {})
+                break
+        else:
+            keys = self.__by_class.get(name, {})
+        cls = classes[name]
+        return [key for key in keys
+                if all(self.__field(name, self.__objects[key], attr,
+                                    getattr(cls, attr, None)) == value
+                       for attr, value in attrs.items())]
 
     def count(self, cls=None):
         """
@@ -58,35 +617,603 @@ class FileStorage:
         return: number of instances
         """
         if cls:
-            return len(self.all(cls))
+            return len(self.__by_class.get(self.__class_name(cls), {}))
         else:
             return len(self.__objects)
 
+    def counts(self):
+        """
+        count of instances of every class
+        return: dictionary of counts by class name
+        """
+        return {name: len(self.__by_class.get(name, {}))
+                for name in classes}
+
     def save(self):
         """serializes __objects to the JSON file (path: __file_path)"""
-        json_objects = {}
-        for key in self.__objects:
-            json_objects[key] = self.__objects[key].to_dict()
-        with open(self.__file_path, 'w') as f:
-            json.dump(json_objects, f)
+        with self.__lock:
+            if self.__journal:
+                self.__append_journal()
+            else:
+                self.__rewrite()
+            FileStorage.__file_sig = self.__signature()
+            self.__live.clear()
 
     def reload(self):
-        """deserializes the JSON file to __objects"""
-        try:
-            with open(self.__file_path, 'r') as f:
-                jo = json.load(f)
-            for key in jo:
-                self.__objects[key] = classes[jo[key]["__class__"]](**jo[key])
-        except Exception as e:
-            pass
+        """
+        deserializes the JSON file to __objects
+        raises ValueError if the file is truncated or corrupt
+        """
+        with self.__lock:
+            sig = self.__signature()
+            try:
+                with open(self.__file_path, 'rb') as f:
+                    data = f.read()
+            except FileNotFoundError:
+                data = None
+            jo = {}
+            if data is not None:
+                try:
+                    jo = decode_snapshot(data, self.__format == "pickle")
+                except Exception as e:
+                    raise ValueError("{} is truncated or corrupt: {}".format(
+                        self.__file_path, e)) from e
+            with self.__rw.write():
+                for key in jo:
+                    self.__put(key, self.__load(jo[key]), False)
+                FileStorage.__log_records = 0
+                for path in (self.__file_path + ".log.old",
+                             self.__file_path + ".log"):
+                    self.__replay_journal(path)
+                for ids in self.__ids.values():
+                    ids.sort()
+                # changes not saved yet win over what is on disk
+                for key, obj in self.__dirty.items():
+                    if obj is None:
+                        self.__pop(key)
+                    else:
+                        self.__put(key, obj)
+            FileStorage.__file_sig = sig
 
     def delete(self, obj=None):
         """delete obj from __objects if it’s inside"""
         if obj is not None:
             key = obj.__class__.__name__ + '.' + obj.id
-            if key in self.__objects:
-                del self.__objects[key]
+            with self.__rw.write():
+                if key in self.__objects:
+                    self.__pop(key)
+                    self.__dirty[key] = None
 
     def close(self):
-        """call reload() method for deserializing the JSON file to objects"""
-        self.reload()
+        """call reload() method if the JSON file changed since last read"""
+        self.__live.clear()
+        if self.__is_current():
+            self.__reload_stats["hits"] += 1
+            return
+        with self.__lock:
+            # another thread may have reloaded or saved while we waited
+            if self.__is_current():
+                self.__reload_stats["hits"] += 1
+                return
+            self.__reload_stats["reloads"] += 1
+            self.reload()
+
+    def __is_current(self):
+        """tells whether __objects reflects the JSON file on disk"""
+        return (os.getenv("HBNB_FILE_RELOAD") != "always" and
+                self.__file_sig is not None and
+                self.__file_sig == self.__signature())
+
+    def convert(self, file_format):
+        """
+        rewrites the whole JSON file in another format, which is also
+        used by the following saves of this process
+        param file_format: one of file_formats
+        """
+        if file_format not in file_formats:
+            raise ValueError("unknown file format {}".format(file_format))
+        with self.__lock:
+            FileStorage.__format = file_format
+            self.__rewrite()
+            FileStorage.__file_sig = self.__signature()
+
+    def invalidate(self):
+        """forces the next close() to reload the JSON file"""
+        FileStorage.__file_sig = None
+
+    def reset(self, file_path=None, **modes):
+        """
+        empties what is held in memory, as in a new process, without
+        touching the disk; the next reload() reads the file again
+        param file_path: JSON file to use from now on (default: unchanged)
+        param modes: journal, lazy, packed and format values replacing
+                     the ones read from the environment
+        """
+        unknown = set(modes) - {"journal", "lazy", "packed", "format"}
+        if unknown:
+            raise TypeError("unknown modes {}".format(sorted(unknown)))
+        with self.__lock:
+            if file_path is not None:
+                FileStorage.__file_path = file_path
+            for mode, value in modes.items():
+                setattr(FileStorage, "_FileStorage__" + mode, value)
+            FileStorage.__objects = {}
+            FileStorage.__by_class = {}
+            FileStorage.__ids = {}
+            FileStorage.__children = {}
+            FileStorage.__parents = {}
+            FileStorage.__geo = {}
+            FileStorage.__ranks = {}
+            FileStorage.__sorted = {}
+            FileStorage.__text = {}
+            FileStorage.__versions = {}
+            FileStorage.__dirty = {}
+            FileStorage.__raw = set()
+            FileStorage.__live = {}
+            FileStorage.__file_sig = None
+            FileStorage.__log_records = 0
+
+    def metrics(self):
+        """
+        internal counters of the storage engine
+        return: dictionary of counters by topic
+        """
+        return {"reload": dict(self.__reload_stats),
+                "hydration": {"pending": len(self.__raw),
+                              "packed": self.__packed},
+                "locks": self.__rw.stats()}
+
+    def __put(self, key, obj, ordered=True):
+        """
+        stores obj under key in __objects and its indexes
+        param ordered: keep the id lists sorted, False when loading many
+                       objects at once and sorting them afterwards
+        """
+        name = key.split('.', 1)[0]
+        self.__versions.pop(name, None)
+        if self.__packed:
+            if type(obj) is dict:
+                self.__live.pop(key, None)
+            else:
+                self.__live[key] = obj
+            obj = self.__pack(name, obj)
+        if key not in self.__objects:
+            ids = self.__ids.setdefault(name, [])
+            if ordered:
+                insort(ids, key.split('.', 1)[1])
+            else:
+                ids.append(key.split('.', 1)[1])
+        self.__objects[key] = obj
+        self.__by_class.setdefault(name, {})[key] = obj
+        if type(obj) is dict:
+            self.__raw.add(key)
+        else:
+            self.__raw.discard(key)
+        if name in foreign_keys or name in list_keys:
+            self.__unlink(key)
+            links = self.__links(name, obj)
+            for attr, value in links:
+                index = self.__children.setdefault((name, attr), {})
+                index.setdefault(value, {})[key] = obj
+            self.__parents[key] = links
+        if name in range_keys:
+            self.__rank(key, name, obj, ordered)
+        if name in self.__text:
+            if ordered:
+                self.__text[name].add(key, *(self.__field(name, obj, attr)
+                                             for attr in text_keys[name]))
+            else:
+                del self.__text[name]
+        if name in point_keys:
+            grid = self.__geo.setdefault(name, GridIndex(geo_cell))
+            grid.add(key, *(self.__field(name, obj, attr)
+                            for attr in point_keys[name]))
+
+    def __rank(self, key, name, obj, ordered):
+        """updates the sort keys of the range_keys values of obj"""
+        ranks = tuple(range_value(name, attr, self.__field(name, obj, attr))
+                      for attr in range_keys[name])
+        old = self.__ranks.get(key)
+        if old == ranks:
+            return
+        self.__ranks[key] = ranks
+        self.__unrank(key, name, old, ordered)
+        if ordered:
+            id = key.split('.', 1)[1]
+            for attr, value in zip(range_keys[name], ranks):
+                entries = self.__sorted.get((name, attr))
+                if entries is not None:
+                    insort(entries, (value, id))
+
+    def __unrank(self, key, name, old, ordered=True):
+        """
+        removes the old sort keys of key from the sorted range indexes,
+        or drops the indexes to build them again when not ordered
+        """
+        if not ordered:
+            for attr in range_keys[name]:
+                self.__sorted.pop((name, attr), None)
+            return
+        id = key.split('.', 1)[1]
+        for attr, value in zip(range_keys[name], old or ()):
+            entries = self.__sorted.get((name, attr))
+            if entries is None:
+                continue
+            i = bisect_left(entries, (value, id))
+            if i < len(entries) and entries[i] == (value, id):
+                del entries[i]
+
+    @staticmethod
+    def __field(name, obj, attr, default=None):
+        """
+        value of an attribute of an object, its dictionary or tuple
+        param default: value of an attribute the object does not have
+        """
+        if type(obj) is dict:
+            value = obj.get(attr, default)
+        elif type(obj) is tuple:
+            fields = packed_fields.get(name, ())
+            if attr in fields:
+                value = obj[2 + fields.index(attr)]
+            else:
+                value = (obj[-1] or {}).get(attr, default)
+        else:
+            value = getattr(obj, attr, default)
+        return default if value is missing else value
+
+    @staticmethod
+    def __links(name, obj):
+        """
+        (attribute, id) pairs obj is indexed under: one per foreign key,
+        one per id in a list key
+        """
+        pairs = []
+        for attr in foreign_keys.get(name, ()) + list_keys.get(name, ()):
+            value = FileStorage.__field(name, obj, attr)
+            if attr in list_keys.get(name, ()):
+                pairs.extend((attr, item) for item in value or ())
+            else:
+                pairs.append((attr, value))
+        return tuple(dict.fromkeys(pairs))
+
+    def __pop(self, key, ordered=True):
+        """
+        removes key from __objects and its indexes
+        param ordered: the id lists are sorted, False while loading when
+                       they are only sorted afterwards
+        """
+        if self.__objects.pop(key, None) is None:
+            return
+        self.__raw.discard(key)
+        self.__live.pop(key, None)
+        name, id = key.split('.', 1)
+        self.__versions.pop(name, None)
+        ids = self.__ids[name]
+        if ordered:
+            i = bisect_left(ids, id)
+            if i < len(ids) and ids[i] == id:
+                del ids[i]
+        else:
+            ids.remove(id)
+        self.__by_class[name].pop(key, None)
+        self.__unlink(key)
+        if name in self.__geo:
+            self.__geo[name].remove(key)
+        if name in range_keys:
+            self.__unrank(key, name, self.__ranks.pop(key, None), ordered)
+        if name in self.__text:
+            self.__text[name].remove(key)
+
+    def __unlink(self, key):
+        """removes key from the foreign key indexes"""
+        values = self.__parents.pop(key, None)
+        if values is None:
+            return
+        name = key.split('.', 1)[0]
+        for attr, value in values:
+            siblings = self.__children[(name, attr)][value]
+            siblings.pop(key, None)
+            if not siblings:
+                del self.__children[(name, attr)][value]
+
+    def __load(self, obj_dict):
+        """turns a dictionary read from disk into what __objects holds"""
+        if self.__lazy or self.__packed:
+            return obj_dict
+        return classes[obj_dict["__class__"]].from_storage_dict(obj_dict)
+
+    def __hydrate(self, key):
+        """
+        returns the object stored under key, building it if still raw
+        return: object or None if there is no such key
+        """
+        obj = self.__objects.get(key)
+        if type(obj) is tuple:
+            with self.__hydrate_lock:
+                live = self.__live.get(key)
+                if live is None:
+                    name = key.split('.', 1)[0]
+                    live = classes[name].from_storage_dict(
+                        self.__unpack(key, obj))
+                    # unless new() replaced the tuple meanwhile
+                    if self.__objects.get(key) is obj:
+                        self.__live[key] = live
+            return live
+        if type(obj) is not dict:
+            return obj
+        # readers hydrate under the shared lock, only one builds the object
+        with self.__rw.read(), self.__hydrate_lock:
+            obj = self.__objects.get(key)
+            if type(obj) is not dict:
+                return obj
+            obj = classes[obj["__class__"]].from_storage_dict(obj)
+            name = key.split('.', 1)[0]
+            self.__objects[key] = obj
+            self.__by_class[name][key] = obj
+            for attr, value in self.__parents.get(key, ()):
+                self.__children[(name, attr)][value][key] = obj
+            self.__raw.discard(key)
+        return obj
+
+    @staticmethod
+    def __pack(name, obj):
+        """
+        turns an object or its dictionary into a tuple
+        (created_at, updated_at, <packed_fields values>, other attributes)
+        the id is not stored, it is part of the key
+        """
+        attrs = obj if type(obj) is dict else obj.__dict__
+        created_at = attrs.get("created_at")
+        updated_at = attrs.get("updated_at")
+        if type(created_at) is str:
+            created_at = parse_time(created_at)
+        if type(updated_at) is str:
+            updated_at = parse_time(updated_at)
+        fields = packed_fields.get(name, ())
+        values = [created_at, updated_at]
+        for attr in fields:
+            value = attrs.get(attr, missing)
+            if type(value) is str and attr in foreign_keys.get(name, ()):
+                value = sys.intern(value)
+            elif type(value) is list:
+                value = tuple(sys.intern(item) if type(item) is str else item
+                              for item in value)
+            values.append(value)
+        others = {attr: value for attr, value in attrs.items()
+                  if attr not in fields and attr not in
+                  ("id", "created_at", "updated_at", "__class__")}
+        values.append(others or None)
+        return tuple(values)
+
+    @staticmethod
+    def __unpack(key, record):
+        """
+        attributes of a packed record, timestamps as datetimes
+        return: dictionary accepted by from_storage_dict()
+        """
+        name, id = key.split('.', 1)
+        attrs = {"id": id, "created_at": record[0], "updated_at": record[1]}
+        for attr, value in zip(packed_fields.get(name, ()), record[2:]):
+            if value is missing:
+                continue
+            attrs[attr] = list(value) if type(value) is tuple else value
+        if record[-1]:
+            attrs.update(record[-1])
+        attrs["__class__"] = name
+        return attrs
+
+    @staticmethod
+    def __to_dict(key, obj):
+        """to_dict() of an object, or the dictionary itself if still raw"""
+        if type(obj) is dict:
+            return obj
+        if type(obj) is tuple:
+            obj_dict = FileStorage.__unpack(key, obj)
+            for attr in ("created_at", "updated_at"):
+                if obj_dict[attr] is not None:
+                    obj_dict[attr] = obj_dict[attr].isoformat(
+                        timespec="microseconds")
+            return obj_dict
+        return obj.to_dict()
+
+    @staticmethod
+    def __class_name(cls):
+        """name of a class given either the class or its name"""
+        if isinstance(cls, str):
+            return cls
+        return cls.__name__
+
+    def compact(self, wait=False):
+        """
+        folds the journal into a new snapshot of the JSON file
+        param wait: write the snapshot before returning instead of
+                    in a background thread
+        """
+        if not self.__compact_lock.acquire(blocking=wait):
+            return
+        with self.__lock:
+            self.__append_journal()
+            with self.__rw.read():
+                json_objects = {}
+                for key, obj in self.__objects.items():
+                    json_objects[key] = self.__to_dict(key, obj)
+            if os.path.exists(self.__file_path + ".log"):
+                self.__retire_journal()
+            FileStorage.__log_records = 0
+            FileStorage.__file_sig = self.__signature()
+        if wait:
+            self.__write_snapshot(json_objects)
+        else:
+            # not a daemon: the interpreter waits for it before exiting
+            threading.Thread(target=self.__write_snapshot,
+                             args=(json_objects,)).start()
+
+    def __retire_journal(self):
+        """
+        moves the journal to __file_path.log.old, which the snapshot being
+        written makes obsolete
+        a .log.old left by a compaction that never finished holds records
+        no snapshot has yet, the journal is then appended to it
+        """
+        log_path = self.__file_path + ".log"
+        old_path = log_path + ".old"
+        if not os.path.exists(old_path):
+            os.replace(log_path, old_path)
+            return
+        with open(old_path, 'r+b') as old:
+            # a torn last record was never acked
+            old.truncate(old.read().rfind(b"\n") + 1)
+            old.seek(0, os.SEEK_END)
+            with open(log_path, 'rb') as log:
+                old.write(log.read())
+            self.__sync(old)
+        os.remove(log_path)
+
+    def __rewrite(self):
+        """writes every object to the JSON file and drops the journal"""
+        # the read lock keeps new() and delete() out, and only the holder
+        # of __lock ever clears __dirty
+        with self.__rw.read():
+            json_objects = {}
+            for key, obj in self.__objects.items():
+                json_objects[key] = self.__to_dict(key, obj)
+            self.__dirty.clear()
+        self.__write_file(encode_snapshot(json_objects, self.__format))
+        self.__remove_journal()
+
+    def __write_snapshot(self, json_objects):
+        """writes a compacted snapshot and drops the folded journal"""
+        try:
+            tmp_path = self.__write_tmp(
+                encode_snapshot(json_objects, self.__format))
+            with self.__lock:
+                self.__replace(tmp_path)
+                self.__remove(self.__file_path + ".log.old")
+                FileStorage.__file_sig = self.__signature()
+        finally:
+            self.__compact_lock.release()
+
+    def __write_file(self, data):
+        """replaces the JSON file with data, readers never see it partial"""
+        self.__replace(self.__write_tmp(data))
+
+    def __write_tmp(self, data):
+        """
+        writes data next to the JSON file, removed again if that fails
+        return: path of the temporary file
+        """
+        tmp_path = "{}.{}.{}.tmp".format(self.__file_path, os.getpid(),
+                                         threading.get_ident())
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+                self.__sync(f)
+        except BaseException:
+            self.__remove(tmp_path)
+            raise
+        return tmp_path
+
+    def __replace(self, tmp_path):
+        """
+        renames a temporary file over the JSON file, the temporary file is
+        removed if that fails
+        """
+        try:
+            os.replace(tmp_path, self.__file_path)
+        except BaseException:
+            self.__remove(tmp_path)
+            raise
+        if self.__fsync == "always":
+            fd = os.open(os.path.dirname(os.path.abspath(self.__file_path)),
+                         os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def __sync(self, f, journal=False):
+        """
+        flushes f to the disk as HBNB_FILE_FSYNC asks
+        when batched, snapshots are always flushed and the journal at most
+        once every __fsync_interval seconds
+        """
+        if self.__fsync == "never":
+            return
+        if journal and self.__fsync == "batched":
+            now = time.monotonic()
+            if now - self.__last_fsync < self.__fsync_interval:
+                return
+            FileStorage.__last_fsync = now
+        f.flush()
+        os.fsync(f.fileno())
+
+    def __append_journal(self):
+        """appends one record per changed object to the journal"""
+        with self.__rw.read():
+            if not self.__dirty:
+                return
+            lines = []
+            for key, obj in self.__dirty.items():
+                if obj is None:
+                    record = {"op": "del", "key": key}
+                else:
+                    record = {"op": "put", "key": key, "obj": obj.to_dict()}
+                lines.append(json.dumps(record) + "\n")
+            self.__dirty.clear()
+        with open(self.__file_path + ".log", 'a') as f:
+            f.write("".join(lines))
+            self.__sync(f, journal=True)
+        FileStorage.__log_records += len(lines)
+        if self.__log_records >= self.__compact_every:
+            self.compact()
+
+    def __replay_journal(self, path):
+        """applies the records of a journal file to __objects"""
+        try:
+            with open(path, 'rb') as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return
+        for i, line in enumerate(lines):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                if i != len(lines) - 1:
+                    raise
+                # torn write of the last record, it was never acked
+                with open(path, 'r+b') as f:
+                    f.truncate(sum(len(l) for l in lines[:i]))
+                lines.pop()
+                break
+            key = record["key"]
+            if record["op"] == "del":
+                self.__pop(key, False)
+            else:
+                self.__put(key, self.__load(record["obj"]), False)
+        FileStorage.__log_records += len(lines)
+
+    def __remove_journal(self):
+        """drops journal files made obsolete by a full rewrite"""
+        for path in (self.__file_path + ".log",
+                     self.__file_path + ".log.old"):
+            self.__remove(path)
+
+    @staticmethod
+    def __remove(path):
+        """removes a file if it exists"""
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def __signature(self):
+        """identity of the JSON file and its journal on disk"""
+        sig = []
+        for path in (self.__file_path, self.__file_path + ".log"):
+            try:
+                st = os.stat(path)
+            except OSError:
+                sig.append(None)
+                continue
+            sig.append((st.st_ino, st.st_size, st.st_mtime_ns))
+        return tuple(sig)
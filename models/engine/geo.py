@@ -0,0 +1,254 @@
+#!/usr/bin/python3
+"""
+Contains the GridIndex class and great-circle distance helpers
+"""
+
+import heapq
+from math import asin, cos, degrees, floor, radians, sin, sqrt
+
+# mean radius of the Earth in kilometers
+EARTH_RADIUS = 6371.0088
+
+
+def valid_point(lat, lng):
+    """tells whether lat and lng are numbers within range"""
+    return isinstance(lat, (int, float)) and \
+        isinstance(lng, (int, float)) and \
+        -90 <= lat <= 90 and -180 <= lng <= 180
+
+
+def haversine(lat1, lng1, lat2, lng2):
+    """
+    great-circle distance between two points
+    param lat1, lng1, lat2, lng2: coordinates in degrees
+    return: distance in kilometers
+    """
+    lat1, lng1, lat2, lng2 = map(radians, (lat1, lng1, lat2, lng2))
+    h = sin((lat2 - lat1) / 2) ** 2 + \
+        cos(lat1) * cos(lat2) * sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS * asin(min(1.0, sqrt(h)))
+
+
+def bounding_box(lat, lng, radius):
+    """
+    smallest box of coordinates holding a circle
+    param lat, lng: center in degrees
+    param radius: radius in kilometers
+    return: tuple (min_lat, min_lng, max_lat, max_lng), min_lng is greater
+            than max_lng when the box crosses the 180th meridian
+    """
+    angle = radius / EARTH_RADIUS
+    min_lat = lat - degrees(angle)
+    max_lat = lat + degrees(angle)
+    if min_lat <= -90 or max_lat >= 90 or \
+            sin(angle) >= cos(radians(lat)):
+        # the circle holds a pole: every longitude
+        return max(min_lat, -90), -180, min(max_lat, 90), 180
+    delta = degrees(asin(sin(angle) / cos(radians(lat))))
+    min_lng = lng - delta
+    max_lng = lng + delta
+    if min_lng < -180:
+        min_lng += 360
+    if max_lng > 180:
+        max_lng -= 360
+    return min_lat, min_lng, max_lat, max_lng
+
+
+def box_center(box):
+    """
+    center of a box made by bounding_box()
+    return: tuple (lat, lng)
+    """
+    min_lat, min_lng, max_lat, max_lng = box
+    if min_lng > max_lng:
+        max_lng += 360
+    lng = (min_lng + max_lng) / 2
+    return (min_lat + max_lat) / 2, lng - 360 if lng > 180 else lng
+
+
+def in_box(lat, lng, box):
+    """tells whether a point is inside a box made by bounding_box()"""
+    min_lat, min_lng, max_lat, max_lng = box
+    if not min_lat <= lat <= max_lat:
+        return False
+    if min_lng <= max_lng:
+        return min_lng <= lng <= max_lng
+    return lng >= min_lng or lng <= max_lng
+
+
+class GridIndex:
+    """
+    spatial index of points bucketed in cells of a fixed number of degrees
+    radius and box queries only look at the cells they overlap, nearest
+    neighbours are searched ring by ring of cells around the center
+    """
+
+    def __init__(self, cell=0.5):
+        """
+        creates an empty index
+        param cell: size of a cell in degrees of latitude and longitude
+        """
+        self.cell = cell
+        self.__rows = int(180 // cell) + 1
+        self.__cols = int(round(360 / cell))
+        # dictionary - (row, column) -> key -> (lat, lng)
+        self.__cells = {}
+        # dictionary - cell of each key
+        self.__where = {}
+
+    def __len__(self):
+        """number of points in the index"""
+        return len(self.__where)
+
+    def clear(self):
+        """removes every point"""
+        self.__cells.clear()
+        self.__where.clear()
+
+    def add(self, key, lat, lng):
+        """
+        indexes key at a point, or only removes it if the point is not
+        valid coordinates (e.g. None)
+        """
+        self.remove(key)
+        if not valid_point(lat, lng):
+            return
+        where = self.__cell(lat, lng)
+        self.__cells.setdefault(where, {})[key] = (lat, lng)
+        self.__where[key] = where
+
+    def remove(self, key):
+        """removes key from the index if it is there"""
+        where = self.__where.pop(key, None)
+        if where is None:
+            return
+        points = self.__cells[where]
+        del points[key]
+        if not points:
+            del self.__cells[where]
+
+    def within(self, box):
+        """
+        points inside a box made by bounding_box()
+        return: list of tuples (key, lat, lng)
+        """
+        min_lat, min_lng, max_lat, max_lng = box
+        rows = range(self.__row(min_lat), self.__row(max_lat) + 1)
+        first, last = self.__col(min_lng), self.__col(max_lng)
+        if min_lng > max_lng:
+            cols = list(range(first, self.__cols)) + list(range(last + 1))
+        else:
+            cols = range(first, last + 1)
+        if len(rows) * len(cols) > len(self.__cells):
+            cells = self.__cells.values()
+        else:
+            cells = [self.__cells[(row, col)] for row in rows for col in cols
+                     if (row, col) in self.__cells]
+        return [(key, lat, lng) for points in cells
+                for key, (lat, lng) in points.items()
+                if in_box(lat, lng, box)]
+
+    def nearest(self, lat, lng, radius=None, limit=None):
+        """
+        points closest to a center
+        param lat, lng: center in degrees
+        param radius: only return points within radius kilometers
+        param limit: maximum number of points to return
+        return: list of tuples (distance in kilometers, key) ordered by
+                distance then key
+        """
+        if radius is not None:
+            found = []
+            for key, plat, plng in self.within(bounding_box(lat, lng,
+                                                            radius)):
+                distance = haversine(lat, lng, plat, plng)
+                if distance <= radius:
+                    found.append((distance, key))
+            if limit is None:
+                return sorted(found)
+            return heapq.nsmallest(limit, found)
+        if limit is None:
+            return sorted(self.__distances(lat, lng))
+        return self.__rings(lat, lng, limit)
+
+    def __distances(self, lat, lng):
+        """distance from the center to every point"""
+        for points in self.__cells.values():
+            for key, (plat, plng) in points.items():
+                yield haversine(lat, lng, plat, plng), key
+
+    def __rings(self, lat, lng, limit):
+        """k nearest points, visiting the cells ring by ring"""
+        row0, col0 = self.__cell(lat, lng)
+        # heap of the best (-distance, key) found so far, worst on top
+        best = []
+        seen = set()
+        ring = 0
+        while True:
+            for where in self.__ring(row0, col0, ring):
+                if where in seen:
+                    continue
+                seen.add(where)
+                points = self.__cells.get(where, {})
+                for key, (plat, plng) in points.items():
+                    item = (-haversine(lat, lng, plat, plng), key)
+                    if len(best) < limit:
+                        heapq.heappush(best, item)
+                    elif item > best[0]:
+                        heapq.heapreplace(best, item)
+            if len(best) == limit and \
+                    -best[0][0] <= self.__outside(lat, lng, row0, col0, ring):
+                break
+            if len(seen) >= len(self.__cells):
+                # sparse index: cheaper to look at every point
+                return heapq.nsmallest(limit, self.__distances(lat, lng))
+            ring += 1
+        return sorted((-distance, key) for distance, key in best)
+
+    def __ring(self, row0, col0, ring):
+        """cells at a distance of ring cells from (row0, col0)"""
+        for row in range(row0 - ring, row0 + ring + 1):
+            if not 0 <= row < self.__rows:
+                continue
+            if abs(row - row0) == ring:
+                cols = range(col0 - ring, col0 + ring + 1)
+            else:
+                cols = (col0 - ring, col0 + ring)
+            for col in cols:
+                yield row, col % self.__cols
+
+    def __outside(self, lat, lng, row0, col0, ring):
+        """
+        lower bound of the distance from the center to any point not in
+        the cells up to ring
+        """
+        low = (row0 - ring) * self.cell - 90
+        high = (row0 + ring + 1) * self.cell - 90
+        bounds = []
+        if low > -90:
+            bounds.append(lat - low)
+        if high < 90:
+            bounds.append(high - lat)
+        bound = min(bounds) if bounds else 180
+        distance = radians(bound) * EARTH_RADIUS
+        if 2 * ring + 1 < self.__cols:
+            west = (col0 - ring) * self.cell - 180
+            east = (col0 + ring + 1) * self.cell - 180
+            delta = min(lng - west, east - lng)
+            widest = min(90, max(abs(low), abs(high)))
+            # points in the rows above but in the columns around
+            h = cos(radians(widest)) * sin(radians(min(delta, 180)) / 2)
+            distance = min(distance, 2 * EARTH_RADIUS * asin(min(1.0, h)))
+        return distance
+
+    def __row(self, lat):
+        """row of the cells holding latitude lat"""
+        return min(int(floor((lat + 90) / self.cell)), self.__rows - 1)
+
+    def __col(self, lng):
+        """column of the cells holding longitude lng"""
+        return min(int(floor((lng + 180) / self.cell)), self.__cols - 1)
+
+    def __cell(self, lat, lng):
+        """cell holding a point"""
+        return self.__row(lat), self.__col(lng)
@@ -0,0 +1,101 @@
+#!/usr/bin/python3
+"""
+Contains the RWLock class
+"""
+
+from contextlib import contextmanager
+import threading
+
+
+class RWLock:
+    """
+    reader/writer lock: many readers or one writer at a time
+    waiting writers go before new readers so they cannot starve, a thread
+    may take the lock again while it holds it (a writer may also read)
+    """
+
+    def __init__(self):
+        """creates an unlocked lock"""
+        self.__cond = threading.Condition(threading.Lock())
+        # integer - number of read locks held, over all threads
+        self.__readers = 0
+        # integer - number of writers waiting for the lock
+        self.__waiting = 0
+        # thread id of the writer holding the lock, None if none
+        self.__writer = None
+        # integer - how many times the writer took the lock
+        self.__depth = 0
+        # per thread number of read locks held
+        self.__local = threading.local()
+
+    @contextmanager
+    def read(self):
+        """holds the lock for reading in a with block"""
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self):
+        """holds the lock for writing in a with block"""
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+    def acquire_read(self):
+        """waits until no writer holds or waits for the lock"""
+        held = getattr(self.__local, "reads", 0)
+        me = threading.get_ident()
+        with self.__cond:
+            if not held and self.__writer != me:
+                while self.__writer is not None or self.__waiting:
+                    self.__cond.wait()
+            self.__readers += 1
+        self.__local.reads = held + 1
+
+    def release_read(self):
+        """releases a read lock"""
+        self.__local.reads -= 1
+        with self.__cond:
+            self.__readers -= 1
+            if not self.__readers:
+                self.__cond.notify_all()
+
+    def acquire_write(self):
+        """waits until no other thread holds the lock"""
+        me = threading.get_ident()
+        with self.__cond:
+            if self.__writer == me:
+                self.__depth += 1
+                return
+            if getattr(self.__local, "reads", 0):
+                raise RuntimeError("cannot upgrade a read lock")
+            self.__waiting += 1
+            try:
+                while self.__writer is not None or self.__readers:
+                    self.__cond.wait()
+            finally:
+                self.__waiting -= 1
+            self.__writer = me
+            self.__depth = 1
+
+    def release_write(self):
+        """releases a write lock"""
+        with self.__cond:
+            self.__depth -= 1
+            if not self.__depth:
+                self.__writer = None
+                self.__cond.notify_all()
+
+    def stats(self):
+        """
+        current state of the lock
+        return: dictionary of readers, waiting writers and writer held
+        """
+        with self.__cond:
+            return {"readers": self.__readers, "waiting": self.__waiting,
+                    "writer": self.__writer is not None}
@@ -0,0 +1,721 @@
+#!/usr/bin/python3
+"""
+Contains the MmapStorage class
+"""
+
+from bisect import bisect_left, bisect_right, insort
+import json
+import mmap
+from models.base_model import parse_time
+from models.engine.file_storage import classes, foreign_keys, geo_cell
+from models.engine.file_storage import in_range, point_keys, range_keys
+from models.engine.file_storage import range_value, slice_sorted
+from models.engine.file_storage import text_keys
+from models.engine.geo import GridIndex, box_center, haversine
+from models.engine.text import InvertedIndex
+import os
+import sys
+import threading
+import uuid
+
+# layout of the index file lines, older index files are rebuilt
+index_version = 3
+# attributes copied into the index entries, by class name: the foreign
+# keys, the coordinates and the range keys
+indexed = {name: foreign_keys.get(name, ()) + point_keys.get(name, ()) +
+           range_keys.get(name, ()) for name in classes}
+
+
+class MmapStorage:
+    """
+    stores objects as JSON records appended to a memory-mapped file
+    only an index of the records is held in memory, get() decodes the
+    one record it returns
+    """
+
+    def __init__(self, path=None):
+        """
+        sets up an engine for the record file at path
+        param path: record file (default: HBNB_MMAP_PATH or file.mmap),
+                    its index is kept next to it in <path>.idx
+        """
+        self.__path = path or os.getenv("HBNB_MMAP_PATH", "file.mmap")
+        self.__index_path = self.__path + ".idx"
+        # dictionary - (offset, length, updated_at, <foreign key values>)
+        # of each record by key, offset is None for objects not saved yet
+        self.__index = {}
+        # dictionary - sorted list of the keys of each class
+        self.__keys = {}
+        # dictionary - (<class name>, foreign key) -> parent id -> keys
+        self.__children = {}
+        # dictionary - spatial index of the coordinates of each class
+        self.__geo = {}
+        # dictionary - full-text index of the text_keys of each class,
+        # built on first use by decoding every record of the class
+        self.__text = {}
+        # dictionary - objects changed since last save (None if deleted)
+        self.__dirty = {}
+        # tuple - (mmap, index): read-only view of the record file and the
+        # index whose offsets point into it, swapped as one so a reader
+        # never pairs the offsets of one file with the map of another
+        self.__mapped = (None, self.__index)
+        # string - generation of the record file the index belongs to
+        self.__generation = None
+        # integer - bytes of records that were replaced or deleted
+        self.__garbage = 0
+        # integer - bytes of the records still referenced by the index
+        self.__live = 0
+        # tuple - identity of both files when last read or written
+        self.__sig = None
+        # dictionary - number of records decoded
+        self.__stats = {"decoded": 0}
+        self.__lock = threading.RLock()
+
+    def all(self, cls=None, load=None):
+        """
+        returns a dictionary of the objects, by <class name>.id
+        every object is decoded, prefer get() or page()
+        """
+        if cls is None:
+            keys = list(self.__index)
+        else:
+            keys = self.__keys.get(self.__class_name(cls), [])
+        return {key: self.__lookup(key) for key in keys}
+
+    def new(self, obj):
+        """adds obj to the objects written by the next save()"""
+        if obj is not None:
+            key = obj.__class__.__name__ + "." + obj.id
+            with self.__lock:
+                self.__put(key, None, None, obj.updated_at,
+                           self.__indexed_values(key, obj.__dict__))
+                self.__dirty[key] = obj
+                name = obj.__class__.__name__
+                if name in self.__text:
+                    self.__text[name].add(key, *(getattr(obj, attr, None)
+                                                 for attr in text_keys[name]))
+
+    def bulk_new(self, objs):
+        """adds every obj of a list"""
+        for obj in objs:
+            self.new(obj)
+
+    def bulk_delete(self, objs):
+        """deletes every obj of a list"""
+        for obj in objs:
+            self.delete(obj)
+
+    def get(self, cls, id):
+        """
+        gets specific object
+        param cls: class
+        param id: id of instance
+        return: object or None
+        """
+        key = self.__class_name(cls) + '.' + id
+        if key not in self.__index:
+            return None
+        return self.__lookup(key)
+
+    def get_dict(self, cls, id):
+        """
+        dictionary representation of a specific object
+        param cls: class
+        param id: id of instance
+        return: to_dict() of the object or None
+        """
+        key = self.__class_name(cls) + '.' + id
+        if key not in self.__index:
+            return None
+        if key in self.__dirty:
+            return self.__dirty[key].to_dict()
+        return self.__decode(key)
+
+    def version(self, cls, id):
+        """
+        last modification time of a specific object
+        param cls: class
+        param id: id of instance
+        return: updated_at or None if the object does not exist
+        """
+        entry = self.__index.get(self.__class_name(cls) + '.' + id)
+        if entry is None:
+            return None
+        return entry[2]
+
+    def collection_version(self, cls, filter=None):
+        """
+        summary of a collection that changes whenever one of its objects
+        is added, updated or deleted
+        param cls: class
+        param filter: dictionary of attribute values to match
+        return: tuple (number of objects, latest updated_at or None)
+        """
+        name = self.__class_name(cls)
+        if filter:
+            keys = [name + '.' + obj.id
+                    for obj in self.__matching(name, filter)]
+        else:
+            keys = self.__keys.get(name, [])
+        return len(keys), max((self.__index[key][2] for key in keys),
+                              default=None)
+
+    def exists(self, cls, id):
+        """
+        tells whether an object exists
+        param cls: class
+        param id: id of instance
+        return: True or False
+        """
+        return self.__class_name(cls) + '.' + id in self.__index
+
+    def children(self, cls, attr, value):
+        """
+        objects of a class that reference a parent object
+        param cls: class of the children
+        param attr: foreign key attribute, e.g. state_id
+        param value: id of the parent
+        return: list of objects
+        """
+        index = self.__children.get((self.__class_name(cls), attr), {})
+        return [self.__lookup(key) for key in sorted(index.get(value, ()))]
+
+    def page(self, cls, after_id=None, limit=None, filter=None,
+             ranges=None, order=None):
+        """
+        slice of the objects of a class, ordered by id
+        param cls: class
+        param after_id: only return objects whose id sorts after this one
+        param limit: maximum number of objects to return
+        param filter: dictionary of attribute values to match
+        param ranges: dictionary of range_keys attribute -> (lowest,
+                      highest) value, None for an open end
+        param order: range_keys attribute to order by instead of id,
+                     "-<attribute>" for descending order, after_id and
+                     the id to resume from are then tuples (value, id)
+        return: tuple (list of objects, id to resume from or None)
+        """
+        name = self.__class_name(cls)
+        if filter:
+            keys = sorted(name + '.' + obj.id
+                          for obj in self.__matching(name, filter))
+        else:
+            keys = self.__keys.get(name, [])
+        if ranges or order:
+            entries = self.__ranked(name, keys, ranges, order)
+            page, cursor = slice_sorted(entries, after_id, limit,
+                                        bool(order) and order[0] == '-')
+            return [self.__lookup(name + '.' + (entry if order is None
+                                                else entry[1]))
+                    for entry in page], cursor
+        if after_id is None:
+            start = 0
+        else:
+            start = bisect_right(keys, name + '.' + after_id)
+        end = len(keys) if limit is None else start + limit
+        objs = [self.__lookup(key) for key in keys[start:end]]
+        if end < len(keys) and objs:
+            return objs, objs[-1].id
+        return objs, None
+
+    def search_places(self, states=None, cities=None, amenities=None,
+                      after_id=None, limit=None, ranges=None, order=None):
+        """
+        places of some states or cities having all of some amenities
+        the foreign key indexes narrow down the places, amenity_ids is
+        not indexed so candidates are decoded in id order until the page
+        is full
+        param states: list of State ids
+        param cities: list of City ids, added to the cities of states
+        param amenities: list of Amenity ids every place must have
+        param after_id: only return places whose id sorts after this one
+        param limit: maximum number of places to return
+        param ranges, order: as in page()
+        return: tuple (list of places ordered by id, id to resume from
+                or None)
+        """
+        if states or cities:
+            state_cities = self.__children.get(("City", "state_id"), {})
+            city_ids = set(cities or ())
+            for state_id in states or ():
+                city_ids.update(key.split('.', 1)[1]
+                                for key in state_cities.get(state_id, ()))
+            city_places = self.__children.get(("Place", "city_id"), {})
+            keys = set()
+            for city_id in city_ids:
+                keys.update(city_places.get(city_id, ()))
+        else:
+            keys = self.__keys.get("Place", [])
+        entries = self.__ranked("Place", keys, ranges, order)
+        entries = slice_sorted(entries, after_id, None,
+                               bool(order) and order[0] == '-')[0]
+        amenities = set(amenities or ())
+        objs = []
+        last = None
+        for entry in entries:
+            obj = self.__lookup("Place." + (entry if order is None
+                                            else entry[1]))
+            if amenities.issubset(getattr(obj, "amenity_ids", None) or ()):
+                if limit is not None and len(objs) == limit:
+                    return objs, last
+                objs.append(obj)
+                last = entry
+        return objs, None
+
+    def __ranked(self, name, keys, ranges, order):
+        """
+        ids of the keys within ranges, or (value, id) of the order
+        attribute, sorted, read from the index entries without decoding
+        param keys: keys of candidate objects
+        param ranges, order: as in page()
+        return: sorted list
+        """
+        fields = indexed[name]
+        checks = [(3 + fields.index(attr), attr, low, high)
+                  for attr, (low, high) in (ranges or {}).items()]
+        attr = order.lstrip('-') if order else None
+        i = 3 + fields.index(attr) if attr else None
+        entries = []
+        for key in keys:
+            entry = self.__index[key]
+            if all(in_range(range_value(name, field, entry[j]), low, high)
+                   for j, field, low, high in checks):
+                id = key.split('.', 1)[1]
+                if i is None:
+                    entries.append(id)
+                else:
+                    entries.append((range_value(name, attr, entry[i]), id))
+        entries.sort()
+        return entries
+
+    def near(self, cls, lat, lng, radius=None, limit=None):
+        """
+        objects closest to a point, found through the spatial index
+        param cls: class with latitude and longitude attributes
+        param lat, lng: center in degrees
+        param radius: only return objects within radius kilometers
+        param limit: maximum number of objects to return
+        return: list of tuples (distance in kilometers, object) ordered by
+                distance
+        """
+        grid = self.__geo.get(self.__class_name(cls))
+        if grid is None:
+            return []
+        return [(distance, self.__lookup(key)) for distance, key
+                in grid.nearest(lat, lng, radius=radius, limit=limit)]
+
+    def within(self, cls, box, limit=None):
+        """
+        objects inside a box of coordinates, closest to its center first
+        param cls: class with latitude and longitude attributes
+        param box: tuple (min_lat, min_lng, max_lat, max_lng), min_lng
+                   greater than max_lng crosses the 180th meridian
+        param limit: maximum number of objects to return
+        return: list of tuples (distance in kilometers from the center,
+                object) ordered by distance
+        """
+        grid = self.__geo.get(self.__class_name(cls))
+        if grid is None:
+            return []
+        lat, lng = box_center(box)
+        found = sorted((haversine(lat, lng, plat, plng), key)
+                       for key, plat, plng in grid.within(box))
+        return [(distance, self.__lookup(key))
+                for distance, key in found[:limit]]
+
+    def search(self, query, cls=None, limit=None):
+        """
+        objects whose text_keys attributes hold words of a query, ranked
+        with BM25 over an inverted index of each class
+        param query: string
+        param cls: class to search, None for every class in text_keys
+        param limit: maximum number of objects to return
+        return: list of tuples (score, object), best first
+        """
+        names = [self.__class_name(cls)] if cls else sorted(text_keys)
+        with self.__lock:
+            found = []
+            for name in names:
+                if name in text_keys:
+                    found += self.__text_index(name).search(query, limit)
+        found.sort(key=lambda item: (-item[0], item[1]))
+        return [(score, self.__lookup(key)) for score, key in found[:limit]]
+
+    def __text_index(self, name):
+        """full-text index of class name, built if needed"""
+        index = self.__text.get(name)
+        if index is None:
+            index = InvertedIndex()
+            for key in self.__keys.get(name, []):
+                if key in self.__dirty:
+                    attrs = self.__dirty[key].__dict__
+                else:
+                    attrs = self.__decode(key)
+                index.add(key, *(attrs.get(attr)
+                                 for attr in text_keys[name]))
+            self.__text[name] = index
+        return index
+
+    def count(self, cls=None):
+        """
+        count of instances
+        param cls: class
+        return: number of instances
+        """
+        if cls:
+            return len(self.__keys.get(self.__class_name(cls), []))
+        return len(self.__index)
+
+    def counts(self):
+        """
+        count of instances of every class
+        return: dictionary of counts by class name
+        """
+        return {name: len(self.__keys.get(name, [])) for name in classes}
+
+    def delete(self, obj=None):
+        """deletes obj, the next save() records the deletion"""
+        if obj is not None:
+            key = obj.__class__.__name__ + '.' + obj.id
+            with self.__lock:
+                if key in self.__index:
+                    self.__pop(key)
+                    self.__dirty[key] = None
+
+    def save(self):
+        """appends the changed objects to the record file and its index"""
+        with self.__lock:
+            if not self.__dirty:
+                return
+            with open(self.__path, 'ab') as f:
+                offset = f.tell()
+                chunks = []
+                lines = []
+                written = []
+                for key, obj in self.__dirty.items():
+                    if obj is None:
+                        data = json.dumps({"__deleted__": key}).encode()
+                        self.__garbage += len(data) + 1
+                        lines.append([key, offset, len(data)])
+                    else:
+                        data = json.dumps(obj.to_dict()).encode()
+                        written.append((key, obj, offset, len(data)))
+                    chunks.append(data + b"\n")
+                    offset += len(data) + 1
+                f.write(b"".join(chunks))
+            # the new offsets are only indexed once the map covers them
+            self.__remap()
+            for key, obj, offset, length in written:
+                self.__put(key, offset, length, obj.updated_at,
+                           self.__indexed_values(key, obj.__dict__))
+                lines.append(self.__index_line(key, self.__index[key]))
+            self.__append_index(lines)
+            self.__dirty.clear()
+            self.__sig = self.__signature()
+            if self.__garbage > self.__live:
+                self.compact()
+
+    def reload(self):
+        """reads the index of the record file, rebuilding it if needed"""
+        with self.__lock:
+            if not os.path.exists(self.__path):
+                self.__create()
+            self.__remap()
+            self.__generation = json.loads(self.__read_line(0)[0])[
+                "generation"]
+            self.__index.clear()
+            self.__keys.clear()
+            self.__children.clear()
+            self.__geo.clear()
+            self.__text.clear()
+            self.__garbage = self.__live = 0
+            covered = self.__read_index()
+            if covered is None:
+                self.__write_index([])
+                covered = len(self.__read_line(0)[0]) + 1
+            self.__append_index(self.__scan(covered))
+            for keys in self.__keys.values():
+                keys.sort()
+            for key, obj in self.__dirty.items():
+                if obj is None:
+                    if key in self.__index:
+                        self.__pop(key)
+                else:
+                    self.__put(key, None, None, obj.updated_at,
+                               self.__indexed_values(key, obj.__dict__))
+            self.__sig = self.__signature()
+
+    def close(self):
+        """call reload() method if the record file changed since last read"""
+        if self.__sig is not None and self.__sig == self.__signature():
+            return
+        self.reload()
+
+    def invalidate(self):
+        """forces the next close() to reload the index"""
+        self.__sig = None
+
+    def metrics(self):
+        """
+        internal counters of the storage engine
+        return: dictionary of counters by topic
+        """
+        return {"mmap": {"records": len(self.__index),
+                         "mapped_bytes": len(self.__mapped[0] or b""),
+                         "live_bytes": self.__live,
+                         "garbage_bytes": self.__garbage,
+                         "decoded": self.__stats["decoded"]}}
+
+    def compact(self):
+        """rewrites the record file without replaced or deleted records"""
+        with self.__lock:
+            self.save()
+            generation = uuid.uuid4().hex
+            tmp_path = self.__path + ".tmp"
+            entries = {}
+            with open(tmp_path, 'wb') as f:
+                f.write(json.dumps({"generation": generation}).encode() +
+                        b"\n")
+                for key, entry in self.__index.items():
+                    entries[key] = (f.tell(),) + entry[1:]
+                    f.write(self.__mapped[0][entry[0]:
+                                             entry[0] + entry[1] + 1])
+            os.replace(tmp_path, self.__path)
+            self.__generation = generation
+            self.__garbage = 0
+            self.__remap(entries)
+            self.__write_index([self.__index_line(key, entry)
+                                for key, entry in entries.items()])
+            self.__sig = self.__signature()
+
+    def __lookup(self, key):
+        """returns the object stored under key"""
+        if key in self.__dirty:
+            return self.__dirty[key]
+        obj_dict = self.__decode(key)
+        return classes[obj_dict["__class__"]].from_storage_dict(obj_dict)
+
+    def __decode(self, key):
+        """decodes the record of key from the mapped file"""
+        mapped, index = self.__mapped
+        offset, length = index[key][:2]
+        self.__stats["decoded"] += 1
+        return json.loads(mapped[offset:offset + length])
+
+    def __matching(self, name, filter):
+        """objects of class name whose attributes match filter"""
+        attrs = dict(filter)
+        for attr in foreign_keys.get(name, ()):
+            if attr in attrs:
+                candidates = self.children(name, attr, attrs.pop(attr))
+                break
+        else:
+            candidates = list(self.all(name).values())
+        return [obj for obj in candidates
+                if all(getattr(obj, attr, None) == value
+                       for attr, value in attrs.items())]
+
+    def __put(self, key, offset, length, updated_at, parents, ordered=True):
+        """indexes the record of key and its foreign key values"""
+        name = key.split('.', 1)[0]
+        old = self.__index.get(key)
+        if old is None:
+            keys = self.__keys.setdefault(name, [])
+            if ordered:
+                insort(keys, key)
+            else:
+                keys.append(key)
+        else:
+            self.__unlink(key, old)
+            if old[0] is not None:
+                self.__garbage += old[1] + 1
+                self.__live -= old[1] + 1
+        if offset is not None:
+            self.__live += length + 1
+        parents = tuple(value if type(value) is not str else sys.intern(value)
+                        for value in parents)
+        self.__index[key] = (offset, length, updated_at) + parents
+        for attr, value in zip(foreign_keys.get(name, ()), parents):
+            index = self.__children.setdefault((name, attr), {})
+            index.setdefault(value, set()).add(key)
+        if name in point_keys:
+            grid = self.__geo.setdefault(name, GridIndex(geo_cell))
+            grid.add(key, *(parents[indexed[name].index(attr)]
+                            for attr in point_keys[name]))
+
+    def __pop(self, key, ordered=True):
+        """removes key from the index"""
+        name = key.split('.', 1)[0]
+        entry = self.__index.pop(key)
+        if entry[0] is not None:
+            self.__garbage += entry[1] + 1
+            self.__live -= entry[1] + 1
+        keys = self.__keys[name]
+        if ordered:
+            del keys[bisect_left(keys, key)]
+        else:
+            keys.remove(key)
+        self.__unlink(key, entry)
+        if name in self.__geo:
+            self.__geo[name].remove(key)
+        if name in self.__text:
+            self.__text[name].remove(key)
+
+    def __unlink(self, key, entry):
+        """removes key from the foreign key indexes"""
+        name = key.split('.', 1)[0]
+        for attr, value in zip(foreign_keys.get(name, ()), entry[3:]):
+            siblings = self.__children[(name, attr)][value]
+            siblings.discard(key)
+            if not siblings:
+                del self.__children[(name, attr)][value]
+
+    @staticmethod
+    def __indexed_values(key, attrs):
+        """values of the indexed attributes of an object"""
+        return tuple(attrs.get(attr)
+                     for attr in indexed[key.split('.', 1)[0]])
+
+    @staticmethod
+    def __index_line(key, entry):
+        """line of the index file for an entry of __index"""
+        return [key, entry[0], entry[1],
+                entry[2].isoformat(timespec="microseconds")] + list(entry[3:])
+
+    @staticmethod
+    def __class_name(cls):
+        """name of a class given either the class or its name"""
+        if isinstance(cls, str):
+            return cls
+        return cls.__name__
+
+    def __create(self):
+        """writes an empty record file"""
+        generation = uuid.uuid4().hex
+        tmp_path = self.__path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(json.dumps({"generation": generation}).encode() + b"\n")
+        os.replace(tmp_path, self.__path)
+
+    def __remap(self, index=None):
+        """
+        maps the record file again after it grew or was replaced
+        the previous map is left to the garbage collector, a reader on
+        another thread may still be decoding from it
+        param index: new index whose offsets point into the replaced file
+        """
+        if index is not None:
+            self.__index = index
+        with open(self.__path, 'rb') as f:
+            self.__mapped = (mmap.mmap(f.fileno(), 0,
+                                       access=mmap.ACCESS_READ),
+                             self.__index)
+
+    def __read_line(self, offset):
+        """line of the mapped file starting at offset, without its end"""
+        mapped = self.__mapped[0]
+        end = mapped.find(b"\n", offset)
+        if end == -1:
+            return None, len(mapped)
+        return mapped[offset:end], end + 1
+
+    def __read_index(self):
+        """
+        loads the index file if it belongs to the record file
+        return: offset of the first record it does not cover, or None
+        """
+        try:
+            f = open(self.__index_path, 'r+b')
+        except FileNotFoundError:
+            return None
+        with f:
+            line = f.readline()
+            try:
+                header = json.loads(line)
+                if header["generation"] != self.__generation or \
+                        header.get("version") != index_version:
+                    return None
+            except (KeyError, TypeError, ValueError):
+                return None
+            covered = len(self.__read_line(0)[0]) + 1
+            size = len(line)
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # torn write of the last line, the records it points
+                    # to are picked up again by __scan()
+                    f.truncate(size)
+                    break
+                size += len(line)
+                key, offset, length = entry[:3]
+                if len(entry) == 3:
+                    if key in self.__index:
+                        self.__pop(key, False)
+                    self.__garbage += length + 1
+                else:
+                    self.__put(key, offset, length, parse_time(entry[3]),
+                               entry[4:], False)
+                covered = max(covered, offset + length + 1)
+        return covered
+
+    def __scan(self, offset):
+        """
+        indexes the records written after offset, dropping a torn last one
+        return: index lines for those records
+        """
+        lines = []
+        while offset < len(self.__mapped[0]):
+            data, end = self.__read_line(offset)
+            try:
+                if data is None:
+                    raise ValueError("record without end of line")
+                record = json.loads(data)
+            except ValueError:
+                # torn write of the last record, it was never acked
+                with open(self.__path, 'r+b') as f:
+                    f.truncate(offset)
+                self.__remap()
+                break
+            if "__deleted__" in record:
+                key = record["__deleted__"]
+                if key in self.__index:
+                    self.__pop(key, False)
+                self.__garbage += len(data) + 1
+                lines.append([key, offset, len(data)])
+            else:
+                key = record["__class__"] + '.' + record["id"]
+                parents = self.__indexed_values(key, record)
+                self.__put(key, offset, len(data),
+                           parse_time(record["updated_at"]), parents, False)
+                lines.append(self.__index_line(key, self.__index[key]))
+            offset = end
+        return lines
+
+    def __append_index(self, lines):
+        """appends entries to the index file"""
+        if not lines:
+            return
+        with open(self.__index_path, 'a') as f:
+            f.write("".join(json.dumps(line) + "\n" for line in lines))
+
+    def __write_index(self, lines):
+        """rewrites the index file for the current record file"""
+        tmp_path = self.__index_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(json.dumps({"generation": self.__generation,
+                                "version": index_version}) + "\n")
+            f.write("".join(json.dumps(line) + "\n" for line in lines))
+        os.replace(tmp_path, self.__index_path)
+
+    def __signature(self):
+        """identity of the record file and its index on disk"""
+        sig = []
+        for path in (self.__path, self.__index_path):
+            try:
+                st = os.stat(path)
+            except OSError:
+                sig.append(None)
+                continue
+            sig.append((st.st_ino, st.st_size, st.st_mtime_ns))
+        return tuple(sig)
@@ -0,0 +1,128 @@
+#!/usr/bin/python3
+"""
+Contains the InvertedIndex class and the tokenizer it uses
+"""
+
+from collections import Counter
+import heapq
+from math import log
+import re
+import sys
+
+# words are runs of letters and digits, accented letters included
+WORD = re.compile(r"[^\W_]+")
+# words too common to tell documents apart
+STOP_WORDS = frozenset("""a an and are as at be but by for from has have i
+in is it its my of on or our that the this to was we were will with you
+""".split())
+
+
+def tokenize(text):
+    """
+    words of a text, lowercased, without stop words
+    param text: string, anything else has no words
+    return: list of words
+    """
+    if not isinstance(text, str):
+        return []
+    return [word for word in WORD.findall(text.lower())
+            if word not in STOP_WORDS]
+
+
+class InvertedIndex:
+    """
+    maps words to the documents holding them and ranks the documents
+    matching a query with BM25
+    """
+
+    def __init__(self, k1=1.2, b=0.75):
+        """
+        creates an empty index
+        param k1: how fast repeating a word stops raising the score
+        param b: how much longer documents are penalized, from 0 to 1
+        """
+        self.k1 = k1
+        self.b = b
+        # dictionary - word -> key -> times the word is in the document
+        self.__postings = {}
+        # dictionary - number of words in each document
+        self.__lengths = {}
+        # dictionary - distinct words of each document
+        self.__words = {}
+        # integer - number of words in all documents
+        self.__total = 0
+
+    def __len__(self):
+        """number of documents in the index"""
+        return len(self.__lengths)
+
+    def add(self, key, *texts):
+        """
+        indexes a document, replacing what was indexed under key
+        param key: key of the document
+        param texts: strings the document is made of, others are ignored
+        """
+        self.remove(key)
+        counts = Counter()
+        for text in texts:
+            counts.update(tokenize(text))
+        if not counts:
+            return
+        postings = self.__postings
+        intern = sys.intern
+        words = []
+        for word, count in counts.items():
+            word = intern(word)
+            found = postings.get(word)
+            if found is None:
+                found = postings[word] = {}
+            found[key] = count
+            words.append(word)
+        self.__words[key] = tuple(words)
+        length = sum(counts.values())
+        self.__lengths[key] = length
+        self.__total += length
+
+    def remove(self, key):
+        """removes a document from the index if it is there"""
+        words = self.__words.pop(key, None)
+        if words is None:
+            return
+        for word in words:
+            postings = self.__postings[word]
+            del postings[key]
+            if not postings:
+                del self.__postings[word]
+        self.__total -= self.__lengths.pop(key)
+
+    def search(self, query, limit=None, accept=None):
+        """
+        documents holding words of a query, best first
+        param query: string
+        param limit: maximum number of documents to return
+        param accept: function telling whether a key may be returned
+        return: list of tuples (score, key), ordered by descending score
+                then key
+        """
+        n = len(self.__lengths)
+        if not n:
+            return []
+        average = self.__total / n
+        k1, b = self.k1, self.b
+        lengths = self.__lengths
+        scores = {}
+        for word in set(tokenize(query)):
+            postings = self.__postings.get(word)
+            if not postings:
+                continue
+            idf = log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for key, count in postings.items():
+                norm = k1 * (1 - b + b * lengths[key] / average)
+                scores[key] = scores.get(key, 0.0) + \
+                    idf * count * (k1 + 1) / (count + norm)
+        found = ((score, key) for key, score in scores.items()
+                 if accept is None or accept(key))
+        if limit is None:
+            return sorted(found, key=lambda item: (-item[0], item[1]))
+        return heapq.nsmallest(limit, found,
+                               key=lambda item: (-item[0], item[1]))
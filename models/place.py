@@ -1,11 +1,14 @@
 #!/usr/bin/python
 """ holds class Place"""
+from datetime import datetime
 import models
 from models.base_model import BaseModel, Base
 from os import getenv
 import sqlalchemy
-from sqlalchemy import Column, String, Integer, Float, ForeignKey, Table
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Integer, Float, ForeignKey, Index
+from sqlalchemy import DateTime
+from sqlalchemy import Table, func
+from sqlalchemy.orm import object_session, relationship
 
 if models.storage_t == 'db':
     place_amenity = Table('place_amenity', Base.metadata,
@@ -23,6 +26,16 @@ class Place(BaseModel, Base):
     """Representation of Place """
     if models.storage_t == 'db':
         __tablename__ = 'places'
+        __table_args__ = (Index('ix_places_latitude_longitude', 'latitude',
+                                'longitude'),
+                          Index('ix_places_city_id_price_by_night',
+                                'city_id', 'price_by_night'),
+                          Index('ix_places_city_id_max_guest', 'city_id',
+                                'max_guest'),
+                          Index('ix_places_price_by_night',
+                                'price_by_night'),
+                          Index('ft_places_description', 'description',
+                                mysql_prefix='FULLTEXT'))
         city_id = Column(String(60), ForeignKey('cities.id'), nullable=False)
         user_id = Column(String(60), ForeignKey('users.id'), nullable=False)
         name = Column(String(128), nullable=False)
@@ -33,6 +46,10 @@ class Place(BaseModel, Base):
         price_by_night = Column(Integer, nullable=False, default=0)
         latitude = Column(Float, nullable=True)
         longitude = Column(Float, nullable=True)
+        # aggregates kept up to date by the API, NULL until first counted
+        review_count = Column(Integer, nullable=True)
+        last_review_at = Column(DateTime, nullable=True)
+        amenity_count = Column(Integer, nullable=True)
         reviews = relationship("Review", backref="place")
         amenities = relationship("Amenity", secondary="place_amenity",
                                  backref="place_amenities",
@@ -49,30 +66,144 @@ class Place(BaseModel, Base):
         latitude = 0.0
         longitude = 0.0
         amenity_ids = []
+        review_count = None
+        last_review_at = None
+        amenity_count = None
+
+    # attributes maintained by the Place itself, not set by clients
+    stats_keys = ("review_count", "last_review_at", "amenity_count")
 
     def __init__(self, *args, **kwargs):
         """initializes Place"""
         super().__init__(*args, **kwargs)
+        if models.storage_t != 'db' and "amenity_ids" not in self.__dict__:
+            self.amenity_ids = []
+        if kwargs.get("id") is None:
+            self.review_count = 0
+            self.last_review_at = None
+            self.amenity_count = len(self.amenity_ids) \
+                if models.storage_t != 'db' else 0
+
+    @classmethod
+    def from_storage_dict(cls, obj_dict):
+        """rebuilds a Place from a dictionary made by to_dict()"""
+        obj = super().from_storage_dict(obj_dict)
+        if models.storage_t != 'db' and "amenity_ids" not in obj.__dict__:
+            obj.amenity_ids = []
+        return obj
+
+    def to_dict(self):
+        """returns a dictionary containing all keys/values of the instance"""
+        new_dict = super().to_dict()
+        if type(new_dict.get("last_review_at")) is datetime:
+            new_dict["last_review_at"] = new_dict["last_review_at"].isoformat(
+                timespec="microseconds")
+        return new_dict
+
+    @staticmethod
+    def __review_time(review):
+        """
+        when a review was written, as last_review_at stores it: a datetime
+        in a database, the string to_dict() writes otherwise
+        """
+        if models.storage_t == 'db' or type(review.created_at) is not datetime:
+            return review.created_at
+        return review.created_at.isoformat(timespec="microseconds")
+
+    def count_stats(self):
+        """
+        counts the reviews and amenities of the place again, for places
+        written before the aggregates existed
+        """
+        self.review_count, self.last_review_at = self.__count_reviews()
+        if models.storage_t == 'db':
+            session = object_session(self)
+            self.amenity_count = 0 if session is None else session.query(
+                func.count()).select_from(place_amenity).filter(
+                place_amenity.c.place_id == self.id).scalar()
+        else:
+            self.amenity_count = len(self.amenity_ids)
+
+    def __count_reviews(self, exclude=None):
+        """
+        number of reviews of the place and the time of the latest one,
+        asked to the database rather than loaded through self.reviews,
+        which would then be part of to_dict()
+        param exclude: id of a review to leave out
+        return: tuple (count, latest time or None)
+        """
+        if models.storage_t != 'db':
+            times = [self.__review_time(review) for review in self.reviews
+                     if review.id != exclude]
+            return len(times), max(times) if times else None
+        from models.review import Review
+        session = object_session(self)
+        if session is None:
+            return 0, None
+        query = session.query(func.count(Review.id),
+                              func.max(Review.created_at)).filter(
+            Review.place_id == self.id, Review.id != exclude)
+        return tuple(query.one())
+
+    def stats(self):
+        """
+        aggregates of the place, counted first if they never were, but
+        not saved then so that reading them leaves updated_at as it was
+        return: dictionary - review_count, last_review_at, amenity_count
+        """
+        if self.review_count is None or self.amenity_count is None:
+            self.count_stats()
+        return {key: value for key, value in self.to_dict().items()
+                if key in self.stats_keys}
+
+    def review_added(self, review):
+        """updates the aggregates for a new review of the place"""
+        if self.review_count is None:
+            self.count_stats()
+            return
+        self.review_count += 1
+        written = self.__review_time(review)
+        if self.last_review_at is None or written >= self.last_review_at:
+            self.last_review_at = written
+
+    def review_deleted(self, review):
+        """
+        updates the aggregates for a deleted review of the place, only
+        looking at the other reviews when it was the latest one
+        """
+        if self.review_count is None:
+            self.count_stats()
+            return
+        self.review_count = max(self.review_count - 1, 0)
+        written = self.__review_time(review)
+        if self.last_review_at is not None and \
+                written >= self.last_review_at:
+            self.last_review_at = self.__count_reviews(review.id)[1]
+
+    def amenities_changed(self, change):
+        """
+        updates the aggregates after amenities were linked or unlinked
+        param change: number of amenities added, negative if removed
+        """
+        if self.amenity_count is None:
+            self.count_stats()
+            return
+        self.amenity_count = max(self.amenity_count + change, 0)
 
     if models.storage_t != 'db':
         @property
         def reviews(self):
             """getter attribute returns the list of Review instances"""
             from models.review import Review
-            review_list = []
-            all_reviews = models.storage.all(Review)
-            for review in all_reviews.values():
-                if review.place_id == self.id:
-                    review_list.append(review)
-            return review_list
+            return models.storage.children(Review, "place_id", self.id)
 
         @property
         def amenities(self):
             """getter attribute returns the list of Amenity instances"""
             from models.amenity import Amenity
             amenity_list = []
-            all_amenities = models.storage.all(Amenity)
-            for amenity in all_amenities.values():
-                if amenity.place_id == self.id:
+            for amenity_id in self.amenity_ids:
+                amenity = models.storage.get(Amenity, amenity_id)
+                if amenity is not None:
                     amenity_list.append(amenity)
             return amenity_list
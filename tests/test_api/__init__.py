@@ -0,0 +1,44 @@
+#!/usr/bin/python3
+"""
+Contains the APITestCase class the API tests derive from
+"""
+
+import models
+import os
+import shutil
+import tempfile
+import unittest
+
+if models.storage_t not in ("db", "mmap"):
+    from api.v1.app import app
+    from models.engine.file_storage import FileStorage
+
+
+@unittest.skipIf(models.storage_t in ("db", "mmap"),
+                 "not testing file storage")
+class APITestCase(unittest.TestCase):
+    """Runs each test against an empty FileStorage of its own"""
+    def setUp(self):
+        """Points FileStorage at an empty temporary directory"""
+        self.saved = {attr: value for attr, value in vars(FileStorage).items()
+                      if attr.startswith("_FileStorage__") and
+                      not callable(value) and
+                      not isinstance(value, staticmethod)}
+        self.tmp = tempfile.mkdtemp()
+        FileStorage().reset(os.path.join(self.tmp, "file.json"))
+        self.client = app.test_client()
+
+    def tearDown(self):
+        """Puts FileStorage back as it was and removes the directory"""
+        for attr, value in self.saved.items():
+            setattr(FileStorage, attr, value)
+        shutil.rmtree(self.tmp)
+
+    def create(self, url, **data):
+        """
+        creates an object through the API
+        return: its dictionary
+        """
+        resp = self.client.post("/api/v1" + url, json=data)
+        self.assertEqual(resp.status_code, 201, resp.data)
+        return resp.get_json()
@@ -0,0 +1,100 @@
+#!/usr/bin/python3
+"""
+Contains the TestBatchDocs and TestBatch classes
+"""
+
+from api.v1.views import batch
+import pep8
+from tests.test_api import APITestCase
+import unittest
+
+
+class TestBatchDocs(unittest.TestCase):
+    """Tests to check the documentation and style of batch.py"""
+    def test_pep8_conformance_batch(self):
+        """Test that api/v1/views/batch.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/views/batch.py',
+                                    'tests/test_api/test_batch.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_batch_module_docstring(self):
+        """Test for the batch.py module docstring"""
+        self.assertIsNot(batch.__doc__, None,
+                         "batch.py needs a docstring")
+        self.assertTrue(len(batch.__doc__) >= 1,
+                        "batch.py needs a docstring")
+
+
+class TestBatch(APITestCase):
+    """Test the batch endpoints"""
+    def post(self, url, ops):
+        """posts a batch, returns the response"""
+        return self.client.post("/api/v1" + url + "/batch", json=ops)
+
+    def test_statuses(self):
+        """Test that each operation gets its own status, in order"""
+        state = self.create("/states", name="California")
+        resp = self.post("/states", [
+            {"op": "create", "data": {"name": "Nevada"}},
+            {"op": "create", "data": {}},
+            {"op": "update", "id": state["id"], "data": {"name": "CA"}},
+            {"op": "update", "id": "missing", "data": {}},
+            {"op": "delete"},
+            {"op": "rename", "id": state["id"]}])
+        self.assertEqual(resp.status_code, 200)
+        results = resp.get_json()
+        self.assertEqual([result["status"] for result in results],
+                         [201, 400, 200, 404, 400, 400])
+        nevada = self.client.get("/api/v1/states/" + results[0]["id"])
+        self.assertEqual(nevada.get_json()["name"], "Nevada")
+        ca = self.client.get("/api/v1/states/" + state["id"])
+        self.assertEqual(ca.get_json()["name"], "CA")
+        resp = self.post("/states", [{"op": "delete", "id": state["id"]}])
+        self.assertEqual(resp.get_json()[0]["status"], 200)
+        self.assertEqual(self.client.get("/api/v1/states/" + state["id"])
+                         .status_code, 404)
+
+    def test_same_object(self):
+        """Test that operations on the same object all apply"""
+        user = self.create("/users", email="a@b.c", password="pwd")
+        resp = self.post("/users", [
+            {"op": "update", "id": user["id"], "data": {"first_name": "A"}},
+            {"op": "update", "id": user["id"], "data": {"last_name": "B"}}])
+        self.assertEqual([result["status"] for result in resp.get_json()],
+                         [200, 200])
+        user = self.client.get("/api/v1/users/" + user["id"]).get_json()
+        self.assertEqual((user["first_name"], user["last_name"]), ("A", "B"))
+
+    def test_not_a_list(self):
+        """Test that the body must be a list"""
+        self.assertEqual(self.post("/states", {"op": "create"}).status_code,
+                         400)
+
+    def test_parents(self):
+        """Test that created objects need existing parents"""
+        resp = self.post("/cities", [
+            {"op": "create", "data": {"state_id": "missing", "name": "x"}}])
+        self.assertEqual(resp.get_json()[0]["status"], 404)
+
+    def test_place_stats(self):
+        """Test that batches keep the review aggregates of places"""
+        state = self.create("/states", name="California")
+        city = self.create("/states/{}/cities".format(state["id"]),
+                           name="San Francisco")
+        user = self.create("/users", email="a@b.c", password="pwd")
+        place = self.create("/cities/{}/places".format(city["id"]),
+                            user_id=user["id"], name="loft")
+        url = "/api/v1/places/{}/stats".format(place["id"])
+        results = self.post("/reviews", [
+            {"op": "create", "data": {"place_id": place["id"],
+                                      "user_id": user["id"], "text": t}}
+            for t in ("good", "bad")]).get_json()
+        self.assertEqual(self.client.get(url).get_json()["review_count"], 2)
+        self.post("/reviews", [{"op": "delete", "id": results[0]["id"]}])
+        stats = self.client.get(url).get_json()
+        self.assertEqual(stats["review_count"], 1)
+        self.post("/places", [{"op": "update", "id": place["id"],
+                               "data": {"review_count": 999}}])
+        self.assertEqual(self.client.get(url).get_json(), stats)
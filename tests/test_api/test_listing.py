@@ -0,0 +1,148 @@
+#!/usr/bin/python3
+"""
+Contains the TestListingDocs and TestListing classes
+"""
+
+from api.v1.views import listing
+import json
+import pep8
+from tests.test_api import APITestCase
+import unittest
+
+
+class TestListingDocs(unittest.TestCase):
+    """Tests to check the documentation and style of listing.py"""
+    def test_pep8_conformance_listing(self):
+        """Test that api/v1/views/listing.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/views/listing.py',
+                                    'tests/test_api/__init__.py',
+                                    'tests/test_api/test_listing.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_listing_module_docstring(self):
+        """Test for the listing.py module docstring"""
+        self.assertIsNot(listing.__doc__, None,
+                         "listing.py needs a docstring")
+        self.assertTrue(len(listing.__doc__) >= 1,
+                        "listing.py needs a docstring")
+
+
+class TestListing(APITestCase):
+    """Test the collection endpoints"""
+    def setUp(self):
+        """Creates a few states"""
+        super().setUp()
+        self.ids = sorted(self.create("/states", name=str(i))["id"]
+                          for i in range(5))
+
+    def test_pages(self):
+        """Test following the Link headers through every page"""
+        url = "/api/v1/states?limit=2"
+        found = []
+        while url:
+            resp = self.client.get(url)
+            self.assertEqual(resp.status_code, 200)
+            found += [state["id"] for state in resp.get_json()]
+            link = resp.headers.get("Link")
+            url = link[1:link.index(">")] if link else None
+        self.assertEqual(found, self.ids)
+
+    def test_cursor(self):
+        """Test that a cursor returns the objects after it"""
+        resp = self.client.get("/api/v1/states?cursor=" + self.ids[2])
+        self.assertEqual([state["id"] for state in resp.get_json()],
+                         self.ids[3:])
+        self.assertNotIn("Link", resp.headers)
+
+    def test_invalid_limit(self):
+        """Test that a limit must be a positive integer"""
+        for limit in ("0", "-1", "a"):
+            resp = self.client.get("/api/v1/states?limit=" + limit)
+            self.assertEqual(resp.status_code, 400)
+
+    def test_stream(self):
+        """Test streaming as a JSON array and as NDJSON"""
+        resp = self.client.get("/api/v1/states?stream=1")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([state["id"] for state in resp.get_json()],
+                         self.ids)
+        resp = self.client.get("/api/v1/states",
+                               headers={"Accept": "application/x-ndjson"})
+        self.assertEqual(resp.mimetype, "application/x-ndjson")
+        lines = resp.get_data(as_text=True).splitlines()
+        self.assertEqual([json.loads(line)["id"] for line in lines],
+                         self.ids)
+
+    def test_not_modified(self):
+        """Test that a listing is answered with 304 until it changes"""
+        resp = self.client.get("/api/v1/states")
+        etag = resp.headers["ETag"]
+        resp = self.client.get("/api/v1/states",
+                               headers={"If-None-Match": etag})
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp.data, b"")
+        resp = self.client.get("/api/v1/states?limit=2",
+                               headers={"If-None-Match": etag})
+        self.assertEqual(resp.status_code, 200)
+        self.create("/states", name="new")
+        resp = self.client.get("/api/v1/states",
+                               headers={"If-None-Match": etag})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(resp.get_json()), 6)
+
+    def test_object_not_modified(self):
+        """Test conditional GETs of one object"""
+        url = "/api/v1/states/" + self.ids[0]
+        resp = self.client.get(url)
+        etag = resp.headers["ETag"]
+        last_modified = resp.headers["Last-Modified"]
+        self.assertEqual(self.client.get(url, headers={
+            "If-None-Match": etag}).status_code, 304)
+        self.assertEqual(self.client.get(url, headers={
+            "If-Modified-Since": last_modified}).status_code, 304)
+        self.client.put(url, json={"name": "changed"})
+        self.assertEqual(self.client.get(url, headers={
+            "If-None-Match": etag}).status_code, 200)
+        self.assertEqual(self.client.get("/api/v1/states/missing")
+                         .status_code, 404)
+
+
+class TestPlaceListing(APITestCase):
+    """Test the ranges and ordering of the places of a city"""
+    def setUp(self):
+        """Creates places of a city at different prices"""
+        super().setUp()
+        state = self.create("/states", name="California")
+        self.city = self.create("/states/{}/cities".format(state["id"]),
+                                name="San Francisco")
+        user = self.create("/users", email="a@b.c", password="pwd")
+        self.places = [self.create("/cities/{}/places".format(
+            self.city["id"]), user_id=user["id"], name=str(i),
+            price_by_night=i % 3 * 100, max_guest=i) for i in range(7)]
+
+    def test_order_and_cursor(self):
+        """Test paging through places ordered by descending price"""
+        url = "/api/v1/cities/{}/places?limit=3&order=-price&min_guests=1" \
+            .format(self.city["id"])
+        found = []
+        while url:
+            resp = self.client.get(url)
+            self.assertEqual(resp.status_code, 200)
+            found += [place["id"] for place in resp.get_json()]
+            link = resp.headers.get("Link")
+            url = link[1:link.index(">")] if link else None
+        expected = sorted((place for place in self.places
+                           if place["max_guest"] >= 1),
+                          key=lambda place: (place["price_by_night"],
+                                             place["id"]), reverse=True)
+        self.assertEqual(found, [place["id"] for place in expected])
+
+    def test_invalid_ranges(self):
+        """Test that bad range parameters are rejected"""
+        url = "/api/v1/cities/{}/places?".format(self.city["id"])
+        for query in ("min_price=a", "order=name", "order=price&cursor=x"):
+            self.assertEqual(self.client.get(url + query).status_code, 400)
+        self.assertEqual(self.client.get("/api/v1/cities/missing/places")
+                         .status_code, 404)
@@ -0,0 +1,209 @@
+#!/usr/bin/python3
+"""
+Contains the TestPlacesDocs, TestPlacesSearch, TestPlacesGeo and
+TestPlaceStats classes
+"""
+
+from api.v1.views import places
+import models
+from models.place import Place
+import pep8
+from tests.test_api import APITestCase
+import unittest
+
+
+class TestPlacesDocs(unittest.TestCase):
+    """Tests to check the documentation and style of places.py"""
+    def test_pep8_conformance_places(self):
+        """Test that api/v1/views/places.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/views/places.py',
+                                    'tests/test_api/test_places.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_places_module_docstring(self):
+        """Test for the places.py module docstring"""
+        self.assertIsNot(places.__doc__, None,
+                         "places.py needs a docstring")
+        self.assertTrue(len(places.__doc__) >= 1,
+                        "places.py needs a docstring")
+
+
+class PlacesTestCase(APITestCase):
+    """Creates a state with two cities and a user"""
+    def setUp(self):
+        """Creates the parents of the places"""
+        super().setUp()
+        self.state = self.create("/states", name="California")
+        self.cities = [self.create("/states/{}/cities".format(
+            self.state["id"]), name=str(i)) for i in range(2)]
+        self.user = self.create("/users", email="a@b.c", password="pwd")
+
+    def place(self, city, **attrs):
+        """creates a place in a city"""
+        return self.create("/cities/{}/places".format(city["id"]),
+                           user_id=self.user["id"], name="place", **attrs)
+
+
+class TestPlacesSearch(PlacesTestCase):
+    """Test POST /places_search"""
+    def search(self, body, query=""):
+        """ids of the places found, and the response"""
+        resp = self.client.post("/api/v1/places_search" + query, json=body)
+        self.assertEqual(resp.status_code, 200)
+        return [place["id"] for place in resp.get_json()], resp
+
+    def test_filters(self):
+        """Test filtering by state, city, amenity and price"""
+        amenity = self.create("/amenities", name="wifi")
+        found = [self.place(self.cities[i % 2], price_by_night=i * 10)
+                 for i in range(4)]
+        self.client.post("/api/v1/places/{}/amenities/{}".format(
+            found[1]["id"], amenity["id"]))
+        ids, resp = self.search({})
+        self.assertEqual(ids, sorted(place["id"] for place in found))
+        ids, resp = self.search({"states": [self.state["id"]]})
+        self.assertEqual(len(ids), 4)
+        ids, resp = self.search({"cities": [self.cities[0]["id"]]})
+        self.assertEqual(ids, sorted([found[0]["id"], found[2]["id"]]))
+        ids, resp = self.search({"amenities": [amenity["id"]]})
+        self.assertEqual(ids, [found[1]["id"]])
+        ids, resp = self.search({"min_price": 15, "order": "-price"})
+        self.assertEqual(ids, [found[3]["id"], found[2]["id"]])
+
+    def test_pages(self):
+        """Test the cursor of the Link header"""
+        found = sorted(self.place(self.cities[0])["id"] for i in range(3))
+        ids, resp = self.search({}, "?limit=2")
+        self.assertEqual(ids, found[:2])
+        link = resp.headers["Link"]
+        self.assertIn("cursor=" + found[1], link)
+        ids, resp = self.search({}, "?limit=2&cursor=" + found[1])
+        self.assertEqual(ids, found[2:])
+        self.assertNotIn("Link", resp.headers)
+
+    def test_invalid(self):
+        """Test that the body must be an object of lists of ids"""
+        for body in ([], {"states": "x"}, {"amenities": [1]},
+                     {"order": "name"}):
+            resp = self.client.post("/api/v1/places_search", json=body)
+            self.assertEqual(resp.status_code, 400)
+
+
+class TestPlacesGeo(PlacesTestCase):
+    """Test GET /places/near and /places/bbox"""
+    def setUp(self):
+        """Creates places along a meridian"""
+        super().setUp()
+        self.places = [self.place(self.cities[0], latitude=48.8 + i / 100,
+                                  longitude=2.3) for i in range(5)]
+
+    def test_near(self):
+        """Test the closest places come first with their distance"""
+        resp = self.client.get("/api/v1/places/near?lat=48.8&lng=2.3"
+                               "&limit=2")
+        self.assertEqual(resp.status_code, 200)
+        found = resp.get_json()
+        self.assertEqual([place["id"] for place in found],
+                         [place["id"] for place in self.places[:2]])
+        self.assertEqual(found[0]["distance"], 0)
+        resp = self.client.get("/api/v1/places/near?lat=48.8&lng=2.3"
+                               "&radius=2.5")
+        self.assertEqual(len(resp.get_json()), 3)
+
+    def test_bbox(self):
+        """Test the places inside a box"""
+        resp = self.client.get("/api/v1/places/bbox?min_lat=48.815"
+                               "&min_lng=2.2&max_lat=49&max_lng=2.4")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(sorted(place["id"] for place in resp.get_json()),
+                         sorted(place["id"] for place in self.places[2:]))
+
+    def test_invalid(self):
+        """Test that coordinates are required and in range"""
+        for query in ("near?lat=48.8&lng=2.3", "near?lat=91&lng=0&limit=1",
+                      "near?lat=x&lng=0&limit=1",
+                      "bbox?min_lat=1&min_lng=0&max_lat=0&max_lng=1",
+                      "bbox?min_lat=0&min_lng=0&max_lat=1"):
+            resp = self.client.get("/api/v1/places/" + query)
+            self.assertEqual(resp.status_code, 400, query)
+
+
+class TestPlaceStats(PlacesTestCase):
+    """Test GET /places/<place_id>/stats"""
+    def setUp(self):
+        """Creates a place"""
+        super().setUp()
+        self.place = self.place(self.cities[0], review_count=5)
+        self.url = "/api/v1/places/{}/stats".format(self.place["id"])
+
+    def stats(self):
+        """current stats of the place"""
+        resp = self.client.get(self.url)
+        self.assertEqual(resp.status_code, 200)
+        return resp.get_json()
+
+    def test_reviews(self):
+        """Test the review count and the time of the latest review"""
+        self.assertEqual(self.stats(), {"review_count": 0,
+                                        "last_review_at": None,
+                                        "amenity_count": 0})
+        reviews = [self.create("/places/{}/reviews".format(
+            self.place["id"]), user_id=self.user["id"], text=str(i))
+            for i in range(3)]
+        stats = self.stats()
+        self.assertEqual(stats["review_count"], 3)
+        self.assertEqual(stats["last_review_at"], reviews[2]["created_at"])
+        self.client.delete("/api/v1/reviews/" + reviews[2]["id"])
+        stats = self.stats()
+        self.assertEqual(stats["review_count"], 2)
+        self.assertEqual(stats["last_review_at"], reviews[1]["created_at"])
+        place = self.client.get("/api/v1/places/" + self.place["id"])
+        self.assertEqual(place.get_json()["review_count"], 2)
+
+    def test_amenities(self):
+        """Test the amenity count follows links and unlinks"""
+        amenities = [self.create("/amenities", name=str(i))
+                     for i in range(2)]
+        url = "/api/v1/places/{}/amenities/".format(self.place["id"])
+        for amenity in amenities + amenities[:1]:
+            self.client.post(url + amenity["id"])
+        self.assertEqual(self.stats()["amenity_count"], 2)
+        self.client.delete(url + amenities[0]["id"])
+        self.assertEqual(self.stats()["amenity_count"], 1)
+
+    def test_not_modified(self):
+        """Test that stats are answered with 304 until a review is added"""
+        etag = self.client.get(self.url).headers["ETag"]
+        resp = self.client.get(self.url, headers={"If-None-Match": etag})
+        self.assertEqual(resp.status_code, 304)
+        self.create("/places/{}/reviews".format(self.place["id"]),
+                    user_id=self.user["id"], text="good")
+        resp = self.client.get(self.url, headers={"If-None-Match": etag})
+        self.assertEqual(resp.status_code, 200)
+
+    def test_counted_on_read(self):
+        """Test that counting a place on its first read does not change
+        its updated_at, so that its ETag stays valid"""
+        place = models.storage.get(Place, self.place["id"])
+        place.review_count = None
+        models.storage.new(place)
+        models.storage.save()
+        resp = self.client.get(self.url)
+        self.assertEqual(resp.get_json()["review_count"], 0)
+        resp = self.client.get(self.url, headers={
+            "If-None-Match": resp.headers["ETag"]})
+        self.assertEqual(resp.status_code, 304)
+        resp = self.client.get("/api/v1/places/" + self.place["id"])
+        self.assertEqual(resp.get_json()["updated_at"],
+                         self.place["updated_at"])
+
+    def test_not_set_by_clients(self):
+        """Test that clients cannot write the aggregates"""
+        self.client.put("/api/v1/places/" + self.place["id"],
+                        json={"review_count": 9, "amenity_count": 9})
+        self.assertEqual(self.stats()["review_count"], 0)
+        self.assertEqual(self.stats()["amenity_count"], 0)
+        resp = self.client.get("/api/v1/places/missing/stats")
+        self.assertEqual(resp.status_code, 404)
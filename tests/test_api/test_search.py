@@ -0,0 +1,71 @@
+#!/usr/bin/python3
+"""
+Contains the TestSearchDocs and TestSearch classes
+"""
+
+from api.v1.views import search
+import pep8
+from tests.test_api import APITestCase
+import unittest
+
+
+class TestSearchDocs(unittest.TestCase):
+    """Tests to check the documentation and style of search.py"""
+    def test_pep8_conformance_search(self):
+        """Test that api/v1/views/search.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/views/search.py',
+                                    'tests/test_api/test_search.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_search_module_docstring(self):
+        """Test for the search.py module docstring"""
+        self.assertIsNot(search.__doc__, None,
+                         "search.py needs a docstring")
+        self.assertTrue(len(search.__doc__) >= 1,
+                        "search.py needs a docstring")
+
+
+class TestSearch(APITestCase):
+    """Test the full-text search endpoint"""
+    def setUp(self):
+        """Creates a place with reviews"""
+        super().setUp()
+        state = self.create("/states", name="California")
+        city = self.create("/states/{}/cities".format(state["id"]),
+                           name="San Francisco")
+        user = self.create("/users", email="a@b.c", password="pwd")
+        self.place = self.create("/cities/{}/places".format(city["id"]),
+                                 user_id=user["id"], name="loft",
+                                 description="Sunny loft near the beach")
+        self.reviews = [self.create("/places/{}/reviews".format(
+            self.place["id"]), user_id=user["id"], text=text)
+            for text in ("Beach, beach and more beach", "Quiet nights")]
+
+    def found(self, query):
+        """ids of the results of a search"""
+        resp = self.client.get("/api/v1/search?" + query)
+        self.assertEqual(resp.status_code, 200)
+        return [obj["id"] for obj in resp.get_json()]
+
+    def test_search(self):
+        """Test that results are ranked across classes and filtered"""
+        self.assertEqual(self.found("q=beach"),
+                         [self.reviews[0]["id"], self.place["id"]])
+        self.assertEqual(self.found("q=beach&type=places"),
+                         [self.place["id"]])
+        self.assertEqual(self.found("q=beach&limit=1"),
+                         [self.reviews[0]["id"]])
+        self.assertEqual(self.found("q=mountain"), [])
+
+    def test_deleted(self):
+        """Test that deleted reviews are not found"""
+        self.client.delete("/api/v1/reviews/" + self.reviews[1]["id"])
+        self.assertEqual(self.found("q=quiet"), [])
+
+    def test_invalid(self):
+        """Test that a query and a known type are required"""
+        for query in ("", "q=", "q=beach&type=users", "q=beach&limit=0"):
+            resp = self.client.get("/api/v1/search?" + query)
+            self.assertEqual(resp.status_code, 400)
@@ -0,0 +1,100 @@
+#!/usr/bin/python3
+"""
+Contains the TestLRUCacheDocs and TestLRUCache classes
+"""
+
+import inspect
+from models.engine import cache
+import pep8
+import time
+import unittest
+LRUCache = cache.LRUCache
+
+
+class TestLRUCacheDocs(unittest.TestCase):
+    """Tests to check the documentation and style of LRUCache class"""
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.cache_f = inspect.getmembers(LRUCache, inspect.isfunction)
+
+    def test_pep8_conformance_cache(self):
+        """Test that models/engine/cache.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/cache.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_cache_module_docstring(self):
+        """Test for the cache.py module docstring"""
+        self.assertIsNot(cache.__doc__, None,
+                         "cache.py needs a docstring")
+        self.assertTrue(len(cache.__doc__) >= 1,
+                        "cache.py needs a docstring")
+
+    def test_cache_class_docstring(self):
+        """Test for the LRUCache class docstring"""
+        self.assertIsNot(LRUCache.__doc__, None,
+                         "LRUCache class needs a docstring")
+        self.assertTrue(len(LRUCache.__doc__) >= 1,
+                        "LRUCache class needs a docstring")
+
+    def test_cache_func_docstrings(self):
+        """Test for the presence of docstrings in LRUCache methods"""
+        for func in self.cache_f:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} method needs a docstring".format(func[0]))
+            self.assertTrue(len(func[1].__doc__) >= 1,
+                            "{:s} method needs a docstring".format(func[0]))
+
+
+class TestLRUCache(unittest.TestCase):
+    """Test the LRUCache class"""
+    def test_hit_and_miss(self):
+        """Test that stored entries are returned and counted"""
+        lru = LRUCache(maxsize=2)
+        lru.set("State.1", {"id": "1"})
+        self.assertEqual(lru.get("State.1"), {"id": "1"})
+        self.assertIsNone(lru.get("State.2"))
+        stats = lru.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["size"], 1)
+
+    def test_eviction(self):
+        """Test that the least recently used entry is evicted first"""
+        lru = LRUCache(maxsize=2)
+        lru.set("a", 1)
+        lru.set("b", 2)
+        lru.get("a")
+        lru.set("c", 3)
+        self.assertIsNone(lru.get("b"))
+        self.assertEqual(lru.get("a"), 1)
+        self.assertEqual(lru.get("c"), 3)
+        self.assertEqual(lru.stats()["evictions"], 1)
+
+    def test_ttl(self):
+        """Test that expired entries are not returned"""
+        lru = LRUCache(maxsize=2, ttl=0.01)
+        lru.set("a", 1)
+        time.sleep(0.02)
+        self.assertIsNone(lru.get("a"))
+        self.assertEqual(lru.stats()["size"], 0)
+
+    def test_discard(self):
+        """Test that discarded entries are gone"""
+        lru = LRUCache()
+        lru.set("a", 1)
+        lru.discard("a")
+        lru.discard("missing")
+        self.assertIsNone(lru.get("a"))
+
+    def test_disabled(self):
+        """Test that a cache of size 0 stores nothing"""
+        lru = LRUCache(maxsize=0)
+        lru.set("a", 1)
+        self.assertIsNone(lru.get("a"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,324 @@
+#!/usr/bin/python3
+"""
+Contains the TestDBQueriesDocs and TestDBStorage* classes, which run the
+queries of DBStorage against the database
+"""
+
+from datetime import timedelta
+import models
+from models.amenity import Amenity
+from models.city import City
+from models.place import Place
+from models.review import Review
+from models.state import State
+from models.user import User
+import os
+import pep8
+import threading
+import unittest
+from unittest import mock
+
+
+class TestDBQueriesDocs(unittest.TestCase):
+    """Tests to check the style of the DBStorage query tests"""
+    def test_pep8_conformance_test_db_queries(self):
+        """Test tests/test_models/test_engine/test_db_queries.py conforms
+        to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/'
+                                    'test_db_queries.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+
+@unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+class TestDBStorage(unittest.TestCase):
+    """Runs each test in a session of its own"""
+    def setUp(self):
+        """Starts from a new session"""
+        self.storage = models.storage
+        self.storage.close()
+
+    def tearDown(self):
+        """Drops what the test left in the session"""
+        self.storage.close()
+
+    def store(self, *objs):
+        """adds objs to the database"""
+        self.storage.bulk_new(objs)
+        self.storage.save()
+
+    def places(self, *attrs):
+        """
+        adds a place for each dictionary of attributes, in a new city of
+        a new state, owned by a new user
+        return: list of places
+        """
+        state = State(name="California")
+        city = City(state_id=state.id, name="San Francisco")
+        user = User(email="a@b.c", password="pwd")
+        places = [Place(city_id=city.id, user_id=user.id, name=str(i),
+                        **kwargs) for i, kwargs in enumerate(attrs)]
+        self.store(state, city, user, *places)
+        return places
+
+
+class TestDBStorageCounts(TestDBStorage):
+    """Test count() and counts()"""
+    def test_counts(self):
+        """Test that the counts follow the rows added"""
+        before = self.storage.counts()
+        state = State(name="California")
+        self.store(state, City(state_id=state.id, name="San Francisco"),
+                   City(state_id=state.id, name="San Jose"))
+        counts = self.storage.counts()
+        self.assertEqual(counts["State"], before["State"] + 1)
+        self.assertEqual(counts["City"], before["City"] + 2)
+        self.assertEqual(counts["User"], before["User"])
+        self.assertEqual(self.storage.count(City), counts["City"])
+        self.assertEqual(self.storage.count("City"), counts["City"])
+        self.assertEqual(self.storage.count(), sum(counts.values()))
+
+    def test_counts_cached(self):
+        """Test that counts() is served from its cache for HBNB_STATS_TTL
+        seconds, or until the next save()"""
+        with mock.patch.dict(os.environ, {"HBNB_STATS_TTL": "60"}):
+            before = self.storage.counts()
+            self.storage.new(State(name="California"))
+            self.storage._DBStorage__session.commit()
+            self.assertEqual(self.storage.counts(), before)
+            self.storage.save()
+            self.assertEqual(self.storage.counts()["State"],
+                             before["State"] + 1)
+
+
+class TestDBStoragePage(TestDBStorage):
+    """Test the keyset pagination of page()"""
+    def test_page(self):
+        """Test that pages follow each other in id order"""
+        state = State(name="California")
+        cities = [City(state_id=state.id, name=str(i)) for i in range(5)]
+        self.store(state, *cities)
+        ids = sorted(city.id for city in cities)
+        objs, next_id = self.storage.page(City, limit=3,
+                                          filter={"state_id": state.id})
+        self.assertEqual([obj.id for obj in objs], ids[:3])
+        self.assertEqual(next_id, ids[2])
+        objs, next_id = self.storage.page(City, after_id=next_id, limit=3,
+                                          filter={"state_id": state.id})
+        self.assertEqual([obj.id for obj in objs], ids[3:])
+        self.assertIsNone(next_id)
+        objs, next_id = self.storage.page("City",
+                                          filter={"state_id": state.id})
+        self.assertEqual([obj.id for obj in objs], ids)
+        self.assertIsNone(next_id)
+
+
+class TestDBStorageRanked(TestDBStorage):
+    """Test the ranges and the ordering of page()"""
+    def test_ranges_and_order(self):
+        """Test range filters and ordering by price across pages"""
+        places = self.places(*({"price_by_night": i % 4, "max_guest": i}
+                               for i in range(8)))
+        city = {"city_id": places[0].city_id}
+        for order, reverse in (("price_by_night", False),
+                               ("-price_by_night", True)):
+            expected = sorted((p for p in places if p.max_guest >= 2),
+                              key=lambda p: (p.price_by_night, p.id),
+                              reverse=reverse)
+            found, cursor = [], None
+            while True:
+                objs, cursor = self.storage.page(
+                    Place, after_id=cursor, limit=4, filter=city,
+                    ranges={"max_guest": (2, None)}, order=order)
+                found += [obj.id for obj in objs]
+                if cursor is None:
+                    break
+            self.assertEqual(found, [p.id for p in expected])
+        objs, cursor = self.storage.page(Place, filter=city,
+                                         ranges={"price_by_night": (1, 2)})
+        self.assertEqual([obj.id for obj in objs],
+                         sorted(p.id for p in places
+                                if 1 <= p.price_by_night <= 2))
+
+
+class TestDBStoragePool(TestDBStorage):
+    """Test the connection pool counters"""
+    def test_pool_stats(self):
+        """Test that a new session checks a connection out of the pool"""
+        stats = self.storage.pool_stats()
+        for event in ("checkouts", "connects", "invalidations",
+                      "overflow_checkouts", "saturated_checkouts"):
+            self.assertIn(event, stats)
+        self.storage.count(State)
+        after = self.storage.pool_stats()
+        self.assertEqual(after["checkouts"], stats["checkouts"] + 1)
+        if "size" in after:
+            self.assertEqual(after["checked_out"], 1)
+        self.assertEqual(self.storage.metrics()["pool"], after)
+
+
+class TestDBStorageSearchPlaces(TestDBStorage):
+    """Test search_places()"""
+    def test_search_places(self):
+        """Test searching places by state, city and amenities"""
+        amenities = [Amenity(name="wifi"), Amenity(name="pool")]
+        self.store(*amenities)
+        places = self.places({}, {}) + self.places({}, {}, {}, {})
+        for i, place in enumerate(places):
+            place.amenities.append(amenities[0])
+            if i % 3 == 0:
+                place.amenities.append(amenities[1])
+        self.store(*places)
+        state_id = self.storage.get(City, places[0].city_id).state_id
+        wifi, pool = amenities[0].id, amenities[1].id
+
+        def ids(objs):
+            return sorted(obj.id for obj in objs)
+
+        found, next_id = self.storage.search_places(states=[state_id])
+        self.assertEqual(ids(found), ids(places[:2]))
+        found, next_id = self.storage.search_places(
+            cities=[places[2].city_id], amenities=[pool])
+        self.assertEqual(ids(found), [places[3].id])
+        found, next_id = self.storage.search_places(
+            states=[state_id], cities=[places[2].city_id],
+            amenities=[wifi, pool])
+        self.assertEqual(ids(found), ids(places[::3]))
+        found, next_id = self.storage.search_places(amenities=[wifi, pool],
+                                                    limit=1)
+        self.assertEqual(ids(found), ids(places[::3])[:1])
+        found, next_id = self.storage.search_places(amenities=[wifi, pool],
+                                                    after_id=next_id)
+        self.assertEqual(ids(found), ids(places[::3])[1:])
+        self.assertIsNone(next_id)
+
+
+class TestDBStorageGeo(TestDBStorage):
+    """Test near() and within()"""
+    def test_near_and_within(self):
+        """Test the places closest to a point and inside a box"""
+        places = self.places(*({"latitude": 48.8 + i / 100,
+                                "longitude": 2.3} for i in range(5)))
+        found = self.storage.near(Place, 48.8, 2.3, limit=2)
+        self.assertEqual([obj.id for distance, obj in found],
+                         [places[0].id, places[1].id])
+        found = self.storage.near("Place", 48.8, 2.3, radius=2.5)
+        self.assertEqual([obj.id for distance, obj in found],
+                         [place.id for place in places[:3]])
+        found = self.storage.within(Place, (48.815, 2.2, 49.0, 2.4))
+        self.assertEqual(sorted(obj.id for distance, obj in found),
+                         sorted(place.id for place in places[2:]))
+
+    def test_within_across_meridian(self):
+        """Test a box crossing the 180th meridian"""
+        places = self.places({"latitude": -17.7, "longitude": 179.9},
+                             {"latitude": -17.7, "longitude": -179.9},
+                             {"latitude": -17.7, "longitude": 178.0})
+        found = self.storage.within(Place, (-18.0, 179.5, -17.5, -179.5))
+        self.assertEqual(sorted(obj.id for distance, obj in found),
+                         sorted(place.id for place in places[:2]))
+
+
+class TestDBStorageSearch(TestDBStorage):
+    """Test the FULLTEXT search of search()"""
+    def test_search(self):
+        """Test that matches are ranked by relevance"""
+        place = self.places({"description": "Cabin on the beach"})[0]
+        reviews = [Review(place_id=place.id, user_id=place.user_id,
+                          text=text)
+                   for text in ("Sunny beach, lovely beach", "Quiet woods",
+                                "Near the beach")]
+        self.store(*reviews)
+        found = self.storage.search("beach", Review)
+        self.assertEqual([obj.id for score, obj in found],
+                         [reviews[0].id, reviews[2].id])
+        self.assertGreater(found[0][0], found[1][0])
+        found = self.storage.search("beach", "Review", limit=1)
+        self.assertEqual([obj.id for score, obj in found], [reviews[0].id])
+        self.assertEqual(sorted(obj.id for score, obj
+                                in self.storage.search("beach")),
+                         sorted([place.id, reviews[0].id, reviews[2].id]))
+        self.assertEqual(self.storage.search("beach", State), [])
+
+
+class TestDBStorageCache(TestDBStorage):
+    """Test the cache in front of get_dict()"""
+    def test_cached_until_saved(self):
+        """Test that a saved change replaces the cached dictionary"""
+        state = State(name="California")
+        self.storage.new(state)
+        self.storage.save()
+        self.assertEqual(self.storage.get_dict(State, state.id)["name"],
+                         "California")
+        state.name = "Nevada"
+        self.storage.new(state)
+        self.storage.save()
+        self.assertEqual(self.storage.get_dict(State, state.id)["name"],
+                         "Nevada")
+        self.assertIsNone(self.storage.get_dict(State, "missing"))
+
+    def test_read_during_commit(self):
+        """Test that a row read by another session before the commit
+        is not served from the cache afterwards"""
+        state = State(name="California")
+        self.storage.new(state)
+        self.storage.save()
+        state.name = "Nevada"
+        self.storage.new(state)
+
+        def read():
+            """another request reading the state"""
+            self.storage.get_dict(State, state.id)
+            self.storage.close()
+
+        session = self.storage._DBStorage__session
+        commit = session.commit
+
+        def racing_commit():
+            """a commit another request reads the old row during"""
+            thread = threading.Thread(target=read)
+            thread.start()
+            thread.join()
+            commit()
+
+        with mock.patch.object(session, "commit", racing_commit):
+            self.storage.save()
+        self.assertEqual(self.storage.get_dict(State, state.id)["name"],
+                         "Nevada")
+
+
+class TestDBStorageVersion(TestDBStorage):
+    """Test version() and collection_version()"""
+    # DATETIME columns may drop the microseconds
+    delta = timedelta(seconds=1)
+
+    def test_version(self):
+        """Test the version of a row, queried then read from the cache"""
+        state = State(name="California")
+        self.store(state)
+        self.assertAlmostEqual(self.storage.version(State, state.id),
+                               state.updated_at, delta=self.delta)
+        self.storage.get_dict(State, state.id)
+        self.assertAlmostEqual(self.storage.version("State", state.id),
+                               state.updated_at, delta=self.delta)
+        self.assertTrue(self.storage.exists(State, state.id))
+        self.assertIsNone(self.storage.version(State, "missing"))
+        self.assertFalse(self.storage.exists(State, "missing"))
+
+    def test_collection_version(self):
+        """Test that the version of a collection follows its rows"""
+        state = State(name="California")
+        cities = [City(state_id=state.id, name=str(i)) for i in range(3)]
+        self.store(state, *cities)
+        count, latest = self.storage.collection_version(
+            City, {"state_id": state.id})
+        self.assertEqual(count, 3)
+        self.assertAlmostEqual(latest, cities[-1].updated_at,
+                               delta=self.delta)
+        self.storage.delete(cities[0])
+        self.storage.save()
+        self.assertEqual(self.storage.collection_version(
+            City, {"state_id": state.id})[0], 2)
+        self.assertEqual(self.storage.collection_version(
+            City, {"state_id": "missing"}), (0, None))
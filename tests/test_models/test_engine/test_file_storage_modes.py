@@ -0,0 +1,504 @@
+#!/usr/bin/python3
+"""
+Contains the TestFileStorageModesDocs and TestFileStorage* classes, which
+save objects and read them back from disk in each mode of FileStorage
+"""
+
+from datetime import datetime
+import json
+import models
+from models.engine import file_storage
+from models.city import City
+from models.place import Place
+from models.review import Review
+from models.state import State
+import os
+import pep8
+import pickle
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+FileStorage = file_storage.FileStorage
+
+
+class TestFileStorageModesDocs(unittest.TestCase):
+    """Tests to check the style of the FileStorage mode tests"""
+    def test_pep8_conformance_test_file_storage_modes(self):
+        """Test tests/test_models/test_engine/test_file_storage_modes.py
+        conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/'
+                                    'test_file_storage_modes.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestFileStorage(unittest.TestCase):
+    """Test FileStorage with the default settings"""
+    # modes of FileStorage for the test, whatever the environment says
+    modes = {"journal": False, "lazy": False, "packed": False,
+             "format": "json"}
+
+    def setUp(self):
+        """Points FileStorage at an empty temporary directory"""
+        self.saved = {attr: value for attr, value in vars(FileStorage).items()
+                      if attr.startswith("_FileStorage__") and
+                      not callable(value) and
+                      not isinstance(value, staticmethod)}
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "file.json")
+        FileStorage().reset(self.path, **self.modes)
+        self.storage = self.open()
+
+    def tearDown(self):
+        """Puts FileStorage back as it was and removes the directory"""
+        for attr, value in self.saved.items():
+            setattr(FileStorage, attr, value)
+        shutil.rmtree(self.tmp)
+
+    def open(self):
+        """Reads the temporary directory again, as a new process would"""
+        storage = FileStorage()
+        storage.reset()
+        storage.reload()
+        return storage
+
+    def test_get_after_reload(self):
+        """Test that saved objects are read back from disk"""
+        state = State(name="California")
+        self.storage.new(state)
+        self.storage.save()
+        storage = self.open()
+        self.assertEqual(storage.get(State, state.id).to_dict(),
+                         state.to_dict())
+        self.assertEqual(storage.version(State, state.id), state.updated_at)
+        self.assertIsNone(storage.get(State, "missing"))
+
+    def test_modes(self):
+        """Test that the modes of the test replace the environment"""
+        for mode, value in self.modes.items():
+            self.assertEqual(getattr(FileStorage, "_FileStorage__" + mode),
+                             value)
+        with self.assertRaises(TypeError):
+            self.storage.reset(sorted=True)
+
+    def test_delete(self):
+        """Test that deletions survive a reload"""
+        states = [State(name=str(i)) for i in range(50)]
+        self.storage.bulk_new(states)
+        self.storage.save()
+        self.storage.bulk_delete(states[::3])
+        self.storage.save()
+        storage = self.open()
+        self.assertEqual(storage.count(State), 33)
+        objs, next_id = storage.page(State)
+        self.assertEqual([obj.id for obj in objs],
+                         sorted(state.id for i, state in enumerate(states)
+                                if i % 3))
+
+    def test_collection_version(self):
+        """Test that the version of a collection follows its changes
+        without building its objects"""
+        states = [State(name=str(i)) for i in range(5)]
+        self.storage.bulk_new(states)
+        self.storage.save()
+        storage = self.open()
+        pending = storage.metrics()["hydration"]["pending"]
+        version = storage.collection_version(State)
+        self.assertEqual(version, (5, states[-1].updated_at))
+        self.assertEqual(storage.collection_version(State, {"name": "3"}),
+                         (1, states[3].updated_at))
+        self.assertEqual(storage.metrics()["hydration"]["pending"], pending)
+        state = storage.get(State, states[0].id)
+        state.name = "California"
+        state.updated_at = datetime.utcnow()
+        storage.new(state)
+        self.assertEqual(storage.collection_version(State),
+                         (5, state.updated_at))
+        storage.delete(state)
+        self.assertEqual(storage.collection_version(State)[0], 4)
+
+    def test_failed_write(self):
+        """Test that a failed write leaves the file and no temporary file"""
+        state = State(name="California")
+        self.storage.new(state)
+        self.storage.save()
+        self.storage.new(State(name="Nevada"))
+
+        def full(storage, f, journal=False):
+            """a disk that is full"""
+            raise OSError(28, "No space left on device")
+
+        with mock.patch.object(FileStorage, "_FileStorage__sync", full):
+            with self.assertRaises(OSError):
+                self.storage.convert(FileStorage._FileStorage__format)
+        self.assertEqual([name for name in os.listdir(self.tmp)
+                          if name.endswith(".tmp")], [])
+        self.assertEqual(self.open().count(State), 1)
+
+    def test_pickle_refused(self):
+        """Test that a pickle file is only loaded when it is the format"""
+        if FileStorage._FileStorage__format == "pickle":
+            self.skipTest("pickle is the format")
+        with open(self.path, "wb") as f:
+            f.write(pickle.dumps({}, protocol=5))
+        with self.assertRaises(ValueError):
+            self.open()
+
+    def test_all_of_a_class(self):
+        """Test that objects are listed by class after a reload"""
+        state = State(name="California")
+        city = City(state_id=state.id, name="San Francisco")
+        self.storage.new(state)
+        self.storage.new(city)
+        self.storage.save()
+        storage = self.open()
+        self.assertEqual(list(storage.all(State)), ["State." + state.id])
+        self.assertEqual(list(storage.all("City")), ["City." + city.id])
+        self.assertEqual(storage.count(City), 1)
+        storage.delete(city)
+        self.assertEqual(storage.all(City), {})
+        self.assertEqual(storage.count(), 1)
+
+    def test_children(self):
+        """Test the foreign key index after a reload"""
+        states = [State(name=str(i)) for i in range(2)]
+        cities = [City(state_id=states[0].id, name=str(i))
+                  for i in range(5)]
+        for obj in states + cities:
+            self.storage.new(obj)
+        self.storage.save()
+        storage = self.open()
+        self.assertEqual(sorted(city.id for city in storage.children(
+            City, "state_id", states[0].id)),
+            sorted(city.id for city in cities))
+        self.assertEqual(storage.counts()["City"], 5)
+        storage.delete(cities[0])
+        city = storage.get(City, cities[1].id)
+        city.state_id = states[1].id
+        storage.new(city)
+        self.assertEqual(len(storage.children(City, "state_id",
+                                              states[0].id)), 3)
+        self.assertEqual([obj.id for obj in storage.children(
+            City, "state_id", states[1].id)], [city.id])
+
+    def test_page(self):
+        """Test filters and pagination after a reload"""
+        state = State(name="California")
+        cities = [City(state_id=state.id, name=str(i % 2))
+                  for i in range(5)]
+        for obj in [state] + cities:
+            self.storage.new(obj)
+        self.storage.save()
+        storage = self.open()
+        ids = sorted(city.id for city in cities)
+        objs, next_id = storage.page(City, limit=3)
+        self.assertEqual([obj.id for obj in objs], ids[:3])
+        objs, next_id = storage.page(City, after_id=next_id, limit=3)
+        self.assertEqual([obj.id for obj in objs], ids[3:])
+        self.assertIsNone(next_id)
+        objs, next_id = storage.page(City, filter={"state_id": state.id,
+                                                   "name": "1"})
+        self.assertEqual([obj.id for obj in objs],
+                         sorted(city.id for city in cities[1::2]))
+        self.assertEqual(storage.collection_version(City, {"name": "1"}),
+                         (2, cities[3].updated_at))
+        storage.delete(storage.get(City, ids[0]))
+        objs, next_id = storage.page(City)
+        self.assertEqual([obj.id for obj in objs], ids[1:])
+
+    def test_unsaved_objects(self):
+        """Test that new objects are visible before save() only"""
+        state = State(name="California")
+        self.storage.new(state)
+        self.assertEqual(self.storage.get(State, state.id).id, state.id)
+        self.assertEqual(self.storage.counts()["State"], 1)
+        self.assertEqual(self.open().count(State), 0)
+
+    def test_no_temporary_file(self):
+        """Test that saving leaves only the file and its journal"""
+        self.storage.new(State(name="California"))
+        self.storage.save()
+        self.storage.convert(FileStorage._FileStorage__format)
+        self.assertEqual([name for name in os.listdir(self.tmp)
+                          if name.endswith(".tmp")], [])
+
+    def test_corrupt_file(self):
+        """Test that a file that cannot be read is an error"""
+        with open(self.path, "w") as f:
+            f.write("{")
+        with self.assertRaises(ValueError):
+            self.open()
+
+    def test_close_reloads_changed_file(self):
+        """Test that close() only reloads when the file changed"""
+        state = State(name="California")
+        self.storage.new(state)
+        self.storage.save()
+        stats = self.storage.metrics()["reload"]
+        self.storage.close()
+        self.assertEqual(self.storage.metrics()["reload"]["hits"],
+                         stats["hits"] + 1)
+        other = State(name="Nevada")
+        data = {key: obj.to_dict() for key, obj in
+                [("State." + state.id, state), ("State." + other.id, other)]}
+        with open(self.path, "w") as f:
+            json.dump(data, f)
+        self.storage.close()
+        self.assertEqual(self.storage.metrics()["reload"]["reloads"],
+                         stats["reloads"] + 1)
+        self.assertIsNotNone(self.storage.get(State, other.id))
+
+    def test_search_places(self):
+        """Test searching places by state, city and amenities"""
+        states = [State(name=str(i)) for i in range(2)]
+        cities = [City(state_id=state.id, name="c") for state in states]
+        places = [Place(city_id=cities[i % 2].id, name=str(i),
+                        amenity_ids=["a"] if i % 3 else ["a", "b"])
+                  for i in range(6)]
+        self.storage.bulk_new(states + cities + places)
+        self.storage.save()
+        storage = self.open()
+
+        def ids(objs):
+            return sorted(obj.id for obj in objs)
+
+        found, next_id = storage.search_places(states=[states[0].id])
+        self.assertEqual(ids(found), ids(places[::2]))
+        found, next_id = storage.search_places(cities=[cities[1].id],
+                                               amenities=["b"])
+        self.assertEqual(ids(found), [places[3].id])
+        found, next_id = storage.search_places(amenities=["a", "b"],
+                                               limit=1)
+        self.assertEqual(ids(found), ids(places[::3])[:1])
+        found, next_id = storage.search_places(amenities=["a", "b"],
+                                               after_id=next_id)
+        self.assertEqual(ids(found), ids(places[::3])[1:])
+        self.assertIsNone(next_id)
+
+    def test_ranges_and_order(self):
+        """Test range filters and ordering by price across pages"""
+        places = [Place(name=str(i), price_by_night=i % 4, max_guest=i)
+                  for i in range(8)]
+        self.storage.bulk_new(places)
+        self.storage.save()
+        storage = self.open()
+        expected = sorted((p for p in places if p.max_guest >= 2),
+                          key=lambda p: (p.price_by_night, p.id),
+                          reverse=True)
+        found, cursor = [], None
+        while True:
+            objs, cursor = storage.page(Place, after_id=cursor, limit=3,
+                                        ranges={"max_guest": (2, None)},
+                                        order="-price_by_night")
+            found += [obj.id for obj in objs]
+            if cursor is None:
+                break
+        self.assertEqual(found, [p.id for p in expected])
+        place = storage.get(Place, places[0].id)
+        place.price_by_night = 10
+        storage.new(place)
+        objs, cursor = storage.page(Place, limit=1, order="-price_by_night")
+        self.assertEqual(objs[0].id, place.id)
+
+    def test_text_search(self):
+        """Test that the full-text index follows new and deleted objects"""
+        reviews = [Review(place_id="p", user_id="u", text=text)
+                   for text in ("Sunny beach, lovely beach", "Quiet woods",
+                                "Near the beach")]
+        self.storage.bulk_new(reviews)
+        self.storage.save()
+        storage = self.open()
+        found = storage.search("beach", Review)
+        self.assertEqual([obj.id for score, obj in found],
+                         [reviews[0].id, reviews[2].id])
+        storage.delete(reviews[0])
+        review = Review(place_id="p", user_id="u", text="beach house")
+        storage.new(review)
+        self.assertEqual(sorted(obj.id for score, obj
+                                in storage.search("beach")),
+                         sorted([reviews[2].id, review.id]))
+
+    def test_near_and_within(self):
+        """Test the spatial index after a reload"""
+        places = [Place(name=str(i), latitude=48.8 + i / 100,
+                        longitude=2.3) for i in range(5)]
+        self.storage.bulk_new(places)
+        self.storage.save()
+        storage = self.open()
+        found = storage.near(Place, 48.8, 2.3, limit=2)
+        self.assertEqual([obj.id for distance, obj in found],
+                         [places[0].id, places[1].id])
+        found = storage.within(Place, (48.815, 2.2, 49.0, 2.4))
+        self.assertEqual(sorted(obj.id for distance, obj in found),
+                         sorted(place.id for place in places[2:]))
+
+    def test_convert(self):
+        """Test that a converted file is read back in its new format"""
+        self.storage.new(State(name="California"))
+        self.storage.save()
+        for file_format in ("msgpack", "json"):
+            if file_format == "msgpack" and file_storage.msgpack is None:
+                continue
+            self.storage.convert(file_format)
+            with open(self.path, "rb") as f:
+                self.assertEqual(file_storage.snapshot_format(f.read()),
+                                 file_format)
+            self.assertEqual(self.open().count(State), 1)
+
+
+class TestFileStorageLazy(TestFileStorage):
+    """Test FileStorage keeping reloaded objects as dictionaries"""
+    modes = dict(TestFileStorage.modes, lazy=True)
+
+    def test_hydrated_on_access(self):
+        """Test that objects are only built when they are accessed"""
+        states = [State(name=str(i)) for i in range(5)]
+        self.storage.bulk_new(states)
+        self.storage.save()
+        storage = self.open()
+        self.assertEqual(storage.metrics()["hydration"]["pending"], 5)
+        state = storage.get(State, states[0].id)
+        self.assertIs(storage.get(State, states[0].id), state)
+        self.assertEqual(storage.metrics()["hydration"]["pending"], 4)
+        self.assertEqual(storage.get_dict(State, states[1].id)["name"], "1")
+        self.assertEqual(storage.metrics()["hydration"]["pending"], 4)
+        storage.all()
+        self.assertEqual(storage.metrics()["hydration"]["pending"], 0)
+
+
+class TestFileStoragePacked(TestFileStorage):
+    """Test FileStorage holding objects as packed tuples"""
+    modes = dict(TestFileStorage.modes, packed=True)
+
+    def test_extra_attributes(self):
+        """Test that attributes outside the packed fields are kept"""
+        place = Place(name="loft", review_count=3)
+        place.color = "blue"
+        self.storage.new(place)
+        self.storage.save()
+        storage = self.open()
+        self.assertTrue(storage.metrics()["hydration"]["packed"])
+        got = storage.get(Place, place.id)
+        self.assertEqual(got.to_dict(), place.to_dict())
+        objs, next_id = storage.page(Place, filter={"color": "blue"})
+        self.assertEqual([obj.id for obj in objs], [place.id])
+
+    def test_same_instance(self):
+        """Test that an object is built once until the next save()"""
+        states = [State(name=str(i)) for i in range(2)]
+        self.storage.bulk_new(states)
+        self.storage.save()
+        storage = self.open()
+        state = storage.get(State, states[0].id)
+        self.assertIs(storage.get(State, states[0].id), state)
+        self.assertIs(storage.all(State)["State." + state.id], state)
+        state.name = "California"
+        storage.new(state)
+        other = storage.get(State, states[0].id)
+        other.updated_at = datetime.utcnow()
+        storage.new(other)
+        storage.save()
+        self.assertIsNot(storage.get(State, states[0].id), state)
+        state = self.open().get(State, states[0].id)
+        self.assertEqual((state.name, state.updated_at),
+                         ("California", other.updated_at))
+
+
+@unittest.skipIf(file_storage.msgpack is None, "msgpack is not installed")
+class TestFileStorageMsgpack(TestFileStorage):
+    """Test FileStorage writing msgpack snapshots"""
+    modes = dict(TestFileStorage.modes, format="msgpack")
+
+
+class TestFileStoragePickle(TestFileStorage):
+    """Test FileStorage writing pickle snapshots"""
+    modes = dict(TestFileStorage.modes, format="pickle")
+
+
+class TestFileStorageJournal(TestFileStorage):
+    """Test FileStorage appending changes to a journal"""
+    modes = dict(TestFileStorage.modes, journal=True)
+
+    def test_replay_deletions(self):
+        """Test that objects deleted and added again in the journal are
+        listed once"""
+        states = [State(name=str(i)) for i in range(20)]
+        self.storage.bulk_new(states)
+        self.storage.save()
+        self.storage.bulk_delete(states[:5])
+        self.storage.save()
+        self.storage.new(states[0])
+        self.storage.save()
+        self.assertTrue(os.path.exists(self.path + ".log"))
+        storage = self.open()
+        objs, next_id = storage.page(State)
+        self.assertEqual([obj.id for obj in objs],
+                         sorted(state.id for state in
+                                states[:1] + states[5:]))
+        self.assertIsNone(next_id)
+
+    def test_unfinished_compaction(self):
+        """Test that the journal of a compaction whose snapshot was never
+        written is kept by the next compaction"""
+        def killed(storage, json_objects):
+            """a snapshot thread killed before writing anything"""
+            FileStorage._FileStorage__compact_lock.release()
+
+        saved = []
+        for run in range(3):
+            storage = self.open()
+            states = [State(name=str(i)) for i in range(6)]
+            storage.bulk_new(states)
+            storage.save()
+            saved += states
+            with mock.patch.object(FileStorage,
+                                   "_FileStorage__write_snapshot", killed):
+                storage.compact()
+        self.assertEqual(self.open().count(State), len(saved))
+        self.open().compact(wait=True)
+        self.assertFalse(os.path.exists(self.path + ".log.old"))
+        self.assertEqual(self.open().count(State), len(saved))
+
+    def test_compaction(self):
+        """Test that a full journal is folded into the file"""
+        FileStorage._FileStorage__compact_every = 5
+        states = [State(name=str(i)) for i in range(12)]
+        for state in states:
+            self.storage.new(state)
+            self.storage.save()
+        # waits for the snapshot thread
+        with FileStorage._FileStorage__compact_lock:
+            pass
+        self.assertTrue(os.path.exists(self.path))
+        self.assertFalse(os.path.exists(self.path + ".log.old"))
+        with open(self.path + ".log") as f:
+            self.assertLess(len(f.readlines()), 12)
+        self.assertEqual(self.open().count(State), 12)
+
+    def test_torn_record(self):
+        """Test that a partly written last record is dropped"""
+        state = State(name="California")
+        self.storage.new(state)
+        self.storage.save()
+        size = os.path.getsize(self.path + ".log")
+        with open(self.path + ".log", "ab") as f:
+            f.write(b'{"op": "put", "key": "State.')
+        storage = self.open()
+        self.assertEqual(storage.count(), 1)
+        self.assertEqual(os.path.getsize(self.path + ".log"), size)
+
+    def test_corrupt_record(self):
+        """Test that a bad record before the last one is an error"""
+        self.storage.new(State(name="California"))
+        self.storage.save()
+        with open(self.path + ".log", "r+b") as f:
+            data = f.read()
+            f.seek(0)
+            f.write(b"{" + data)
+        self.storage.new(State(name="Nevada"))
+        self.storage.save()
+        with self.assertRaises(ValueError):
+            self.open()
@@ -0,0 +1,124 @@
+#!/usr/bin/python3
+"""
+Contains the TestGeoDocs and TestGridIndex classes
+"""
+
+import inspect
+from models.engine import geo
+import pep8
+import random
+import unittest
+GridIndex = geo.GridIndex
+
+
+class TestGeoDocs(unittest.TestCase):
+    """Tests to check the documentation and style of the geo module"""
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.grid_f = inspect.getmembers(GridIndex, inspect.isfunction)
+        cls.geo_f = inspect.getmembers(geo, inspect.isfunction)
+
+    def test_pep8_conformance_geo(self):
+        """Test that models/engine/geo.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/geo.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_geo(self):
+        """Test that tests/test_models/test_engine/test_geo.py conforms
+        to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/'
+                                    'test_geo.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_geo_module_docstring(self):
+        """Test for the geo.py module docstring"""
+        self.assertIsNot(geo.__doc__, None,
+                         "geo.py needs a docstring")
+        self.assertTrue(len(geo.__doc__) >= 1,
+                        "geo.py needs a docstring")
+
+    def test_grid_index_class_docstring(self):
+        """Test for the GridIndex class docstring"""
+        self.assertIsNot(GridIndex.__doc__, None,
+                         "GridIndex class needs a docstring")
+        self.assertTrue(len(GridIndex.__doc__) >= 1,
+                        "GridIndex class needs a docstring")
+
+    def test_geo_func_docstrings(self):
+        """Test for the presence of docstrings in geo functions"""
+        for func in self.grid_f + self.geo_f:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} method needs a docstring".format(func[0]))
+            self.assertTrue(len(func[1].__doc__) >= 1,
+                            "{:s} method needs a docstring".format(func[0]))
+
+
+class TestGridIndex(unittest.TestCase):
+    """Test the GridIndex class"""
+    def setUp(self):
+        """Index random points, half of them around Paris"""
+        rand = random.Random(0)
+        self.grid = GridIndex()
+        self.points = {}
+        for i in range(2000):
+            if i % 2:
+                lat, lng = rand.uniform(-90, 90), rand.uniform(-180, 180)
+            else:
+                lat, lng = rand.gauss(48.8, 1), rand.gauss(2.3, 1)
+            self.points[i] = (lat, lng)
+            self.grid.add(i, lat, lng)
+
+    def brute(self, lat, lng):
+        """every point ordered by distance to (lat, lng)"""
+        return sorted((geo.haversine(lat, lng, plat, plng), key)
+                      for key, (plat, plng) in self.points.items())
+
+    def test_haversine(self):
+        """Test the distance between two known points"""
+        self.assertAlmostEqual(geo.haversine(48.8566, 2.3522,
+                                             51.5074, -0.1278), 343.6, 0)
+        self.assertEqual(geo.haversine(10, 20, 10, 20), 0)
+
+    def test_nearest(self):
+        """Test that the k nearest points match a full scan"""
+        for lat, lng in ((48.8, 2.3), (0, 0), (89.9, 10), (-10, 179.9)):
+            expected = self.brute(lat, lng)
+            for limit in (1, 10):
+                self.assertEqual(self.grid.nearest(lat, lng, limit=limit),
+                                 expected[:limit])
+
+    def test_radius(self):
+        """Test that radius queries match a full scan"""
+        for lat, lng in ((48.8, 2.3), (89.9, 10), (-10, -179.9)):
+            expected = [item for item in self.brute(lat, lng)
+                        if item[0] <= 500]
+            self.assertEqual(self.grid.nearest(lat, lng, radius=500),
+                             expected)
+
+    def test_within_across_meridian(self):
+        """Test a box crossing the 180th meridian"""
+        box = (-30, 170, 30, -170)
+        expected = sorted(key for key, (lat, lng) in self.points.items()
+                          if -30 <= lat <= 30 and abs(lng) >= 170)
+        self.assertEqual(sorted(key for key, lat, lng
+                                in self.grid.within(box)), expected)
+        self.assertEqual(geo.box_center(box), (0, 180))
+
+    def test_add_remove(self):
+        """Test that moved and removed points are reindexed"""
+        self.grid.add(0, 10, 10)
+        self.assertEqual(self.grid.nearest(10, 10, limit=1), [(0, 0)])
+        self.grid.remove(0)
+        self.grid.add(1, None, None)
+        self.assertEqual(len(self.grid), 1998)
+        self.assertNotIn(0, [key for d, key
+                             in self.grid.nearest(10, 10, limit=5)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+#!/usr/bin/python3
+"""
+Contains the TestRWLockDocs and TestRWLock classes
+"""
+
+import inspect
+from models.engine import locks
+import pep8
+import threading
+import time
+import unittest
+RWLock = locks.RWLock
+
+
+class TestRWLockDocs(unittest.TestCase):
+    """Tests to check the documentation and style of RWLock class"""
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.lock_f = inspect.getmembers(RWLock, inspect.isfunction)
+
+    def test_pep8_conformance_locks(self):
+        """Test that models/engine/locks.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/locks.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_locks(self):
+        """Test that tests/test_models/test_engine/test_locks.py conforms
+        to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/'
+                                    'test_locks.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_locks_module_docstring(self):
+        """Test for the locks.py module docstring"""
+        self.assertIsNot(locks.__doc__, None,
+                         "locks.py needs a docstring")
+        self.assertTrue(len(locks.__doc__) >= 1,
+                        "locks.py needs a docstring")
+
+    def test_rwlock_class_docstring(self):
+        """Test for the RWLock class docstring"""
+        self.assertIsNot(RWLock.__doc__, None,
+                         "RWLock class needs a docstring")
+        self.assertTrue(len(RWLock.__doc__) >= 1,
+                        "RWLock class needs a docstring")
+
+    def test_rwlock_func_docstrings(self):
+        """Test for the presence of docstrings in RWLock methods"""
+        for func in self.lock_f:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} method needs a docstring".format(func[0]))
+            self.assertTrue(len(func[1].__doc__) >= 1,
+                            "{:s} method needs a docstring".format(func[0]))
+
+
+class TestRWLock(unittest.TestCase):
+    """Test the RWLock class"""
+    def test_shared_readers(self):
+        """Test that readers on other threads do not wait for each other"""
+        lock = RWLock()
+        entered = threading.Event()
+
+        def reader():
+            with lock.read():
+                entered.set()
+
+        with lock.read():
+            thread = threading.Thread(target=reader)
+            thread.start()
+            self.assertTrue(entered.wait(1))
+        thread.join()
+
+    def test_exclusive_writer(self):
+        """Test that a writer waits for the readers to leave"""
+        lock = RWLock()
+        order = []
+
+        def writer():
+            with lock.write():
+                order.append("write")
+
+        with lock.read():
+            thread = threading.Thread(target=writer)
+            thread.start()
+            time.sleep(0.05)
+            order.append("read")
+        thread.join()
+        self.assertEqual(order, ["read", "write"])
+
+    def test_reentrant(self):
+        """Test that the holder may take the lock again"""
+        lock = RWLock()
+        with lock.write():
+            with lock.write():
+                with lock.read():
+                    self.assertTrue(lock.stats()["writer"])
+        with lock.read():
+            with lock.read():
+                self.assertEqual(lock.stats()["readers"], 2)
+        self.assertEqual(lock.stats(), {"readers": 0, "waiting": 0,
+                                        "writer": False})
+
+    def test_no_upgrade(self):
+        """Test that a reader cannot take the lock for writing"""
+        lock = RWLock()
+        with lock.read():
+            with self.assertRaises(RuntimeError):
+                lock.acquire_write()
+
+
+if __name__ == '__main__':
+    unittest.main()
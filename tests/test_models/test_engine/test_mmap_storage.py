@@ -0,0 +1,250 @@
+#!/usr/bin/python3
+"""
+Contains the TestMmapStorageDocs and TestMmapStorage classes
+"""
+
+import inspect
+import models
+from models.engine import mmap_storage
+from models.city import City
+from models.place import Place
+from models.state import State
+import os
+import pep8
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+MmapStorage = mmap_storage.MmapStorage
+
+
+class TestMmapStorageDocs(unittest.TestCase):
+    """Tests to check the documentation and style of MmapStorage class"""
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.mmap_f = inspect.getmembers(MmapStorage, inspect.isfunction)
+
+    def test_pep8_conformance_mmap_storage(self):
+        """Test that models/engine/mmap_storage.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/mmap_storage.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_mmap_storage(self):
+        """Test tests/test_models/test_engine/test_mmap_storage.py
+        conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/'
+                                    'test_mmap_storage.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_mmap_storage_module_docstring(self):
+        """Test for the mmap_storage.py module docstring"""
+        self.assertIsNot(mmap_storage.__doc__, None,
+                         "mmap_storage.py needs a docstring")
+        self.assertTrue(len(mmap_storage.__doc__) >= 1,
+                        "mmap_storage.py needs a docstring")
+
+    def test_mmap_storage_class_docstring(self):
+        """Test for the MmapStorage class docstring"""
+        self.assertIsNot(MmapStorage.__doc__, None,
+                         "MmapStorage class needs a docstring")
+        self.assertTrue(len(MmapStorage.__doc__) >= 1,
+                        "MmapStorage class needs a docstring")
+
+    def test_mmap_func_docstrings(self):
+        """Test for the presence of docstrings in MmapStorage methods"""
+        for func in self.mmap_f:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} method needs a docstring".format(func[0]))
+            self.assertTrue(len(func[1].__doc__) >= 1,
+                            "{:s} method needs a docstring".format(func[0]))
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing mmap storage")
+class TestMmapStorage(unittest.TestCase):
+    """Test the MmapStorage class"""
+    def setUp(self):
+        """Opens an empty storage in a temporary directory"""
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "file.mmap")
+        self.storage = self.open()
+
+    def tearDown(self):
+        """Removes the temporary directory"""
+        shutil.rmtree(self.tmp)
+
+    def open(self):
+        """Opens the storage of the temporary directory"""
+        storage = MmapStorage(self.path)
+        storage.reload()
+        return storage
+
+    def test_get_after_reopen(self):
+        """Test that saved objects are read back from the record file"""
+        state = State(name="California")
+        self.storage.new(state)
+        self.storage.save()
+        storage = self.open()
+        got = storage.get(State, state.id)
+        self.assertEqual(got.to_dict(), state.to_dict())
+        self.assertEqual(storage.version(State, state.id), state.updated_at)
+        self.assertIsNone(storage.get(State, "missing"))
+
+    def test_unsaved_objects(self):
+        """Test that new objects are visible before save()"""
+        state = State(name="California")
+        self.storage.new(state)
+        self.assertIs(self.storage.get(State, state.id), state)
+        self.assertEqual(self.storage.count(State), 1)
+        self.assertEqual(self.open().count(State), 0)
+
+    def test_delete(self):
+        """Test that deletions survive a reopen"""
+        state = State(name="California")
+        self.storage.new(state)
+        self.storage.save()
+        self.storage.delete(state)
+        self.storage.save()
+        self.assertFalse(self.open().exists(State, state.id))
+
+    def test_children_and_page(self):
+        """Test the foreign key index and pagination"""
+        state = State(name="California")
+        cities = [City(state_id=state.id, name=str(i)) for i in range(5)]
+        self.storage.bulk_new([state] + cities)
+        self.storage.save()
+        storage = self.open()
+        self.assertEqual(len(storage.children(City, "state_id", state.id)),
+                         5)
+        objs, next_id = storage.page(City, limit=3)
+        self.assertEqual([obj.id for obj in objs],
+                         sorted(city.id for city in cities)[:3])
+        objs, next_id = storage.page(City, after_id=next_id, limit=3)
+        self.assertEqual(len(objs), 2)
+        self.assertIsNone(next_id)
+
+    def test_search_places(self):
+        """Test searching places by state, city and amenities"""
+        states = [State(name=str(i)) for i in range(2)]
+        cities = [City(state_id=state.id, name="c") for state in states]
+        places = [Place(city_id=cities[i % 2].id, name=str(i),
+                        amenity_ids=["a"] if i % 3 else ["a", "b"])
+                  for i in range(6)]
+        self.storage.bulk_new(states + cities + places)
+        self.storage.save()
+        storage = self.open()
+
+        def ids(objs):
+            return sorted(obj.id for obj in objs)
+
+        found, next_id = storage.search_places(states=[states[0].id])
+        self.assertEqual(ids(found), ids(places[::2]))
+        found, next_id = storage.search_places(cities=[cities[1].id],
+                                               amenities=["b"])
+        self.assertEqual(ids(found), [places[3].id])
+        found, next_id = storage.search_places(amenities=["a", "b"],
+                                               limit=1)
+        self.assertEqual(ids(found), ids(places[::3])[:1])
+        found, next_id = storage.search_places(amenities=["a", "b"],
+                                               after_id=next_id)
+        self.assertEqual(ids(found), ids(places[::3])[1:])
+        self.assertIsNone(next_id)
+
+    def test_ranges_and_order(self):
+        """Test range filters and ordering by price across pages"""
+        places = [Place(name=str(i), price_by_night=i % 4, max_guest=i)
+                  for i in range(8)]
+        self.storage.bulk_new(places)
+        self.storage.save()
+        storage = self.open()
+        expected = sorted((p for p in places if p.max_guest >= 2),
+                          key=lambda p: (p.price_by_night, p.id),
+                          reverse=True)
+        found, cursor = [], None
+        while True:
+            objs, cursor = storage.page(Place, after_id=cursor, limit=4,
+                                        ranges={"max_guest": (2, None)},
+                                        order="-price_by_night")
+            found += [obj.id for obj in objs]
+            if cursor is None:
+                break
+        self.assertEqual(found, [p.id for p in expected])
+        objs, cursor = storage.page(Place, ranges={"price_by_night":
+                                                   (1, 2)})
+        self.assertEqual([obj.id for obj in objs],
+                         sorted(p.id for p in places
+                                if 1 <= p.price_by_night <= 2))
+
+    def test_index_rebuilt(self):
+        """Test that a missing index is rebuilt from the record file"""
+        state = State(name="California")
+        self.storage.new(state)
+        self.storage.save()
+        os.remove(self.path + ".idx")
+        self.assertTrue(self.open().exists(State, state.id))
+
+    def test_torn_record(self):
+        """Test that a partly written last record is dropped"""
+        state = State(name="California")
+        self.storage.new(state)
+        self.storage.save()
+        size = os.path.getsize(self.path)
+        with open(self.path, "ab") as f:
+            f.write(b'{"__class__": "State", "id"')
+        storage = self.open()
+        self.assertEqual(storage.count(), 1)
+        self.assertEqual(os.path.getsize(self.path), size)
+
+    def test_torn_index_line(self):
+        """Test that a partly written last index line is dropped"""
+        states = [State(name=str(i)) for i in range(2)]
+        for state in states:
+            self.storage.new(state)
+            self.storage.save()
+        size = os.path.getsize(self.path + ".idx")
+        with open(self.path + ".idx", "ab") as f:
+            f.write(b'["State.')
+        storage = self.open()
+        self.assertEqual(storage.count(State), 2)
+        self.assertEqual(os.path.getsize(self.path + ".idx"), size)
+
+    def test_compact(self):
+        """Test that compaction drops replaced records"""
+        state = State(name="California")
+        for i in range(10):
+            state.name = str(i)
+            self.storage.new(state)
+            self.storage.save()
+        self.storage.compact()
+        self.assertEqual(self.storage.metrics()["mmap"]["garbage_bytes"], 0)
+        self.assertEqual(self.open().get(State, state.id).name, "9")
+
+    def test_read_during_remap(self):
+        """Test that a reader never decodes the offsets of one file from
+        the map of another while save() and compact() remap"""
+        states = [State(name=str(i)) for i in range(3)]
+        self.storage.bulk_new(states)
+        self.storage.save()
+        names = []
+        real_mmap = mmap_storage.mmap.mmap
+
+        def racing_mmap(*args, **kwargs):
+            """a map another request reads the states before"""
+            names.append([self.storage.get(State, state.id).name
+                          for state in states])
+            return real_mmap(*args, **kwargs)
+
+        with mock.patch.object(mmap_storage.mmap, "mmap", racing_mmap):
+            states[1].name = "Nevada"
+            self.storage.new(states[1])
+            self.storage.save()
+            self.storage.compact()
+        self.assertEqual(names, [["0", "Nevada", "2"]] * 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+#!/usr/bin/python3
+"""
+Contains the TestTextDocs and TestInvertedIndex classes
+"""
+
+import inspect
+from models.engine import text
+import pep8
+import unittest
+InvertedIndex = text.InvertedIndex
+
+
+class TestTextDocs(unittest.TestCase):
+    """Tests to check the documentation and style of the text module"""
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.index_f = inspect.getmembers(InvertedIndex, inspect.isfunction)
+
+    def test_pep8_conformance_text(self):
+        """Test that models/engine/text.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/text.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_text(self):
+        """Test that tests/test_models/test_engine/test_text.py conforms
+        to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/'
+                                    'test_text.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_text_module_docstring(self):
+        """Test for the text.py module docstring"""
+        self.assertIsNot(text.__doc__, None,
+                         "text.py needs a docstring")
+        self.assertTrue(len(text.__doc__) >= 1,
+                        "text.py needs a docstring")
+
+    def test_inverted_index_class_docstring(self):
+        """Test for the InvertedIndex class docstring"""
+        self.assertIsNot(InvertedIndex.__doc__, None,
+                         "InvertedIndex class needs a docstring")
+        self.assertTrue(len(InvertedIndex.__doc__) >= 1,
+                        "InvertedIndex class needs a docstring")
+
+    def test_inverted_index_func_docstrings(self):
+        """Test for the presence of docstrings in InvertedIndex methods"""
+        for func in self.index_f + [("tokenize", text.tokenize)]:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} method needs a docstring".format(func[0]))
+            self.assertTrue(len(func[1].__doc__) >= 1,
+                            "{:s} method needs a docstring".format(func[0]))
+
+
+class TestInvertedIndex(unittest.TestCase):
+    """Test the InvertedIndex class"""
+    def setUp(self):
+        """Index a few documents"""
+        self.index = InvertedIndex()
+        self.index.add("a", "Sunny loft near the beach", None)
+        self.index.add("b", "Beach, beach and more beach!")
+        self.index.add("c", "Quiet cabin in the woods")
+
+    def test_tokenize(self):
+        """Test that words are lowercased and stop words dropped"""
+        self.assertEqual(text.tokenize("The Café, is GREAT_2day"),
+                         ["café", "great", "2day"])
+        self.assertEqual(text.tokenize(None), [])
+
+    def test_ranking(self):
+        """Test that more occurrences rank higher"""
+        keys = [key for score, key in self.index.search("beach")]
+        self.assertEqual(keys, ["b", "a"])
+        keys = [key for score, key in self.index.search("loft beach")]
+        self.assertEqual(keys[0], "a")
+        self.assertEqual(self.index.search("the"), [])
+
+    def test_limit_and_accept(self):
+        """Test limiting and filtering the results"""
+        self.assertEqual(len(self.index.search("beach", limit=1)), 1)
+        found = self.index.search("beach", accept=lambda key: key != "b")
+        self.assertEqual([key for score, key in found], ["a"])
+
+    def test_replace_and_remove(self):
+        """Test that documents are reindexed and removed"""
+        self.index.add("c", "Cabin on the beach")
+        self.assertIn("c", [key for score, key
+                            in self.index.search("beach")])
+        self.assertEqual(self.index.search("woods"), [])
+        self.index.remove("b")
+        self.index.remove("missing")
+        self.assertEqual(len(self.index), 2)
+        self.assertEqual(sorted(key for score, key
+                                in self.index.search("beach")), ["a", "c"])
+
+
+if __name__ == '__main__':
+    unittest.main()
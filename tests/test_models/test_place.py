@@ -8,6 +8,7 @@ import inspect
 import models
 from models import place
 from models.base_model import BaseModel
+from models.review import Review
 import pep8
 import unittest
 Place = place.Place
@@ -171,6 +172,71 @@ class TestPlace(unittest.TestCase):
         self.assertEqual(type(place.amenity_ids), list)
         self.assertEqual(len(place.amenity_ids), 0)
 
+    def test_stats_attrs(self):
+        """Test a new Place starts with no reviews and no amenities"""
+        place = Place()
+        self.assertEqual(place.review_count, 0)
+        self.assertEqual(place.last_review_at, None)
+        self.assertEqual(place.amenity_count, 0)
+        new_d = place.to_dict()
+        for attr in Place.stats_keys:
+            self.assertTrue(attr in new_d)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing File Storage")
+    def test_review_added(self):
+        """Test review_added() counts reviews and keeps the latest time"""
+        place = Place()
+        first = Review(place_id=place.id, user_id="user", text="a")
+        second = Review(place_id=place.id, user_id="user", text="b")
+        place.review_added(second)
+        place.review_added(first)
+        self.assertEqual(place.review_count, 2)
+        self.assertEqual(place.last_review_at,
+                         second.to_dict()["created_at"])
+        self.assertEqual(place.to_dict()["last_review_at"],
+                         second.to_dict()["created_at"])
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_count_stats_db(self):
+        """Test count_stats() counts in the database without loading the
+        reviews and amenities into to_dict()"""
+        from models.amenity import Amenity
+        from models.city import City
+        from models.state import State
+        from models.user import User
+        state = State(name="California")
+        city = City(state_id=state.id, name="San Francisco")
+        user = User(email="a@b.c", password="pwd")
+        place = Place(city_id=city.id, user_id=user.id, name="loft")
+        amenity = Amenity(name="wifi")
+        place.amenities.append(amenity)
+        reviews = [Review(place_id=place.id, user_id=user.id, text=str(i))
+                   for i in range(2)]
+        latest = reviews[1].created_at.isoformat(timespec="microseconds")
+        models.storage.bulk_new([state, city, user, place, amenity] +
+                                reviews)
+        models.storage.save()
+        place.review_count = None
+        models.storage.save()
+        models.storage.close()
+        place = models.storage.get(Place, place.id)
+        self.assertEqual(place.stats(), {"review_count": 2,
+                                         "last_review_at": latest,
+                                         "amenity_count": 1})
+        new_d = place.to_dict()
+        self.assertNotIn("reviews", new_d)
+        self.assertNotIn("amenities", new_d)
+        models.storage.close()
+
+    def test_amenities_changed(self):
+        """Test amenities_changed() never counts below zero"""
+        place = Place()
+        place.amenities_changed(2)
+        place.amenities_changed(-1)
+        self.assertEqual(place.amenity_count, 1)
+        place.amenities_changed(-3)
+        self.assertEqual(place.amenity_count, 0)
+
     def test_to_dict_creates_dict(self):
         """test to_dict method creates a dictionary with proper attrs"""
         p = Place()